@@ -1,7 +1,10 @@
 # warehouse_management_system/backend/app/database.py
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.models.models import Base
+from app.utils.query_stats import QUERY_STATS_ENABLED, install_query_stats
+from app.utils.report_cache import install_report_cache_invalidation
 import os
 from dotenv import load_dotenv
 
@@ -23,7 +26,26 @@ if DATABASE_URL.startswith("mysql://"):
     # MySQL URL is already in correct format for PyMySQL
     pass
 
+# Map each sync driver to its asyncio counterpart
+ASYNC_DRIVER_MAP = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Rewrite a sync DATABASE_URL to use the matching asyncio driver"""
+    scheme, separator, rest = url.partition("://")
+    if not separator:
+        return url
+    return f"{ASYNC_DRIVER_MAP.get(scheme, scheme)}://{rest}"
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", get_async_database_url(DATABASE_URL))
+
 # Create SQLAlchemy engine with better error handling
+# The sync engine is kept for create_tables, seeding, Alembic and the migration scripts
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
@@ -32,9 +54,33 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 
+# Async engine used by the request handlers so queries do not block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    echo=False
+)
+
+# Per-request query counting (opt-in, see app/utils/query_stats.py)
+if QUERY_STATS_ENABLED:
+    install_query_stats(engine)
+    install_query_stats(async_engine.sync_engine)
+
+# Drop cached reports when a commit touches the tables they read
+install_report_cache_invalidation()
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async sessions keep attributes loaded after commit so templates can still read them
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
@@ -43,10 +89,19 @@ def get_db():
     finally:
         db.close()
 
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Function to create all tables
 def create_tables():
     Base.metadata.create_all(bind=engine)
 
 # Function to drop all tables (for development only)
 def drop_tables():
-    Base.metadata.drop_all(bind=engine)
\ No newline at end of file
+    Base.metadata.drop_all(bind=engine)
+
+# Release pooled async connections (called on application shutdown)
+async def dispose_async_engine():
+    await async_engine.dispose()
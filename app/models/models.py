@@ -1,5 +1,5 @@
 # warehouse_management_system/backend/app/models/models.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey, DECIMAL, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -105,6 +105,7 @@ class Product(Base):
     inventory_items = relationship("InventoryItem", back_populates="product")
     purchase_order_items = relationship("PurchaseOrderItem", back_populates="product")
     sales_order_items = relationship("SalesOrderItem", back_populates="product")
+    stock_summary = relationship("ProductStockSummary", back_populates="product", uselist=False)
     
     @property
     def stock_quantity(self):
@@ -115,6 +116,11 @@ class Product(Base):
 
 class InventoryItem(Base):
     __tablename__ = "inventory_items"
+    __table_args__ = (
+        Index("ix_inventory_items_product_status_qty", "product_id", "status", "quantity_available"),
+        Index("ix_inventory_items_expiry_date", "expiry_date"),
+        Index("ix_inventory_items_atp", "product_id", "status", "expiry_date", "quantity_available", "quantity_reserved"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -136,6 +142,10 @@ class InventoryItem(Base):
 
 class PurchaseOrder(Base):
     __tablename__ = "purchase_orders"
+    __table_args__ = (
+        Index("ix_purchase_orders_order_date_status", "order_date", "status"),
+        Index("ix_purchase_orders_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     po_number = Column(String(50), unique=True, index=True, nullable=False)
@@ -147,6 +157,7 @@ class PurchaseOrder(Base):
     total_amount = Column(DECIMAL(12, 2), default=0.00)
     notes = Column(Text)
     created_by = Column(Integer, ForeignKey("users.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Rollup watermark
     
     # Relationships
     vendor = relationship("Vendor", back_populates="purchase_orders")
@@ -154,6 +165,9 @@ class PurchaseOrder(Base):
 
 class PurchaseOrderItem(Base):
     __tablename__ = "purchase_order_items"
+    __table_args__ = (
+        Index("ix_purchase_order_items_purchase_order_id", "purchase_order_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     purchase_order_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False)
@@ -169,6 +183,11 @@ class PurchaseOrderItem(Base):
 
 class SalesOrder(Base):
     __tablename__ = "sales_orders"
+    __table_args__ = (
+        Index("ix_sales_orders_customer_date_status", "customer_id", "order_date", "status"),
+        Index("ix_sales_orders_order_date_status", "order_date", "status"),
+        Index("ix_sales_orders_updated_at", "updated_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(50), unique=True, index=True, nullable=False)
@@ -180,6 +199,7 @@ class SalesOrder(Base):
     discount_percentage = Column(Float, default=0.0)
     notes = Column(Text)
     created_by = Column(Integer, ForeignKey("users.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Rollup watermark
     
     # Relationships
     customer = relationship("Customer", back_populates="sales_orders")
@@ -187,6 +207,9 @@ class SalesOrder(Base):
 
 class SalesOrderItem(Base):
     __tablename__ = "sales_order_items"
+    __table_args__ = (
+        Index("ix_sales_order_items_sales_order_id", "sales_order_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     sales_order_id = Column(Integer, ForeignKey("sales_orders.id"), nullable=False)
@@ -200,10 +223,36 @@ class SalesOrderItem(Base):
     # Relationships
     sales_order = relationship("SalesOrder", back_populates="items")
     product = relationship("Product", back_populates="sales_order_items")
+    inventory_item = relationship("InventoryItem")  # First allocated batch
+    allocations = relationship("SalesOrderAllocation", back_populates="sales_order_item", cascade="all, delete-orphan")
+
+class SalesOrderAllocation(Base):
+    """Quantity of an order line assigned to one inventory batch (first-expiry-first-out)"""
+    __tablename__ = "sales_order_allocations"
+    __table_args__ = (
+        Index("ix_sales_order_allocations_item", "sales_order_item_id"),
+        Index("ix_sales_order_allocations_inventory_item", "inventory_item_id"),
+        Index("ix_sales_order_allocations_reserved_until", "reserved_until"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    sales_order_item_id = Column(Integer, ForeignKey("sales_order_items.id"), nullable=False)
+    inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    quantity_shipped = Column(Integer, nullable=False, default=0)
+    quantity_reserved = Column(Integer, nullable=False, default=0)  # Held on the batch since confirmation
+    reserved_until = Column(DateTime)  # Released by the sweeper after this
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    sales_order_item = relationship("SalesOrderItem", back_populates="allocations")
     inventory_item = relationship("InventoryItem")
 
 class StockMovement(Base):
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_product_created", "product_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -219,6 +268,16 @@ class StockMovement(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_ack_severity_type_created", "is_acknowledged", "severity", "alert_type", "created_at"),
+        # At most one open alert of each type per batch (MySQL has no partial
+        # indexes; there the alert engine's existence check is the only guard)
+        Index(
+            "ux_alerts_open_item_type", "inventory_item_id", "alert_type", unique=True,
+            sqlite_where=text("is_acknowledged = 0"),
+            postgresql_where=text("is_acknowledged = false")
+        ).ddl_if(dialect=("sqlite", "postgresql")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     alert_type = Column(String(30), nullable=False)  # low_stock, expiry_warning, temperature_alert
@@ -233,6 +292,9 @@ class Alert(Base):
 
 class HospitalInventory(Base):
     __tablename__ = "hospital_inventory"
+    __table_args__ = (
+        Index("ix_hospital_inventory_hospital_product", "hospital_id", "product_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     hospital_id = Column(Integer, ForeignKey("customers.id"), nullable=False)  # Hospital customer
@@ -247,4 +309,73 @@ class HospitalInventory(Base):
     
     # Relationships
     hospital = relationship("Customer", foreign_keys=[hospital_id])
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Product")
+
+class ProductStockSummary(Base):
+    __tablename__ = "product_stock_summary"
+    
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    quantity_available = Column(Integer, nullable=False, default=0)  # Sum over "available" batches
+    quantity_reserved = Column(Integer, nullable=False, default=0)
+    batch_count = Column(Integer, nullable=False, default=0)  # Available batches with stock on hand
+    earliest_expiry = Column(DateTime)  # Next batch to expire (FEFO)
+    stock_value = Column(DECIMAL(14, 2), nullable=False, default=0)  # quantity_available x batch cost_price
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    product = relationship("Product", back_populates="stock_summary")
+
+class DailySalesRollup(Base):
+    __tablename__ = "daily_sales_rollup"
+    
+    day = Column(Date, primary_key=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+class DailyPurchaseRollup(Base):
+    __tablename__ = "daily_purchase_rollup"
+    
+    day = Column(Date, primary_key=True)
+    vendor_id = Column(Integer, ForeignKey("vendors.id"), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+    
+    name = Column(String(50), primary_key=True)  # daily_sales_rollup, daily_purchase_rollup
+    last_change_at = Column(DateTime)  # Highest order updated_at already folded in
+    closed_through = Column(DateTime)  # Rollups are complete for days before this
+    last_run_at = Column(DateTime)
+
+class NumberSequence(Base):
+    __tablename__ = "number_sequences"
+    
+    prefix = Column(String(50), primary_key=True)  # SO-2026, PO-2026
+    next_value = Column(Integer, nullable=False)  # First number not yet handed to any worker
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class ActivityEvent(Base):
+    __tablename__ = "activity_events"
+    __table_args__ = (
+        Index("ix_activity_events_created", "created_at", "id"),
+        Index("ix_activity_events_hospital_created", "hospital_id", "created_at", "id"),
+        Index("ix_activity_events_public_created", "is_public", "created_at", "id"),
+    )
+    
+    # Append-only; names are copied in when the event is written, and the ids
+    # carry no foreign keys so deleting a user or hospital keeps the history
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(20), nullable=False)  # stock_movement, purchase_order, sales_order
+    action = Column(String(20))  # Movement type or the order status reached
+    message = Column(String(255), nullable=False)  # Display text, e.g. "In 50 units of Dialyzer F8"
+    actor_id = Column(Integer)
+    actor_name = Column(String(100))
+    hospital_id = Column(Integer)  # Hospital the event concerns, NULL for warehouse-only events
+    is_public = Column(Boolean, nullable=False, default=False)  # Shown to every hospital buyer (stock arriving)
+    reference_type = Column(String(20))
+    reference_id = Column(Integer)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
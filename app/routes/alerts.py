@@ -3,9 +3,12 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.models import Alert, InventoryItem, Product, User
+from app.utils.pagination import paginate_keyset
+from app.utils.alert_engine import evaluate_stock_alerts, sweep_expiry_alerts
+from app.utils.alert_stats import alert_counts, hospital_alert_scope, summarize_alert_counts
 from app.utils.auth import check_user_role_from_cookie, get_current_active_user_from_cookie, check_user_roles_from_cookie
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
@@ -21,32 +24,35 @@ async def alerts_list(
     severity: str = Query(None),
     alert_type: str = Query(None),
     status: str = Query(None),
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    per_page: int = Query(50),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display alerts list page with filters - Manager and Admin only"""
+    return await db.run_sync(
+        render_alerts_list, request, current_user, severity, alert_type, status,
+        after, before, per_page
+    )
+
+def render_alerts_list(
+    db: Session,
+    request: Request,
+    current_user: User,
+    severity: str,
+    alert_type: str,
+    status: str,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    per_page: int = 50
+):
+    """Build the alerts list page"""
     
-    # For staff users, show only alerts related to their hospital
-    if current_user.role == "staff" and current_user.hospital_id:
-        # Get alerts related to the hospital's inventory
-        from app.models.models import HospitalInventory, InventoryItem
-        
-        # Get hospital's product IDs
-        hospital_products = db.query(HospitalInventory.product_id).filter(
-            HospitalInventory.hospital_id == current_user.hospital_id
-        ).all()
-        hospital_product_ids = [p[0] for p in hospital_products]
-        
-        # Filter alerts by hospital's products
-        query = db.query(Alert).filter(
-            Alert.inventory_item_id.in_(
-                db.query(InventoryItem.id).filter(
-                    InventoryItem.product_id.in_(hospital_product_ids)
-                )
-            )
-        )
-    else:
-        # For managers, show all alerts
-        query = db.query(Alert)
+    # Staff see only alerts on their hospital's products; managers see every alert
+    hospital_id = current_user.hospital_id if current_user.role == "staff" and current_user.hospital_id else None
+    query = db.query(Alert)
+    if hospital_id is not None:
+        query = query.filter(hospital_alert_scope(hospital_id))
     
     if severity:
         query = query.filter(Alert.severity == severity)
@@ -59,37 +65,24 @@ async def alerts_list(
     elif status == "unacknowledged":
         query = query.filter(Alert.is_acknowledged == False)
     
-    alerts = query.order_by(Alert.created_at.desc()).all()
+    pagination = paginate_keyset(
+        query, Alert.created_at, Alert.id,
+        after=after, before=before, per_page=per_page, request=request
+    )
+    alerts = pagination.items
     
-    # Get alert statistics based on user role
-    if current_user.role == "staff" and current_user.hospital_id:
-        # Hospital-specific statistics
-        total_alerts = len(alerts)
-        unacknowledged_alerts = len([a for a in alerts if not a.is_acknowledged])
-        critical_alerts = len([a for a in alerts if a.severity == "critical" and not a.is_acknowledged])
-        high_alerts = len([a for a in alerts if a.severity == "high" and not a.is_acknowledged])
-        
-        error_count = len([a for a in alerts if a.severity == "critical"])
-        warning_count = len([a for a in alerts if a.severity == "high"])
-        info_count = len([a for a in alerts if a.severity == "medium"])
-        success_count = len([a for a in alerts if a.severity == "low"])
+    # Statistics over every alert in scope, not just this page: hospital-specific
+    # for staff (following the filters), full system for managers
+    if hospital_id is not None:
+        acknowledged = {"acknowledged": True, "unacknowledged": False}.get(status)
+        summary = summarize_alert_counts(alert_counts(db, hospital_id), severity, alert_type, acknowledged)
     else:
-        # Full system statistics for managers
-        total_alerts = db.query(Alert).count()
-        unacknowledged_alerts = db.query(Alert).filter(Alert.is_acknowledged == False).count()
-        critical_alerts = db.query(Alert).filter(
-            Alert.severity == "critical",
-            Alert.is_acknowledged == False
-        ).count()
-        high_alerts = db.query(Alert).filter(
-            Alert.severity == "high",
-            Alert.is_acknowledged == False
-        ).count()
-        
-        error_count = db.query(Alert).filter(Alert.severity == "critical").count()
-        warning_count = db.query(Alert).filter(Alert.severity == "high").count()
-        info_count = db.query(Alert).filter(Alert.severity == "medium").count()
-        success_count = db.query(Alert).filter(Alert.severity == "low").count()
+        summary = summarize_alert_counts(alert_counts(db))
+    total_alerts = summary["total_alerts"]
+    unacknowledged_alerts = summary["unacknowledged_alerts"]
+    critical_alerts = summary["unacknowledged_by_severity"]["critical"]
+    high_alerts = summary["unacknowledged_by_severity"]["high"]
+    by_severity = summary["by_severity"]
     
     return templates.TemplateResponse("alerts/list.html", {
         "request": request,
@@ -103,10 +96,10 @@ async def alerts_list(
             "unacknowledged_alerts": unacknowledged_alerts,
             "critical_alerts": critical_alerts,
             "high_alerts": high_alerts,
-            "error_count": error_count,
-            "warning_count": warning_count,
-            "info_count": info_count,
-            "success_count": success_count
+            "error_count": by_severity["critical"],
+            "warning_count": by_severity["high"],
+            "info_count": by_severity["medium"],
+            "success_count": by_severity["low"]
         },
         "filters": {
             "severity": severity,
@@ -114,7 +107,7 @@ async def alerts_list(
             "status": status
         },
         "current_user": current_user,
-        "pagination": {"pages": 1, "page": 1, "has_prev": False, "has_next": False}  # Simple pagination placeholder
+        "pagination": pagination
     })
 
 # Alert detail page
@@ -123,9 +116,13 @@ async def alert_detail(
     request: Request, 
     alert_id: int, 
     current_user: User = Depends(get_current_active_user_from_cookie),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display alert details"""
+    return await db.run_sync(render_alert_detail, request, alert_id, current_user)
+
+def render_alert_detail(db: Session, request: Request, alert_id: int, current_user: User):
+    """Build the alert detail page"""
     alert = db.query(Alert).filter(Alert.id == alert_id).first()
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -170,9 +167,13 @@ async def acknowledge_alert(
     request: Request,
     alert_id: int,
     notes: str = Form(""),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Acknowledge an alert"""
+    return await db.run_sync(process_acknowledge_alert, request, alert_id, notes)
+
+def process_acknowledge_alert(db: Session, request: Request, alert_id: int, notes: str):
+    """Mark a single alert as acknowledged"""
     alert = db.query(Alert).filter(Alert.id == alert_id).first()
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -195,9 +196,13 @@ async def acknowledge_alert(
 async def bulk_acknowledge_alerts(
     request: Request,
     alert_ids: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Bulk acknowledge multiple alerts"""
+    return await db.run_sync(process_bulk_acknowledge, request, alert_ids)
+
+def process_bulk_acknowledge(db: Session, request: Request, alert_ids: str):
+    """Acknowledge the alerts whose ids are listed (comma separated)"""
     try:
         ids = [int(id.strip()) for id in alert_ids.split(",") if id.strip()]
         
@@ -218,9 +223,13 @@ async def bulk_acknowledge_alerts(
 @router.get("/create-sample")
 async def create_sample_alerts(
     current_user: User = Depends(check_user_roles_from_cookie(["admin", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create sample alerts for testing"""
+    return await db.run_sync(process_create_sample_alerts, current_user)
+
+def process_create_sample_alerts(db: Session, current_user: User):
+    """Insert the sample alerts"""
     try:
         # Create sample alerts
         sample_alerts = [
@@ -280,9 +289,22 @@ async def create_alert(
     message: str = Form(...),
     severity: str = Form("medium"),
     inventory_item_id: int = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new alert (for testing)"""
+    return await db.run_sync(
+        process_create_alert, request, alert_type, message, severity, inventory_item_id
+    )
+
+def process_create_alert(
+    db: Session,
+    request: Request,
+    alert_type: str,
+    message: str,
+    severity: str,
+    inventory_item_id: int
+):
+    """Save a manually created alert"""
     try:
         alert = Alert(
             alert_type=alert_type,
@@ -307,9 +329,21 @@ async def get_alerts_api(
     alert_type: str = Query(None),
     acknowledged: bool = Query(None),
     limit: int = Query(50),
-    db: Session = Depends(get_db)
+    after: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get alerts for API"""
+    return await db.run_sync(build_alerts_payload, severity, alert_type, acknowledged, limit, after)
+
+def build_alerts_payload(
+    db: Session,
+    severity: str,
+    alert_type: str,
+    acknowledged: bool,
+    limit: int,
+    after: Optional[str] = None
+):
+    """Collect filtered alerts for the API"""
     query = db.query(Alert)
     
     if severity:
@@ -321,7 +355,8 @@ async def get_alerts_api(
     if acknowledged is not None:
         query = query.filter(Alert.is_acknowledged == acknowledged)
     
-    alerts = query.order_by(Alert.created_at.desc()).limit(limit).all()
+    page = paginate_keyset(query, Alert.created_at, Alert.id, after=after, per_page=limit)
+    alerts = page.items
     
     return {
         "alerts": [
@@ -335,68 +370,25 @@ async def get_alerts_api(
                 "acknowledged_at": alert.acknowledged_at.isoformat() if alert.acknowledged_at else None
             }
             for alert in alerts
-        ]
+        ],
+        **page.to_dict()
     }
 
 # API: Get alert summary
 @router.get("/api/summary")
-async def get_alert_summary(db: Session = Depends(get_db)):
+async def get_alert_summary(db: AsyncSession = Depends(get_async_db)):
     """Get alert summary for API"""
+    return await db.run_sync(build_alert_summary)
+
+def build_alert_summary(db: Session):
+    """Count alerts by severity and type"""
     try:
-        total_alerts = db.query(Alert).count()
-        unacknowledged_alerts = db.query(Alert).filter(Alert.is_acknowledged == False).count()
-        
-        # Count by severity
-        critical_alerts = db.query(Alert).filter(
-            Alert.severity == "critical",
-            Alert.is_acknowledged == False
-        ).count()
-        
-        high_alerts = db.query(Alert).filter(
-            Alert.severity == "high",
-            Alert.is_acknowledged == False
-        ).count()
-        
-        medium_alerts = db.query(Alert).filter(
-            Alert.severity == "medium",
-            Alert.is_acknowledged == False
-        ).count()
-        
-        low_alerts = db.query(Alert).filter(
-            Alert.severity == "low",
-            Alert.is_acknowledged == False
-        ).count()
-        
-        # Count by type
-        low_stock_alerts = db.query(Alert).filter(
-            Alert.alert_type == "low_stock",
-            Alert.is_acknowledged == False
-        ).count()
-        
-        expiry_alerts = db.query(Alert).filter(
-            Alert.alert_type == "expiry_warning",
-            Alert.is_acknowledged == False
-        ).count()
-        
-        temperature_alerts = db.query(Alert).filter(
-            Alert.alert_type == "temperature_alert",
-            Alert.is_acknowledged == False
-        ).count()
-        
+        summary = summarize_alert_counts(alert_counts(db))
         return {
-            "total_alerts": total_alerts,
-            "unacknowledged_alerts": unacknowledged_alerts,
-            "by_severity": {
-                "critical": critical_alerts,
-                "high": high_alerts,
-                "medium": medium_alerts,
-                "low": low_alerts
-            },
-            "by_type": {
-                "low_stock": low_stock_alerts,
-                "expiry_warning": expiry_alerts,
-                "temperature_alert": temperature_alerts
-            }
+            "total_alerts": summary["total_alerts"],
+            "unacknowledged_alerts": summary["unacknowledged_alerts"],
+            "by_severity": summary["unacknowledged_by_severity"],
+            "by_type": summary["unacknowledged_by_type"]
         }
     except Exception as e:
         return {
@@ -409,8 +401,12 @@ async def get_alert_summary(db: Session = Depends(get_db)):
 
 # API: Acknowledge alert
 @router.post("/api/acknowledge/{alert_id}")
-async def api_acknowledge_alert(alert_id: int, db: Session = Depends(get_db)):
+async def api_acknowledge_alert(alert_id: int, db: AsyncSession = Depends(get_async_db)):
     """API endpoint to acknowledge an alert"""
+    return await db.run_sync(process_api_acknowledge_alert, alert_id)
+
+def process_api_acknowledge_alert(db: Session, alert_id: int):
+    """Acknowledge an alert for the API"""
     alert = db.query(Alert).filter(Alert.id == alert_id).first()
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -431,9 +427,13 @@ async def api_acknowledge_alert(alert_id: int, db: Session = Depends(get_db)):
 @router.get("/clear-all")
 async def clear_all_alerts(
     current_user: User = Depends(check_user_roles_from_cookie(["admin", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Clear all alerts"""
+    return await db.run_sync(process_clear_all_alerts, current_user)
+
+def process_clear_all_alerts(db: Session, current_user: User):
+    """Delete every alert, acknowledged or not"""
     try:
         # Delete all alerts
         db.query(Alert).delete()
@@ -449,9 +449,13 @@ async def clear_all_alerts(
 async def dismiss_alert(
     alert_id: int,
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Dismiss an alert"""
+    return await db.run_sync(process_dismiss_alert, alert_id, current_user)
+
+def process_dismiss_alert(db: Session, alert_id: int, current_user: User):
+    """Delete an alert from the list page (dismissing removes it)"""
     alert = db.query(Alert).filter(Alert.id == alert_id).first()
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -471,9 +475,13 @@ async def dismiss_alert(
 async def delete_alert(
     alert_id: int,
     current_user: User = Depends(check_user_role_from_cookie("manager")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an alert"""
+    return await db.run_sync(process_delete_alert, alert_id, current_user)
+
+def process_delete_alert(db: Session, alert_id: int, current_user: User):
+    """Remove a single alert"""
     alert = db.query(Alert).filter(Alert.id == alert_id).first()
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
@@ -505,50 +513,14 @@ def create_system_alert(
     db.refresh(alert)
     return alert
 
-# Function to check for low stock alerts
-def check_low_stock_alerts(db: Session):
-    """Check for low stock items and create alerts"""
-    low_stock_items = db.query(InventoryItem).join(Product).filter(
-        InventoryItem.quantity_available <= Product.reorder_point,
-        InventoryItem.quantity_available > 0
-    ).all()
-    
-    for item in low_stock_items:
-        # Check if alert already exists
-        existing_alert = db.query(Alert).filter(
-            Alert.alert_type == "low_stock",
-            Alert.inventory_item_id == item.id,
-            Alert.is_acknowledged == False
-        ).first()
-        
-        if not existing_alert:
-            severity = "critical" if item.quantity_available == 0 else "high"
-            message = f"Low stock alert: {item.product.name} (SKU: {item.product.sku}) - Available: {item.quantity_available} {item.product.unit_of_measure}"
-            create_system_alert(db, "low_stock", message, severity, item.id)
+# Full-warehouse checks; stock writes and the expiry sweep in app.utils.alert_engine
+# raise alerts for just the batches they touch
+def check_low_stock_alerts(db: Session) -> int:
+    """Raise low stock (and expiry) alerts for every batch that needs one"""
+    created = evaluate_stock_alerts(db)
+    db.commit()
+    return created
 
-# Function to check for expiry alerts
-def check_expiry_alerts(db: Session):
-    """Check for items expiring soon and create alerts"""
-    thirty_days_from_now = datetime.utcnow() + timedelta(days=30)
-    seven_days_from_now = datetime.utcnow() + timedelta(days=7)
-    
-    expiring_items = db.query(InventoryItem).filter(
-        InventoryItem.expiry_date.isnot(None),
-        InventoryItem.expiry_date <= thirty_days_from_now,
-        InventoryItem.expiry_date > datetime.utcnow(),
-        InventoryItem.quantity_available > 0
-    ).all()
-    
-    for item in expiring_items:
-        # Check if alert already exists
-        existing_alert = db.query(Alert).filter(
-            Alert.alert_type == "expiry_warning",
-            Alert.inventory_item_id == item.id,
-            Alert.is_acknowledged == False
-        ).first()
-        
-        if not existing_alert:
-            days_until_expiry = (item.expiry_date - datetime.utcnow()).days
-            severity = "critical" if days_until_expiry <= 7 else "high" if days_until_expiry <= 14 else "medium"
-            message = f"Expiry warning: {item.product.name} (Batch: {item.batch_number}) expires in {days_until_expiry} days"
-            create_system_alert(db, "expiry_warning", message, severity, item.id) 
\ No newline at end of file
+def check_expiry_alerts(db: Session) -> int:
+    """Raise expiry alerts for every batch inside the warning window"""
+    return sweep_expiry_alerts(db)
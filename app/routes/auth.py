@@ -9,14 +9,16 @@ from app.database import get_db
 from app.models.models import User, Customer
 from app.models.schemas import UserCreate, User as UserSchema, Token
 from app.utils.auth import (
-    authenticate_user, 
+    authenticate_user_async,
     create_access_token, 
-    get_password_hash,
+    get_password_hash_async,
     get_user_by_username,
     get_user_by_email,
     get_current_active_user_from_cookie,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from app.utils.user_cache import user_cache
+from app.utils.pending_users import pending_users
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -38,7 +40,7 @@ async def register_page(request: Request, db: Session = Depends(get_db)):
 @router.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Authenticate user and return access token"""
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -91,7 +93,8 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
             raise HTTPException(status_code=400, detail="Please select a valid hospital")
     
     # Create new user (pending approval)
-    hashed_password = get_password_hash(user.password)
+    db.rollback()  # release the connection while hashing
+    hashed_password = await get_password_hash_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -105,6 +108,7 @@ async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     )
     db.add(db_user)
     db.commit()
+    pending_users.adjust(1)
     db.refresh(db_user)
     return db_user
 
@@ -117,7 +121,7 @@ async def login_form(
     db: Session = Depends(get_db)
 ):
     """Handle form-based login"""
-    user = authenticate_user(db, username, password)
+    user = await authenticate_user_async(db, username, password)
     if not user:
         return templates.TemplateResponse(
             "login.html", 
@@ -213,7 +217,8 @@ async def register_form(
             )
     
     # Create user (pending approval)
-    hashed_password = get_password_hash(password)
+    db.rollback()  # release the connection while hashing
+    hashed_password = await get_password_hash_async(password)
     db_user = User(
         username=username,
         email=email,
@@ -227,6 +232,7 @@ async def register_form(
     )
     db.add(db_user)
     db.commit()
+    pending_users.adjust(1)
     
     # Redirect to login page with pending approval message
     return RedirectResponse(url="/login?message=Registration submitted successfully. Your account is pending admin approval.", status_code=302)
@@ -282,6 +288,8 @@ async def approve_user(
     user.approved_at = datetime.utcnow()
     
     db.commit()
+    user_cache.invalidate(user.username)
+    pending_users.adjust(-1)
     
     return {"message": f"User {user.username} has been approved successfully"}
 
@@ -305,6 +313,8 @@ async def reject_user(
     # Delete the rejected user
     db.delete(user)
     db.commit()
+    user_cache.invalidate(user.username)
+    pending_users.adjust(-1)
     
     return {"message": f"User {user.username} has been rejected and removed"}
 
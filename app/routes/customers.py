@@ -1,5 +1,5 @@
 # app/routes/customers.py
-from fastapi import APIRouter, Depends, Request, HTTPException, Form
+from fastapi import APIRouter, Depends, Request, HTTPException, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
@@ -7,6 +7,7 @@ from sqlalchemy import desc
 from app.database import get_db
 from app.models.models import Customer, User
 from app.utils.auth import get_current_active_user_from_cookie, check_user_role_from_cookie
+from app.utils.pagination import paginate_keyset
 from typing import Optional
 
 router = APIRouter()
@@ -16,18 +17,24 @@ templates = Jinja2Templates(directory="app/templates")
 @router.get("/", response_class=HTMLResponse)
 async def list_customers(
     request: Request,
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    per_page: int = Query(50),
     current_user: User = Depends(get_current_active_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """Display list of all customers"""
-    customers = db.query(Customer).filter(Customer.is_active == True).order_by(desc(Customer.created_at)).all()
+    pagination = paginate_keyset(
+        db.query(Customer).filter(Customer.is_active == True), Customer.created_at, Customer.id,
+        after=after, before=before, per_page=per_page, request=request
+    )
     
     return templates.TemplateResponse("customers/list.html", {
         "request": request,
-        "customers": customers,
+        "customers": pagination.items,
         "current_user": current_user,
         "user_role": current_user.role,
-        "pagination": {"pages": 1, "page": 1, "has_prev": False, "has_next": False}  # Simple pagination placeholder
+        "pagination": pagination
     })
 
 # Add customer page - Admin and Manager only
@@ -181,12 +188,17 @@ async def delete_customer(
 # API endpoints for AJAX calls
 @router.get("/api/customers")
 async def get_customers_api(
+    after: Optional[str] = Query(None),
+    per_page: int = Query(100),
     current_user: User = Depends(get_current_active_user_from_cookie),
     db: Session = Depends(get_db)
 ):
-    """API endpoint to get all customers"""
-    customers = db.query(Customer).filter(Customer.is_active == True).all()
-    return {"customers": [{"id": c.id, "name": c.name, "email": c.email} for c in customers]}
+    """API endpoint to list active customers, newest first, one cursor page at a time"""
+    page = paginate_keyset(
+        db.query(Customer).filter(Customer.is_active == True), Customer.created_at, Customer.id,
+        after=after, per_page=per_page
+    )
+    return {"customers": [{"id": c.id, "name": c.name, "email": c.email} for c in page.items], **page.to_dict()}
 
 @router.get("/api/customers/{customer_id}")
 async def get_customer_api(
@@ -1,28 +1,53 @@
 # app/routes/dashboard.py
-from fastapi import APIRouter, Depends, Request
-from fastapi.responses import HTMLResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, and_, case, desc, func, select, true
+from app.database import AsyncSessionLocal, get_async_db
 from app.models.models import (
     Product, InventoryItem, PurchaseOrder, SalesOrder, 
-    Customer, Vendor, StockMovement, Alert, User
+    Customer, Vendor, StockMovement, Alert, User, HospitalInventory
 )
-from app.utils.auth import get_current_active_user_from_cookie
+from app.utils.auth import check_user_roles_from_cookie, get_current_active_user_from_cookie
+from app.utils.report_queries import EXPENSE_STATUSES, REVENUE_STATUSES
+from app.utils.rollups import ordering_customer_ids, purchase_totals_by_status, sales_totals_by_status, sum_totals
+from app.utils.report_cache import INVENTORY_TABLES, PURCHASE_TABLES, ROLLUP_TABLES, SALES_TABLES, cached_report
+from app.utils.change_feed import change_feed
+from app.utils.activity import ACTIVITY_PAGE_SIZE, activity_feed, as_activity
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Set, Tuple
+import asyncio
+import json
+import os
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+# Tables read by calculate_dashboard_stats
+DASHBOARD_STATS_TABLES = SALES_TABLES + PURCHASE_TABLES + INVENTORY_TABLES + ROLLUP_TABLES + ("users",)
+
+# Seconds between keep-alive comments (and a re-check of the stats) on an idle event stream
+DASHBOARD_STREAM_HEARTBEAT = int(os.getenv("DASHBOARD_STREAM_HEARTBEAT", "15"))
+
+# Pause after a change so a burst of commits is pushed once
+DASHBOARD_STREAM_COALESCE = float(os.getenv("DASHBOARD_STREAM_COALESCE", "0.5"))
+
+# Most new alerts pushed per change
+DASHBOARD_STREAM_ALERT_LIMIT = 20
+
 @router.get("/", response_class=HTMLResponse)
 async def dashboard(
     request: Request, 
     current_user: User = Depends(get_current_active_user_from_cookie),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Main dashboard with role-based data - All authenticated users"""
+    return await db.run_sync(render_dashboard, request, current_user)
+
+def render_dashboard(db: Session, request: Request, current_user: User):
+    """Build the dashboard page inside the async session's sync context"""
     
     # Get current date for calculations
     now = datetime.utcnow()
@@ -31,13 +56,14 @@ async def dashboard(
     # Calculate real-time statistics based on user role
     if current_user.role in ["admin", "manager"]:
         # Full warehouse statistics for admin and manager
-        stats = calculate_dashboard_stats(db, now, thirty_days_ago)
-        recent_activities = get_recent_activities(db)
+        stats = get_cached_dashboard_stats(db, now, thirty_days_ago)
+        activities = get_recent_activities(db)
         alerts = get_active_alerts(db)
         template_data = {
             "request": request,
             "stats": stats,
-            "recent_activities": recent_activities,
+            "recent_activities": [as_activity(event) for event in activities.items],
+            "activity_cursor": activities.next_cursor,
             "alerts": alerts,
             "now": now,
             "current_user": current_user,
@@ -46,12 +72,13 @@ async def dashboard(
     else:
         # Customer-facing dashboard for staff (hospital buyers)
         stats = calculate_staff_dashboard_stats(db, now, thirty_days_ago, current_user)
-        recent_activities = get_staff_recent_activities(db, current_user)
+        activities = get_staff_recent_activities(db, current_user)
         available_products = get_available_products_for_staff(db)
         template_data = {
             "request": request,
             "stats": stats,
-            "recent_activities": recent_activities,
+            "recent_activities": [as_activity(event) for event in activities.items] if activities else [],
+            "activity_cursor": activities.next_cursor if activities else None,
             "available_products": available_products,
             "now": now,
             "current_user": current_user,
@@ -61,163 +88,227 @@ async def dashboard(
     return templates.TemplateResponse("dashboard.html", template_data)
 
 @router.get("/api/stats")
-async def get_dashboard_stats(db: Session = Depends(get_db)):
+async def get_dashboard_stats(db: AsyncSession = Depends(get_async_db)):
     """API endpoint for dashboard statistics"""
     now = datetime.utcnow()
     thirty_days_ago = now - timedelta(days=30)
     
-    stats = calculate_dashboard_stats(db, now, thirty_days_ago)
+    stats = await db.run_sync(get_cached_dashboard_stats, now, thirty_days_ago)
     return stats
 
-def calculate_dashboard_stats(db: Session, now: datetime, thirty_days_ago: datetime) -> Dict[str, Any]:
-    """Calculate comprehensive dashboard statistics"""
-    
-    # Product statistics
-    total_products = db.query(Product).filter(Product.is_active == True).count()
-    active_products = db.query(Product).filter(
-        Product.is_active == True,
-        Product.id.in_(
-            db.query(InventoryItem.product_id).filter(InventoryItem.quantity_available > 0)
-        )
-    ).count()
-    
-    # Inventory statistics
-    inventory_items = db.query(InventoryItem).filter(InventoryItem.quantity_available > 0).all()
-    total_inventory_value = sum([item.quantity_available * item.cost_price for item in inventory_items])
-    
-    # Low stock alerts
-    low_stock_items = db.query(InventoryItem).join(Product).filter(
-        InventoryItem.quantity_available <= Product.reorder_point,
-        InventoryItem.quantity_available > 0
-    ).count()
-    
-    # Expiring soon alerts
-    expiring_soon = db.query(InventoryItem).filter(
-        InventoryItem.expiry_date.isnot(None),
-        InventoryItem.expiry_date <= now + timedelta(days=30),
-        InventoryItem.expiry_date > now,
-        InventoryItem.quantity_available > 0
-    ).count()
-    
-    # Pending user approvals (admin/manager only)
-    pending_users = db.query(User).filter(
+def get_cached_dashboard_stats(db: Session, now: datetime, thirty_days_ago: datetime) -> Dict[str, Any]:
+    """Dashboard statistics shared by every admin/manager viewer until the next write"""
+    return cached_report(
+        "dashboard_stats", lambda: calculate_dashboard_stats(db, now, thirty_days_ago),
+        DASHBOARD_STATS_TABLES, thirty_days_ago, now
+    )
+
+# Older activity feed entries ("load more") - staff see their hospital's scope
+@router.get("/api/activity")
+async def get_activity(
+    after: Optional[str] = Query(None),
+    limit: int = Query(ACTIVITY_PAGE_SIZE),
+    current_user: User = Depends(get_current_active_user_from_cookie),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """One page of the activity feed, newest first, continuing after the cursor"""
+    return await db.run_sync(build_activity_page, current_user, after, limit)
+
+def build_activity_page(db: Session, current_user: User, after: Optional[str], limit: int) -> Dict[str, Any]:
+    if current_user.role in ["admin", "manager"]:
+        page = activity_feed(db, after=after, limit=limit)
+    elif current_user.hospital_id:
+        page = activity_feed(db, hospital_id=current_user.hospital_id, after=after, limit=limit)
+    else:
+        return {"activities": [], "has_next": False, "next_cursor": None}
+    activities = []
+    for event in page.items:
+        activity = as_activity(event)
+        activity["timestamp"] = activity["timestamp"].strftime('%Y-%m-%d %H:%M')
+        activities.append(activity)
+    return {"activities": activities, "has_next": page.has_next, "next_cursor": page.next_cursor}
+
+# Live dashboard updates (admin/manager) - replaces the periodic page reloads
+@router.get("/api/stream")
+async def dashboard_stream(
+    request: Request,
+    current_user: User = Depends(check_user_roles_from_cookie(["admin", "manager"]))
+):
+    """Server-Sent Events: changed stat fields ("stats") and new alerts ("alert") as writes commit"""
+    return StreamingResponse(
+        dashboard_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _alert_payload(alert: Alert) -> Dict[str, Any]:
+    return {
+        "id": alert.id,
+        "alert_type": alert.alert_type,
+        "severity": alert.severity,
+        "message": alert.message,
+        "created_at": alert.created_at.strftime('%Y-%m-%d %H:%M') if alert.created_at else None
+    }
+
+def build_stream_snapshot(db: Session) -> Tuple[Dict[str, Any], int]:
+    """Current stats and the newest alert id, the baseline later pushes are diffed against"""
+    now = datetime.utcnow()
+    stats = get_cached_dashboard_stats(db, now, now - timedelta(days=30))
+    last_alert_id = db.query(func.max(Alert.id)).scalar() or 0
+    return stats, last_alert_id
+
+def build_stream_changes(
+    db: Session,
+    sent_stats: Dict[str, Any],
+    last_alert_id: int,
+    tables: Set[str]
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Stat fields that differ from what the client has, and alerts raised since last_alert_id
+
+    An empty tables set means "re-check everything" (idle heartbeat). Stats come
+    through the report cache, so concurrent streams share one recomputation.
+    """
+    changed: Dict[str, Any] = {}
+    if not tables or tables & set(DASHBOARD_STATS_TABLES):
+        now = datetime.utcnow()
+        stats = get_cached_dashboard_stats(db, now, now - timedelta(days=30))
+        changed = {
+            field: value for field, value in stats.items()
+            if field != "last_updated" and sent_stats.get(field) != value
+        }
+        if changed:
+            changed["last_updated"] = stats["last_updated"]
+
+    alerts: List[Dict[str, Any]] = []
+    if not tables or "alerts" in tables:
+        alerts = [
+            _alert_payload(alert) for alert in db.query(Alert).filter(
+                Alert.id > last_alert_id,
+                Alert.is_acknowledged == False
+            ).order_by(Alert.id).limit(DASHBOARD_STREAM_ALERT_LIMIT).all()
+        ]
+    return changed, alerts
+
+async def dashboard_events(request: Request, heartbeat: float = DASHBOARD_STREAM_HEARTBEAT):
+    """Event stream for one dashboard tab, woken by the in-process change feed"""
+    subscription = change_feed.subscribe()
+    try:
+        async with AsyncSessionLocal() as db:
+            sent_stats, last_alert_id = await db.run_sync(build_stream_snapshot)
+        yield _sse("stats", sent_stats)
+
+        while not await request.is_disconnected():
+            tables = await subscription.wait(heartbeat)
+            if tables:
+                await asyncio.sleep(DASHBOARD_STREAM_COALESCE)
+                tables |= subscription.drain()
+
+            # Short-lived session per push; the stream itself holds no connection
+            async with AsyncSessionLocal() as db:
+                changed, alerts = await db.run_sync(build_stream_changes, sent_stats, last_alert_id, tables)
+            if changed:
+                sent_stats.update(changed)
+                yield _sse("stats", changed)
+            for alert in alerts:
+                last_alert_id = max(last_alert_id, alert["id"])
+                yield _sse("alert", alert)
+            if not tables and not changed and not alerts:
+                yield ": keep-alive\n\n"
+    finally:
+        change_feed.unsubscribe(subscription)
+
+def _one_row(*aggregates):
+    """Cross-join single-row aggregate subqueries so every figure comes back in one row"""
+    first, *rest = aggregates
+    statement = select(*(column for aggregate in aggregates for column in aggregate.c)).select_from(first)
+    for aggregate in rest:
+        statement = statement.join(aggregate, true())
+    return statement
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def dashboard_stats_statement(now: datetime, thirty_days_ago: datetime, active_customer_ids) -> Select:
+    """Every live-table figure of the admin/manager dashboard as one SELECT"""
+    in_stock = select(
+        InventoryItem.product_id,
+        InventoryItem.quantity_available,
+        InventoryItem.cost_price,
+        InventoryItem.expiry_date
+    ).where(InventoryItem.quantity_available > 0).cte("in_stock")
+
+    products = select(
+        func.count().label("total_products"),
+        _count_where(Product.id.in_(select(in_stock.c.product_id))).label("active_products")
+    ).where(Product.is_active == True).subquery("product_stats")
+
+    inventory = select(
+        func.coalesce(func.sum(in_stock.c.quantity_available * in_stock.c.cost_price), 0).label("total_inventory_value"),
+        _count_where(and_(
+            in_stock.c.expiry_date.isnot(None),
+            in_stock.c.expiry_date <= now + timedelta(days=30),
+            in_stock.c.expiry_date > now
+        )).label("expiring_soon")
+    ).subquery("inventory_stats")
+
+    low_stock = select(func.count().label("low_stock_alerts")).select_from(
+        in_stock.join(Product, Product.id == in_stock.c.product_id)
+    ).where(in_stock.c.quantity_available <= Product.reorder_point).subquery("low_stock_stats")
+
+    users = select(func.count().label("pending_users")).where(
         User.requires_approval == True,
         User.is_approved == False
-    ).count()
-    
-    # Order statistics
-    total_purchase_orders = db.query(PurchaseOrder).count()
-    pending_purchase_orders = db.query(PurchaseOrder).filter(
-        PurchaseOrder.status.in_(["pending", "confirmed", "shipped"])
-    ).count()
-    
-    total_sales_orders = db.query(SalesOrder).count()
-    pending_sales_orders = db.query(SalesOrder).filter(
-        SalesOrder.status.in_(["pending", "confirmed", "shipped"])
-    ).count()
-    
-    # Customer statistics
-    total_customers = db.query(Customer).filter(Customer.is_active == True).count()
-    active_customers = db.query(Customer).filter(
-        Customer.is_active == True,
-        Customer.id.in_(
-            db.query(SalesOrder.customer_id).filter(
-                SalesOrder.order_date >= thirty_days_ago
-            )
-        )
-    ).count()
-    
-    # Vendor statistics
-    total_vendors = db.query(Vendor).filter(Vendor.is_active == True).count()
-    
-    # Monthly trends
-    monthly_purchase_value = db.query(func.sum(PurchaseOrder.total_amount)).filter(
-        PurchaseOrder.order_date >= thirty_days_ago,
-        PurchaseOrder.status.in_(["received", "shipped"])
-    ).scalar() or 0
-    
-    monthly_sales_value = db.query(func.sum(SalesOrder.total_amount)).filter(
-        SalesOrder.order_date >= thirty_days_ago,
-        SalesOrder.status.in_(["delivered", "shipped"])
-    ).scalar() or 0
-    
-    # Stock movements
-    recent_movements = db.query(StockMovement).filter(
+    ).subquery("user_stats")
+
+    open_statuses = ["pending", "confirmed", "shipped"]
+    purchases = select(
+        func.count().label("total_purchase_orders"),
+        _count_where(PurchaseOrder.status.in_(open_statuses)).label("pending_purchase_orders")
+    ).subquery("purchase_stats")
+    sales = select(
+        func.count().label("total_sales_orders"),
+        _count_where(SalesOrder.status.in_(open_statuses)).label("pending_sales_orders")
+    ).subquery("sales_stats")
+
+    customers = select(
+        func.count().label("total_customers"),
+        _count_where(Customer.id.in_(list(active_customer_ids))).label("active_customers")
+    ).where(Customer.is_active == True).subquery("customer_stats")
+    vendors = select(func.count().label("total_vendors")).where(Vendor.is_active == True).subquery("vendor_stats")
+    movements = select(func.count().label("recent_movements")).where(
         StockMovement.created_at >= thirty_days_ago
-    ).count()
-    
-    return {
-        "total_products": total_products,
-        "active_products": active_products,
-        "total_inventory_value": float(total_inventory_value),
-        "low_stock_alerts": low_stock_items,
-        "expiring_soon": expiring_soon,
-        "total_purchase_orders": total_purchase_orders,
-        "pending_purchase_orders": pending_purchase_orders,
-        "total_sales_orders": total_sales_orders,
-        "pending_sales_orders": pending_sales_orders,
-        "total_customers": total_customers,
-        "active_customers": active_customers,
-        "total_vendors": total_vendors,
-        "monthly_purchase_value": float(monthly_purchase_value),
-        "monthly_sales_value": float(monthly_sales_value),
-        "recent_movements": recent_movements,
-        "pending_users": pending_users,
-        "last_updated": now.isoformat()
-    }
+    ).subquery("movement_stats")
 
-def get_recent_activities(db: Session, limit: int = 10):
-    """Get recent system activities"""
-    activities = []
-    
-    # Recent stock movements
-    movements = db.query(StockMovement).order_by(
-        desc(StockMovement.created_at)
-    ).limit(limit).all()
-    
-    for movement in movements:
-        product = db.query(Product).filter(Product.id == movement.product_id).first()
-        if product:
-            activities.append({
-                "type": "stock_movement",
-                "message": f"{movement.movement_type.title()} {abs(movement.quantity)} units of {product.name}",
-                "timestamp": movement.created_at,
-                "icon": "fas fa-boxes"
-            })
-    
-    # Recent purchase orders
-    recent_purchase_orders = db.query(PurchaseOrder).order_by(
-        desc(PurchaseOrder.order_date)
-    ).limit(5).all()
-    
-    for order in recent_purchase_orders:
-        vendor = db.query(Vendor).filter(Vendor.id == order.vendor_id).first()
-        if vendor:
-            activities.append({
-                "type": "purchase_order",
-                "message": f"Purchase order {order.po_number} created for {vendor.name}",
-                "timestamp": order.order_date,
-                "icon": "fas fa-shopping-cart"
-            })
-    
-    # Recent sales orders
-    recent_sales_orders = db.query(SalesOrder).order_by(
-        desc(SalesOrder.order_date)
-    ).limit(5).all()
-    
-    for order in recent_sales_orders:
-        customer = db.query(Customer).filter(Customer.id == order.customer_id).first()
-        if customer:
-            activities.append({
-                "type": "sales_order",
-                "message": f"Sales order {order.order_number} created for {customer.name}",
-                "timestamp": order.order_date,
-                "icon": "fas fa-truck"
-            })
-    
-    # Sort by timestamp and return top activities
-    activities.sort(key=lambda x: x["timestamp"], reverse=True)
-    return activities[:limit]
+    return _one_row(products, inventory, low_stock, users, purchases, sales, customers, vendors, movements)
+
+def calculate_dashboard_stats(db: Session, now: datetime, thirty_days_ago: datetime) -> Dict[str, Any]:
+    """Calculate comprehensive dashboard statistics
+
+    The order values and ordering customers come from the daily rollups (plus
+    today's live rows); everything else is one statement over the live tables.
+    """
+    recent_customer_ids = ordering_customer_ids(db, thirty_days_ago, now)
+    _, monthly_purchase_value = sum_totals(
+        purchase_totals_by_status(db, thirty_days_ago, now), EXPENSE_STATUSES
+    )
+    _, monthly_sales_value = sum_totals(
+        sales_totals_by_status(db, thirty_days_ago, now), REVENUE_STATUSES
+    )
+
+    row = db.execute(dashboard_stats_statement(now, thirty_days_ago, recent_customer_ids)).mappings().one()
+    stats = {key: int(value or 0) for key, value in row.items()}
+    stats["total_inventory_value"] = float(row["total_inventory_value"] or 0)
+    stats["monthly_purchase_value"] = float(monthly_purchase_value)
+    stats["monthly_sales_value"] = float(monthly_sales_value)
+    stats["last_updated"] = now.isoformat()
+    return stats
+
+def get_recent_activities(db: Session, limit: int = ACTIVITY_PAGE_SIZE):
+    """Newest entries of the warehouse-wide activity feed"""
+    return activity_feed(db, limit=limit)
 
 def get_active_alerts(db: Session, limit: int = 5):
     """Get active system alerts"""
@@ -244,108 +335,52 @@ def calculate_staff_dashboard_stats(db: Session, now: datetime, thirty_days_ago:
             "last_updated": now.isoformat()
         }
     
-    # Get available products (what they can order from warehouse)
-    total_products = db.query(Product).filter(Product.is_active == True).count()
-    available_products = db.query(Product).filter(
-        Product.is_active == True,
-        Product.id.in_(
-            db.query(InventoryItem.product_id).filter(InventoryItem.quantity_available > 0)
-        )
-    ).count()
-    
-    # Get products with stock (what they can actually order)
-    products_with_stock = db.query(Product).join(InventoryItem).filter(
-        Product.is_active == True,
-        InventoryItem.quantity_available > 0,
-        InventoryItem.status == "available"
-    ).distinct().count()
-    
-    # Get their hospital's sales orders only
-    total_sales_orders = db.query(SalesOrder).filter(
-        SalesOrder.customer_id == current_user.hospital_id
-    ).count()
-    pending_sales_orders = db.query(SalesOrder).filter(
-        SalesOrder.customer_id == current_user.hospital_id,
-        SalesOrder.status.in_(["pending", "confirmed", "shipped"])
-    ).count()
-    
-    # Get their hospital's inventory (from HospitalInventory table)
-    from app.models.models import HospitalInventory
-    total_inventory_items = db.query(HospitalInventory).filter(
-        HospitalInventory.hospital_id == current_user.hospital_id
-    ).count()
-    
-    # Calculate total value of their hospital's inventory
-    hospital_inventory = db.query(HospitalInventory).filter(
-        HospitalInventory.hospital_id == current_user.hospital_id
-    ).all()
-    
-    total_inventory_value = 0
-    for item in hospital_inventory:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
-        if product and product.unit_price:
-            total_inventory_value += item.current_stock * float(product.unit_price)
-    
-    # Get recent stock movements for their hospital only
-    recent_movements = db.query(StockMovement).filter(
+    row = db.execute(staff_dashboard_stats_statement(current_user.hospital_id, thirty_days_ago)).mappings().one()
+    stats = {key: int(value or 0) for key, value in row.items()}
+    stats["total_inventory_value"] = float(row["total_inventory_value"] or 0)
+    stats["last_updated"] = now.isoformat()
+    return stats
+
+def staff_dashboard_stats_statement(hospital_id: int, thirty_days_ago: datetime) -> Select:
+    """Every figure of a hospital buyer's dashboard as one SELECT"""
+    with_stock = select(InventoryItem.product_id).where(InventoryItem.quantity_available > 0)
+    available_with_stock = with_stock.where(InventoryItem.status == "available")
+    products = select(
+        func.count().label("total_products"),
+        # What they can order from the warehouse / what is actually sellable now
+        _count_where(Product.id.in_(with_stock)).label("available_products"),
+        _count_where(Product.id.in_(available_with_stock)).label("products_with_stock")
+    ).where(Product.is_active == True).subquery("product_stats")
+
+    # Their hospital's sales orders only
+    sales = select(
+        func.count().label("total_sales_orders"),
+        _count_where(SalesOrder.status.in_(["pending", "confirmed", "shipped"])).label("pending_sales_orders")
+    ).where(SalesOrder.customer_id == hospital_id).subquery("sales_stats")
+
+    # Their hospital's own stock (HospitalInventory), valued at list price
+    hospital_stock = select(
+        func.count().label("total_inventory_items"),
+        func.coalesce(func.sum(
+            func.coalesce(HospitalInventory.current_stock, 0) * func.coalesce(Product.unit_price, 0)
+        ), 0).label("total_inventory_value")
+    ).select_from(HospitalInventory).outerjoin(
+        Product, Product.id == HospitalInventory.product_id
+    ).where(HospitalInventory.hospital_id == hospital_id).subquery("hospital_stock_stats")
+
+    # StockMovement has no hospital_id, so this is warehouse-wide
+    movements = select(func.count().label("recent_movements")).where(
         StockMovement.created_at >= thirty_days_ago,
         StockMovement.movement_type.in_(["received", "available"])
-    ).count()  # Note: StockMovement doesn't have hospital_id, so this is warehouse-wide
-    
-    return {
-        "total_products": total_products,
-        "available_products": available_products,
-        "products_with_stock": products_with_stock,
-        "total_inventory_value": float(total_inventory_value),
-        "total_sales_orders": total_sales_orders,
-        "pending_sales_orders": pending_sales_orders,
-        "total_inventory_items": total_inventory_items,
-        "recent_movements": recent_movements,
-        "last_updated": now.isoformat()
-    }
+    ).subquery("movement_stats")
 
-def get_staff_recent_activities(db: Session, current_user: User, limit: int = 10):
-    """Get customer-facing recent activities for staff users (hospital buyers)"""
-    activities = []
-    
-    # Check if staff user has hospital assigned
+    return _one_row(products, sales, hospital_stock, movements)
+
+def get_staff_recent_activities(db: Session, current_user: User, limit: int = ACTIVITY_PAGE_SIZE):
+    """Newest feed entries for a hospital buyer: their hospital's orders plus stock arriving in the warehouse"""
     if not current_user.hospital_id:
-        return activities
-    
-    # Recent stock movements (what's been received/available for ordering)
-    # Note: StockMovement doesn't have hospital_id, so this shows warehouse-wide movements
-    movements = db.query(StockMovement).filter(
-        StockMovement.movement_type.in_(["received", "available"])
-    ).order_by(desc(StockMovement.created_at)).limit(limit//2).all()
-    
-    for movement in movements:
-        product = db.query(Product).filter(Product.id == movement.product_id).first()
-        if product:
-            activities.append({
-                "type": "stock_movement",
-                "message": f"{movement.movement_type.title()} {abs(movement.quantity)} units of {product.name}",
-                "timestamp": movement.created_at,
-                "icon": "fas fa-boxes"
-            })
-    
-    # Recent sales orders (their hospital's orders only)
-    recent_sales_orders = db.query(SalesOrder).filter(
-        SalesOrder.customer_id == current_user.hospital_id
-    ).order_by(desc(SalesOrder.order_date)).limit(limit//2).all()
-    
-    for order in recent_sales_orders:
-        customer = db.query(Customer).filter(Customer.id == order.customer_id).first()
-        if customer:
-            activities.append({
-                "type": "sales_order",
-                "message": f"Order {order.order_number} - {order.status.title()}",
-                "timestamp": order.order_date,
-                "icon": "fas fa-shopping-cart"
-            })
-    
-    # Sort by timestamp and return top activities
-    activities.sort(key=lambda x: x["timestamp"], reverse=True)
-    return activities[:limit]
+        return None
+    return activity_feed(db, hospital_id=current_user.hospital_id, limit=limit)
 
 def get_available_products_for_staff(db: Session, limit: int = 8):
     """Get products available for ordering by staff users"""
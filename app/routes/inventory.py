@@ -1,12 +1,19 @@
 # app/routes/inventory.py
-from fastapi import APIRouter, Depends, Request, HTTPException, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Depends, Request, HTTPException, Form, Query
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from app.database import get_db
-from app.models.models import InventoryItem, Product, StockMovement, User, Category, SalesOrder, SalesOrderItem, HospitalInventory
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select
+from app.database import get_async_db
+from app.models.models import InventoryItem, Product, StockMovement, User, Category, SalesOrder, SalesOrderItem, HospitalInventory, ProductStockSummary
 from app.utils.auth import get_current_active_user_from_cookie, check_user_role_from_cookie, check_user_roles_from_cookie
+from app.utils.activity import record_stock_movements
+from app.utils.alert_engine import evaluate_stock_alerts
+from app.utils.goods_receipt import read_receipt_csv, read_receipt_json, receive_goods
+from app.utils.exports import csv_response, inventory_export, parse_export_dates, stock_movement_export
+from app.utils.stock_summary import refresh_product_stock_summary, get_stock_summaries, get_available_stock
+from app.utils.stock_mutations import add_stock, take_stock
 from datetime import datetime
 from typing import Optional
 
@@ -18,25 +25,29 @@ templates = Jinja2Templates(directory="app/templates")
 async def inventory_overview(
     request: Request,
     current_user: User = Depends(get_current_active_user_from_cookie),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display inventory overview - Role-based view"""
     
     if current_user.role in ["admin", "manager"]:
         # Warehouse management view for admin/manager
-        return await warehouse_inventory_view(request, current_user, db)
+        return await db.run_sync(warehouse_inventory_view, request, current_user)
     else:
         # Hospital inventory view for staff (hospital buyers)
-        return await hospital_inventory_view(request, current_user, db)
+        return await db.run_sync(hospital_inventory_view, request, current_user)
 
 # Staff-specific inventory page for hospital buyers
 @router.get("/available", response_class=HTMLResponse)
 async def staff_inventory_available(
     request: Request,
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display available products for staff users (hospital buyers) - Enhanced view"""
+    return await db.run_sync(render_staff_inventory_available, request, current_user)
+
+def render_staff_inventory_available(db: Session, request: Request, current_user: User):
+    """Build the staff available-products page"""
     
     # For staff users, show only their hospital's inventory
     if current_user.role == "staff" and current_user.hospital_id:
@@ -54,11 +65,11 @@ async def staff_inventory_available(
         ).order_by(Product.name).all()
     else:
         # For managers, show all available products
-        available_products = db.query(Product).join(InventoryItem).filter(
+        available_products = db.query(Product).join(ProductStockSummary).filter(
             Product.is_active == True,
-            InventoryItem.quantity_available > 0,
-            InventoryItem.status == "available"
-        ).distinct().order_by(Product.name).all()
+            ProductStockSummary.quantity_available > 0
+        ).order_by(Product.name).all()
+    stock_summaries = get_stock_summaries(db, [product.id for product in available_products])
     
     # Enhanced product data with stock information for staff users
     enhanced_products = []
@@ -69,7 +80,7 @@ async def staff_inventory_available(
     
     for product in available_products:
         # Get total available stock for this product
-        total_stock = sum(item.quantity_available for item in product.inventory_items if item.status == "available")
+        total_stock = get_available_stock(stock_summaries, product.id)
         
         # Determine stock status
         if total_stock == 0:
@@ -134,10 +145,11 @@ async def staff_inventory_available(
         }
     })
 
-async def warehouse_inventory_view(request: Request, current_user: User, db: Session):
+def warehouse_inventory_view(db: Session, request: Request, current_user: User):
     """Warehouse management inventory view for admin/manager users"""
-    # Get all products to calculate total stock levels
-    products = db.query(Product).all()
+    # Get all products with their pre-aggregated stock levels
+    products = db.query(Product).options(joinedload(Product.category)).all()
+    stock_summaries = get_stock_summaries(db)
     
     # Calculate statistics based on products (not inventory items)
     total_items = len(products)
@@ -151,7 +163,7 @@ async def warehouse_inventory_view(request: Request, current_user: User, db: Ses
     
     for product in products:
         # Get total available stock for this product
-        total_stock = sum(item.quantity_available for item in product.inventory_items if item.status == "available")
+        total_stock = get_available_stock(stock_summaries, product.id)
         
         # Determine stock status
         if total_stock == 0:
@@ -216,14 +228,14 @@ async def warehouse_inventory_view(request: Request, current_user: User, db: Ses
         }
     })
 
-async def customer_inventory_view(request: Request, current_user: User, db: Session):
+def customer_inventory_view(db: Session, request: Request, current_user: User):
     """Hospital inventory view for staff users (hospital buyers) - Shows their own hospital stock"""
     # Get products with available stock (what they can order)
-    available_products = db.query(Product).join(InventoryItem).filter(
+    available_products = db.query(Product).join(ProductStockSummary).filter(
         Product.is_active == True,
-        InventoryItem.quantity_available > 0,
-        InventoryItem.status == "available"
-    ).distinct().order_by(Product.name).all()
+        ProductStockSummary.quantity_available > 0
+    ).order_by(Product.name).all()
+    stock_summaries = get_stock_summaries(db, [product.id for product in available_products])
     
     # Enhanced product data with stock information for staff users
     enhanced_products = []
@@ -234,7 +246,7 @@ async def customer_inventory_view(request: Request, current_user: User, db: Sess
     
     for product in available_products:
         # Get total available stock for this product
-        total_stock = sum(item.quantity_available for item in product.inventory_items if item.status == "available")
+        total_stock = get_available_stock(stock_summaries, product.id)
         
         # Determine stock status
         if total_stock == 0:
@@ -300,7 +312,7 @@ async def customer_inventory_view(request: Request, current_user: User, db: Sess
     })
 
 # Hospital inventory view for staff users (hospital buyers)
-async def hospital_inventory_view(request: Request, current_user: User, db: Session):
+def hospital_inventory_view(db: Session, request: Request, current_user: User):
     """Hospital inventory view for staff users (hospital buyers) - Shows their own hospital stock"""
     
     if not current_user.hospital_id:
@@ -339,6 +351,7 @@ async def hospital_inventory_view(request: Request, current_user: User, db: Sess
         Product.id.in_(product_ids),
         Product.is_active == True
     ).order_by(Product.name).all()
+    stock_summaries = get_stock_summaries(db, product_ids)
     
     # Enhanced product data with REAL hospital inventory information
     enhanced_products = []
@@ -380,7 +393,7 @@ async def hospital_inventory_view(request: Request, current_user: User, db: Sess
             total_value += hospital_value
         
         # Get warehouse stock for reference
-        warehouse_stock = sum(item.quantity_available for item in product.inventory_items if item.status == "available")
+        warehouse_stock = get_available_stock(stock_summaries, product.id)
         
         # Enhanced product data for HOSPITAL inventory
         enhanced_product = {
@@ -437,10 +450,11 @@ async def hospital_inventory_view(request: Request, current_user: User, db: Sess
 async def receive_inventory_page(
     request: Request,
     current_user: User = Depends(check_user_role_from_cookie("manager")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display receive inventory form - Admin and Manager only"""
-    products = db.query(Product).filter(Product.is_active == True).all()
+    result = await db.execute(select(Product).filter(Product.is_active == True))
+    products = result.scalars().all()
     return templates.TemplateResponse("inventory/receive.html", {
         "request": request,
         "products": products,
@@ -459,16 +473,33 @@ async def receive_inventory(
     expiry_date: Optional[str] = Form(None),
     batch_number: str = Form(...),
     current_user: User = Depends(check_user_role_from_cookie("manager")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle receive inventory form submission"""
+    return await db.run_sync(
+        process_receive_inventory, request, product_id, quantity, cost_price,
+        selling_price, expiry_date, batch_number, current_user
+    )
+
+def process_receive_inventory(
+    db: Session,
+    request: Request,
+    product_id: int,
+    quantity: int,
+    cost_price: float,
+    selling_price: float,
+    expiry_date: Optional[str],
+    batch_number: str,
+    current_user: User
+):
+    """Receive stock for a product and record the movement"""
     product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+    if not product or quantity <= 0:
         products = db.query(Product).filter(Product.is_active == True).all()
         return templates.TemplateResponse("inventory/receive.html", {
             "request": request,
             "products": products,
-            "error": "Product not found",
+            "error": "Product not found" if not product else "Quantity must be greater than 0",
             "user_role": current_user.role
         })
     
@@ -491,7 +522,7 @@ async def receive_inventory(
     
     if inventory_item:
         # Update existing inventory
-        inventory_item.quantity_available += quantity
+        add_stock(db, inventory_item.id, quantity)
         inventory_item.cost_price = cost_price  # Update cost price
         inventory_item.selling_price = selling_price  # Update selling price
         if parsed_expiry_date:
@@ -519,19 +550,76 @@ async def receive_inventory(
         notes=f"Received {quantity} units of {product.name}"
     )
     db.add(movement)
+    record_stock_movements(db, [movement], current_user)
+    refresh_product_stock_summary(db, [product_id])
+    evaluate_stock_alerts(db, product_ids=[product_id])
     
     db.commit()
     
     return RedirectResponse(url="/inventory", status_code=302)
 
+# Bulk goods receipt API - Admin and Manager only
+@router.post("/receive/bulk")
+async def receive_inventory_bulk(
+    request: Request,
+    current_user: User = Depends(check_user_role_from_cookie("manager")),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Receive a multi-line delivery from JSON or CSV in one transaction
+
+    JSON: {"reference_number": ..., "allow_partial": false, "lines": [{"sku" or "product_id",
+    "batch_number", "quantity", "cost_price", "selling_price", "expiry_date", "location"}]}.
+    CSV: the same line fields as columns, sent as a text/csv body or a multipart "file"
+    field; reference_number and allow_partial go in the query string.
+    """
+    content_type = request.headers.get("content-type", "")
+    reference_number = request.query_params.get("reference_number")
+    allow_partial = request.query_params.get("allow_partial", "").lower() in ("1", "true", "yes")
+
+    if content_type.startswith("application/json"):
+        try:
+            data = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid JSON body")
+        if not isinstance(data, dict) or not isinstance(data.get("lines"), list):
+            raise HTTPException(status_code=400, detail="Body must be an object with a lines list")
+        lines = read_receipt_json(data["lines"])
+        reference_number = data.get("reference_number") or reference_number
+        allow_partial = data.get("allow_partial", allow_partial)
+        if not isinstance(allow_partial, bool):
+            raise HTTPException(status_code=400, detail="allow_partial must be true or false")
+    elif content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "read"):
+            raise HTTPException(status_code=400, detail="Upload the receipt CSV in a file field")
+        lines = read_receipt_csv((await upload.read()).decode("utf-8-sig"))
+    elif content_type.startswith("text/csv"):
+        lines = read_receipt_csv((await request.body()).decode("utf-8-sig"))
+    else:
+        raise HTTPException(status_code=415, detail="Send the receipt as JSON or CSV")
+
+    try:
+        result = await db.run_sync(receive_goods, lines, current_user, reference_number, allow_partial)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Nothing is booked when an all-or-nothing receipt has invalid lines
+    status_code = 422 if result["failed"] and not result["received"] else 200
+    return JSONResponse(content=result, status_code=status_code)
+
 # Issue inventory page - Admin and Manager only
 @router.get("/issue", response_class=HTMLResponse)
 async def issue_inventory_page(
     request: Request,
     current_user: User = Depends(check_user_role_from_cookie("manager")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display issue inventory form"""
+    return await db.run_sync(render_issue_inventory_page, request, current_user)
+
+def render_issue_inventory_page(db: Session, request: Request, current_user: User):
+    """Build the issue inventory form"""
     inventory_items = db.query(InventoryItem).filter(InventoryItem.quantity_available > 0).all()
     return templates.TemplateResponse("inventory/issue.html", {
         "request": request,
@@ -548,9 +636,20 @@ async def issue_inventory(
     quantity: int = Form(...),
     reason: str = Form(...),
     current_user: User = Depends(check_user_role_from_cookie("manager")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle issue inventory form submission"""
+    return await db.run_sync(process_issue_inventory, request, inventory_item_id, quantity, reason, current_user)
+
+def process_issue_inventory(
+    db: Session,
+    request: Request,
+    inventory_item_id: int,
+    quantity: int,
+    reason: str,
+    current_user: User
+):
+    """Issue stock from an inventory item and record the movement"""
     inventory_item = db.query(InventoryItem).filter(InventoryItem.id == inventory_item_id).first()
     if not inventory_item:
         inventory_items = db.query(InventoryItem).filter(InventoryItem.quantity_available > 0).all()
@@ -561,19 +660,22 @@ async def issue_inventory(
             "user_role": current_user.role
         })
     
-    if inventory_item.quantity_available < quantity:
+    # Update inventory (the availability check is part of the UPDATE)
+    error = None
+    if quantity <= 0:
+        error = "Quantity must be greater than 0"
+    elif not take_stock(db, inventory_item.id, quantity):
+        db.rollback()
+        error = f"Insufficient stock. Available: {inventory_item.quantity_available}"
+    if error:
         inventory_items = db.query(InventoryItem).filter(InventoryItem.quantity_available > 0).all()
         return templates.TemplateResponse("inventory/issue.html", {
             "request": request,
             "inventory_items": inventory_items,
-            "error": f"Insufficient stock. Available: {inventory_item.quantity_available}",
+            "error": error,
             "user_role": current_user.role
         })
     
-    # Update inventory
-    inventory_item.quantity_available -= quantity
-    inventory_item.updated_at = datetime.utcnow()
-    
     # Create stock movement record
     product = db.query(Product).filter(Product.id == inventory_item.product_id).first()
     movement = StockMovement(
@@ -584,6 +686,9 @@ async def issue_inventory(
         notes=f"Issued {quantity} units of {product.name if product else 'Unknown Product'}. Reason: {reason}"
     )
     db.add(movement)
+    record_stock_movements(db, [movement], current_user)
+    refresh_product_stock_summary(db, [inventory_item.product_id])
+    evaluate_stock_alerts(db, inventory_item_ids=[inventory_item.id])
     
     db.commit()
     
@@ -595,7 +700,7 @@ async def receive_stock_api(
     inventory_item_id: int,
     request: Request,
     current_user: User = Depends(check_user_role_from_cookie("manager")),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Receive stock for existing inventory item via API"""
     try:
@@ -606,41 +711,73 @@ async def receive_stock_api(
         if quantity <= 0:
             raise HTTPException(status_code=400, detail="Quantity must be greater than 0")
         
-        inventory_item = db.query(InventoryItem).filter(InventoryItem.id == inventory_item_id).first()
-        if not inventory_item:
-            raise HTTPException(status_code=404, detail="Inventory item not found")
-        
-        # Update inventory quantity
-        inventory_item.quantity_available += quantity
-        inventory_item.updated_at = datetime.utcnow()
-        
-        # Create stock movement record
-        movement = StockMovement(
-            product_id=inventory_item.product_id,
-            movement_type="in",
-            quantity=quantity,
-            reference_number=inventory_item.batch_number,
-            notes=f"Received {quantity} units via API. {notes}"
-        )
-        db.add(movement)
-        
-        db.commit()
-        
-        return {"message": "Stock received successfully", "new_quantity": inventory_item.quantity_available}
+        return await db.run_sync(process_receive_stock, inventory_item_id, quantity, notes, current_user)
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+def process_receive_stock(db: Session, inventory_item_id: int, quantity: int, notes: str, current_user: User):
+    """Add stock to an existing inventory item and record the movement"""
+    inventory_item = db.query(InventoryItem).filter(InventoryItem.id == inventory_item_id).first()
+    if not inventory_item:
+        raise HTTPException(status_code=404, detail="Inventory item not found")
+    
+    # Update inventory quantity
+    add_stock(db, inventory_item.id, quantity)
+    
+    # Create stock movement record
+    movement = StockMovement(
+        product_id=inventory_item.product_id,
+        movement_type="in",
+        quantity=quantity,
+        reference_number=inventory_item.batch_number,
+        notes=f"Received {quantity} units via API. {notes}"
+    )
+    db.add(movement)
+    record_stock_movements(db, [movement], current_user)
+    refresh_product_stock_summary(db, [inventory_item.product_id])
+    evaluate_stock_alerts(db, inventory_item_ids=[inventory_item.id])
+    
+    db.commit()
+    
+    return {"message": "Stock received successfully", "new_quantity": inventory_item.quantity_available}
+
+# CSV exports - registered before /{inventory_item_id} so "export" is not parsed as an id
+@router.get("/export")
+async def export_inventory(
+    current_user: User = Depends(get_current_active_user_from_cookie)
+):
+    """Stream inventory batches as CSV"""
+    # For staff users, export only their hospital's inventory
+    hospital_id = current_user.hospital_id if current_user.role == "staff" else None
+    columns, statement = inventory_export(hospital_id)
+    return csv_response(columns, statement, "inventory_export.csv")
+
+@router.get("/movements/export")
+async def export_stock_movements(
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    current_user: User = Depends(check_user_roles_from_cookie(["manager"]))
+):
+    """Stream stock movements as CSV - Manager and Admin only"""
+    start, end = parse_export_dates(start_date, end_date)
+    columns, statement = stock_movement_export(start, end)
+    return csv_response(columns, statement, "stock_movements_export.csv")
+
 # Inventory item detail page - All authenticated users can view
 @router.get("/{inventory_item_id}", response_class=HTMLResponse)
 async def inventory_item_detail(
     request: Request,
     inventory_item_id: int,
     current_user: User = Depends(get_current_active_user_from_cookie),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display inventory item details"""
+    return await db.run_sync(render_inventory_item_detail, request, inventory_item_id, current_user)
+
+def render_inventory_item_detail(db: Session, request: Request, inventory_item_id: int, current_user: User):
+    """Build the inventory item detail page"""
     inventory_item = db.query(InventoryItem).filter(InventoryItem.id == inventory_item_id).first()
     if not inventory_item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
@@ -662,19 +799,24 @@ async def inventory_item_detail(
 @router.get("/api/inventory")
 async def get_inventory_api(
     current_user: User = Depends(get_current_active_user_from_cookie),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint to get all inventory items"""
-    inventory_items = db.query(InventoryItem).filter(InventoryItem.quantity_available > 0).all()
+    result = await db.execute(select(InventoryItem).filter(InventoryItem.quantity_available > 0))
+    inventory_items = result.scalars().all()
     return {"inventory_items": [{"id": i.id, "product_id": i.product_id, "quantity": i.quantity_available} for i in inventory_items]}
 
 # Staff-specific API endpoint for available products
 @router.get("/api/available-products")
 async def get_available_products_api(
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint to get available products for staff users (hospital buyers)"""
+    return await db.run_sync(build_available_products_payload, current_user)
+
+def build_available_products_payload(db: Session, current_user: User):
+    """Collect available products with stock status for the staff API"""
     
     # For staff users, show only their hospital's inventory
     if current_user.role == "staff" and current_user.hospital_id:
@@ -692,16 +834,16 @@ async def get_available_products_api(
         ).order_by(Product.name).all()
     else:
         # For managers, show all available products
-        available_products = db.query(Product).join(InventoryItem).filter(
+        available_products = db.query(Product).join(ProductStockSummary).filter(
             Product.is_active == True,
-            InventoryItem.quantity_available > 0,
-            InventoryItem.status == "available"
-        ).distinct().order_by(Product.name).all()
+            ProductStockSummary.quantity_available > 0
+        ).order_by(Product.name).all()
+    stock_summaries = get_stock_summaries(db, [product.id for product in available_products])
     
     # Format data for staff users
     products_data = []
     for product in available_products:
-        total_stock = sum(item.quantity_available for item in product.inventory_items if item.status == "available")
+        total_stock = get_available_stock(stock_summaries, product.id)
         
         # Determine stock status
         if total_stock == 0:
@@ -737,72 +879,10 @@ async def get_available_products_api(
 async def get_inventory_item_api(
     inventory_item_id: int,
     current_user: User = Depends(get_current_active_user_from_cookie),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint to get a specific inventory item"""
-    inventory_item = db.query(InventoryItem).filter(InventoryItem.id == inventory_item_id).first()
+    inventory_item = await db.get(InventoryItem, inventory_item_id)
     if not inventory_item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
     return inventory_item
-
-@router.get("/export")
-async def export_inventory(
-    current_user: User = Depends(get_current_active_user_from_cookie),
-    db: Session = Depends(get_db)
-):
-    """Export inventory data as CSV"""
-    from fastapi.responses import StreamingResponse
-    import io
-    import csv
-    
-    # For staff users, export only their hospital's inventory
-    if current_user.role == "staff" and current_user.hospital_id:
-        from app.models.models import HospitalInventory
-        
-        # Get hospital's inventory from HospitalInventory table
-        hospital_inventory = db.query(HospitalInventory).filter(
-            HospitalInventory.hospital_id == current_user.hospital_id
-        ).all()
-        
-        # Get inventory items for the hospital's products
-        product_ids = [item.product_id for item in hospital_inventory]
-        inventory_items = db.query(InventoryItem).filter(
-            InventoryItem.product_id.in_(product_ids)
-        ).all()
-    else:
-        # For admin/manager, export all inventory items
-        inventory_items = db.query(InventoryItem).all()
-    
-    # Create CSV data
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        "Product Name", "SKU", "Category", "Batch Number", 
-        "Quantity Available", "Cost Price", "Selling Price", 
-        "Status", "Received Date", "Expiry Date"
-    ])
-    
-    # Write data
-    for item in inventory_items:
-        writer.writerow([
-            item.product.name,
-            item.product.sku,
-            item.product.category.name if item.product.category else "",
-            item.batch_number,
-            item.quantity_available,
-            float(item.cost_price),
-            float(item.selling_price),
-            item.status,
-            item.received_date.strftime("%Y-%m-%d") if item.received_date else "",
-            item.expiry_date.strftime("%Y-%m-%d") if item.expiry_date else ""
-        ])
-    
-    output.seek(0)
-    
-    return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=inventory_export.csv"}
-    )
\ No newline at end of file
@@ -1,12 +1,15 @@
 # app/routes/products.py
-from fastapi import APIRouter, Depends, Request, HTTPException, Form, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Depends, Request, HTTPException, Form, UploadFile, File, Query
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from app.database import get_db
 from app.models.models import Product, Category, User, Vendor
 from app.utils.auth import get_current_active_user_from_cookie, check_user_role_from_cookie
+from app.utils.pagination import paginate_keyset
+from app.utils.product_import import IMPORT_CHUNK_SIZE, import_products, read_product_rows
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 import os
 
@@ -17,20 +20,26 @@ templates = Jinja2Templates(directory="app/templates")
 @router.get("/", response_class=HTMLResponse)
 async def list_products(
     request: Request,
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    per_page: int = Query(50),
     current_user: User = Depends(get_current_active_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """Display list of all products"""
-    products = db.query(Product).filter(Product.is_active == True).order_by(desc(Product.created_at)).all()
+    pagination = paginate_keyset(
+        db.query(Product).filter(Product.is_active == True), Product.created_at, Product.id,
+        after=after, before=before, per_page=per_page, request=request
+    )
     categories = db.query(Category).order_by(Category.name).all()
     
     return templates.TemplateResponse("products/list.html", {
         "request": request,
-        "products": products,
+        "products": pagination.items,
         "categories": categories,
         "current_user": current_user,
         "user_role": current_user.role,
-        "pagination": {"pages": 1, "page": 1, "has_prev": False, "has_next": False}  # Simple pagination placeholder
+        "pagination": pagination
     })
 
 # Add product page - Admin and Manager only
@@ -96,6 +105,28 @@ async def add_product(
     
     return RedirectResponse(url="/products", status_code=302)
 
+# Bulk catalog import - Admin and Manager only
+@router.post("/import")
+async def import_products_upload(
+    file: UploadFile = File(...),
+    update_existing: bool = Form(True),
+    dry_run: bool = Form(False),
+    chunk_size: int = Form(IMPORT_CHUNK_SIZE),
+    current_user: User = Depends(check_user_role_from_cookie("manager")),
+    db: Session = Depends(get_db)
+):
+    """Upsert products by SKU from a CSV or XLSX upload and return the per-row error report"""
+    if chunk_size < 1:
+        raise HTTPException(status_code=400, detail="chunk_size must be at least 1")
+    try:
+        rows = read_product_rows(file.file, file.filename)
+        report = await run_in_threadpool(
+            import_products, db, rows, chunk_size=chunk_size, update_existing=update_existing, dry_run=dry_run
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(content=report.to_dict())
+
 # Product detail page - All authenticated users can view
 @router.get("/{product_id}", response_class=HTMLResponse)
 async def product_detail(
@@ -201,12 +232,17 @@ async def delete_product(
 # API endpoints for AJAX calls
 @router.get("/api/products")
 async def get_products_api(
+    after: Optional[str] = Query(None),
+    per_page: int = Query(100),
     current_user: User = Depends(get_current_active_user_from_cookie),
     db: Session = Depends(get_db)
 ):
-    """API endpoint to get all products"""
-    products = db.query(Product).filter(Product.is_active == True).all()
-    return {"products": [{"id": p.id, "name": p.name, "sku": p.sku} for p in products]}
+    """API endpoint to list active products, newest first, one cursor page at a time"""
+    page = paginate_keyset(
+        db.query(Product).filter(Product.is_active == True), Product.created_at, Product.id,
+        after=after, per_page=per_page
+    )
+    return {"products": [{"id": p.id, "name": p.name, "sku": p.sku} for p in page.items], **page.to_dict()}
 
 @router.get("/api/products/{product_id}")
 async def get_product_api(
@@ -1,12 +1,16 @@
 # app/routes/purchase_orders.py
-from fastapi import APIRouter, Depends, Request, HTTPException, Form
+from fastapi import APIRouter, Depends, Request, HTTPException, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import desc, func, case
 from app.database import get_db
-from app.models.models import PurchaseOrder, PurchaseOrderItem, Product, Vendor, User, InventoryItem
-from app.utils.auth import get_current_active_user_from_cookie, check_user_role_from_cookie
+from app.models.models import PurchaseOrder, PurchaseOrderItem, Product, Vendor, User, InventoryItem, ProductStockSummary
+from app.utils.auth import get_current_active_user_from_cookie, check_user_role_from_cookie, check_user_roles_from_cookie
+from app.utils.pagination import paginate_keyset
+from app.utils.exports import csv_response, parse_export_dates, purchase_order_export
+from app.utils.order_numbers import next_purchase_order_number
+from app.utils.activity import purchase_order_event, record_activity
 from datetime import datetime
 from typing import Optional
 
@@ -17,19 +21,40 @@ templates = Jinja2Templates(directory="app/templates")
 @router.get("/", response_class=HTMLResponse)
 async def list_purchase_orders(
     request: Request,
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    per_page: int = Query(50),
     current_user: User = Depends(get_current_active_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """Display list of all purchase orders"""
-    purchase_orders = db.query(PurchaseOrder).order_by(desc(PurchaseOrder.order_date)).all()
+    pagination = paginate_keyset(
+        db.query(PurchaseOrder), PurchaseOrder.order_date, PurchaseOrder.id,
+        after=after, before=before, per_page=per_page, request=request
+    )
+    
+    # Header statistics cover all orders, not just the current page
+    now = datetime.utcnow()
+    total_orders, pending_orders, total_value, overdue_orders = db.query(
+        func.count(PurchaseOrder.id),
+        func.coalesce(func.sum(case((PurchaseOrder.status == "pending", 1), else_=0)), 0),
+        func.coalesce(func.sum(PurchaseOrder.total_amount), 0),
+        func.coalesce(func.sum(case((PurchaseOrder.expected_delivery_date < now, 1), else_=0)), 0)
+    ).one()
     
     return templates.TemplateResponse("purchase_orders/list.html", {
         "request": request,
-        "purchase_orders": purchase_orders,
+        "purchase_orders": pagination.items,
+        "stats": {
+            "total_orders": total_orders,
+            "pending_orders": pending_orders,
+            "total_value": float(total_value),
+            "overdue_orders": overdue_orders
+        },
         "current_user": current_user,
         "user_role": current_user.role,
-        "current_datetime": datetime.utcnow(),
-        "pagination": {"pages": 1, "page": 1, "has_prev": False, "has_next": False}  # Simple pagination placeholder
+        "current_datetime": now,
+        "pagination": pagination
     })
 
 # Create purchase order page - Admin and Manager only
@@ -63,7 +88,7 @@ async def create_purchase_order(
 ):
     """Handle create purchase order form submission"""
     # Generate PO number
-    po_number = f"PO-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
+    po_number = next_purchase_order_number(db)
     
     # Parse expected delivery date
     try:
@@ -88,11 +113,26 @@ async def create_purchase_order(
         created_by=current_user.id
     )
     db.add(purchase_order)
+    db.flush()
+    vendor_name = db.query(Vendor.name).filter(Vendor.id == vendor_id).scalar()
+    record_activity(db, [purchase_order_event(purchase_order, "created", vendor_name, current_user)])
     db.commit()
     db.refresh(purchase_order)
     
     return RedirectResponse(url=f"/purchase-orders/{purchase_order.id}", status_code=302)
 
+# CSV export - registered before /{purchase_order_id} so "export" is not parsed as an id
+@router.get("/export")
+async def export_purchase_orders(
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    current_user: User = Depends(check_user_roles_from_cookie(["manager"]))
+):
+    """Stream purchase order lines as CSV - Manager and Admin only"""
+    start, end = parse_export_dates(start_date, end_date)
+    columns, statement = purchase_order_export(start, end)
+    return csv_response(columns, statement, "purchase_orders_export.csv")
+
 # Purchase order detail page - All authenticated users can view
 @router.get("/{purchase_order_id}", response_class=HTMLResponse)
 async def purchase_order_detail(
@@ -163,6 +203,7 @@ async def edit_purchase_order(
             parsed_delivery_date = datetime.strptime(expected_delivery_date, "%Y-%m-%d")
         
         # Update purchase order
+        status_changed = purchase_order.status != status
         purchase_order.vendor_id = vendor_id
         purchase_order.order_date = parsed_order_date
         purchase_order.expected_delivery_date = parsed_delivery_date
@@ -176,6 +217,9 @@ async def edit_purchase_order(
         if status == "received" and not purchase_order.actual_delivery_date:
             purchase_order.actual_delivery_date = datetime.utcnow()
         
+        if status_changed:
+            db.flush()
+            record_activity(db, [purchase_order_event(purchase_order, status, purchase_order.vendor and purchase_order.vendor.name, current_user)])
         db.commit()
         
         return RedirectResponse(url=f"/purchase-orders/{purchase_order_id}", status_code=302)
@@ -237,10 +281,13 @@ async def update_purchase_order_status(
     if not purchase_order:
         raise HTTPException(status_code=404, detail="Purchase order not found")
     
+    status_changed = purchase_order.status != status
     purchase_order.status = status
     if status == "received":
         purchase_order.actual_delivery_date = datetime.utcnow()
     
+    if status_changed:
+        record_activity(db, [purchase_order_event(purchase_order, status, purchase_order.vendor and purchase_order.vendor.name, current_user)])
     db.commit()
     
     return RedirectResponse(url=f"/purchase-orders/{purchase_order_id}", status_code=302)
@@ -255,33 +302,30 @@ async def reorder_suggestions_page(
 ):
     """Display products that need reordering grouped by vendor"""
     
-    # Get all products with their current stock levels
+    # Get products at or below their reorder point from the stock summary
     products_needing_reorder = []
-    all_products = db.query(Product).filter(Product.is_active == True).all()
+    total_stock_column = func.coalesce(ProductStockSummary.quantity_available, 0)
+    products_below_reorder_point = db.query(Product, total_stock_column).outerjoin(
+        ProductStockSummary, ProductStockSummary.product_id == Product.id
+    ).options(joinedload(Product.vendor)).filter(
+        Product.is_active == True,
+        total_stock_column <= Product.reorder_point
+    ).all()
     
-    for product in all_products:
-        # Calculate total available stock
-        total_stock = sum(
-            item.quantity_available 
-            for item in product.inventory_items 
-            if item.status == "available"
+    for product, total_stock in products_below_reorder_point:
+        # Calculate suggested order quantity (reorder to max stock level)
+        suggested_quantity = max(
+            product.max_stock_level - total_stock,
+            product.reorder_point * 2  # At least double the reorder point
         )
         
-        # Check if below reorder point
-        if total_stock <= product.reorder_point:
-            # Calculate suggested order quantity (reorder to max stock level)
-            suggested_quantity = max(
-                product.max_stock_level - total_stock,
-                product.reorder_point * 2  # At least double the reorder point
-            )
-            
-            products_needing_reorder.append({
-                "product": product,
-                "current_stock": total_stock,
-                "reorder_point": product.reorder_point,
-                "suggested_quantity": suggested_quantity,
-                "vendor": product.vendor
-            })
+        products_needing_reorder.append({
+            "product": product,
+            "current_stock": total_stock,
+            "reorder_point": product.reorder_point,
+            "suggested_quantity": suggested_quantity,
+            "vendor": product.vendor
+        })
     
     # Group by vendor
     vendors_with_suggestions = {}
@@ -314,12 +358,17 @@ async def reorder_suggestions_page(
 
 @router.get("/api/purchase-orders")
 async def get_purchase_orders_api(
+    after: Optional[str] = Query(None),
+    per_page: int = Query(100),
     current_user: User = Depends(get_current_active_user_from_cookie),
     db: Session = Depends(get_db)
 ):
-    """API endpoint to get all purchase orders"""
-    purchase_orders = db.query(PurchaseOrder).all()
-    return {"purchase_orders": [{"id": po.id, "po_number": po.po_number, "status": po.status} for po in purchase_orders]}
+    """API endpoint to list purchase orders, newest first, one cursor page at a time"""
+    page = paginate_keyset(db.query(PurchaseOrder), PurchaseOrder.order_date, PurchaseOrder.id, after=after, per_page=per_page)
+    return {
+        "purchase_orders": [{"id": po.id, "po_number": po.po_number, "status": po.status} for po in page.items],
+        **page.to_dict()
+    }
 
 @router.get("/api/purchase-orders/{purchase_order_id}")
 async def get_purchase_order_api(
@@ -3,12 +3,22 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Query
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, desc, extract
-from app.database import get_db
+from sqlalchemy import func, and_, desc, extract, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.models import (
     Product, InventoryItem, PurchaseOrder, SalesOrder, 
     Customer, Vendor, StockMovement, Category, User
 )
+from app.utils.report_queries import (
+    EXPENSE_STATUSES, PERIOD_GRANULARITY, REVENUE_STATUSES, bucket_labels, bucket_start,
+    financial_series, purchases_by_bucket, sales_by_bucket
+)
+from app.utils.rollups import (
+    ordering_customer_ids, purchase_totals_by_status, sales_totals_by_status, sum_totals
+)
+from app.utils.report_cache import INVENTORY_TABLES, PURCHASE_TABLES, ROLLUP_TABLES, SALES_TABLES, cached_report
+from app.utils.exports import build_export, parquet_response, parse_export_dates
 from app.utils.auth import check_user_role_from_cookie, get_current_active_user_from_cookie, check_user_roles_from_cookie
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
@@ -17,39 +27,44 @@ import json
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+# Tables behind the financial and dashboard reports
+REPORT_TABLES = SALES_TABLES + PURCHASE_TABLES + INVENTORY_TABLES + ROLLUP_TABLES
+
 # Reports dashboard - Manager and Admin only
 @router.get("/", response_class=HTMLResponse)
 async def reports_dashboard(
     request: Request, 
     current_user: User = Depends(check_user_roles_from_cookie(["admin", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display reports dashboard with overview and quick reports - Manager and Admin only"""
+    return await db.run_sync(render_reports_dashboard, request, current_user)
+
+def render_reports_dashboard(db: Session, request: Request, current_user: User):
+    """Build the reports dashboard page"""
     
     # Get date range (default to last 30 days)
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=30)
     
-    # Calculate comprehensive metrics for dashboard
-    metrics = calculate_comprehensive_metrics(db, start_date, end_date)
-    
-    # Get chart data
-    chart_data = get_chart_data(db, start_date, end_date)
+    def compute():
+        return {
+            # Calculate comprehensive metrics for dashboard
+            "metrics": calculate_comprehensive_metrics(db, start_date, end_date),
+            # Get chart data
+            "chart_data": get_chart_data(db, start_date, end_date),
+            # Get recent activities for dashboard
+            "recent_sales": get_recent_sales(db, limit=5),
+            "recent_purchases": get_recent_purchases(db, limit=5),
+            "top_products": get_top_products(db, start_date, end_date, limit=5),
+            "top_customers": get_top_customers(db, start_date, end_date, limit=5)
+        }
     
-    # Get recent activities for dashboard
-    recent_sales = get_recent_sales(db, limit=5)
-    recent_purchases = get_recent_purchases(db, limit=5)
-    top_products = get_top_products(db, start_date, end_date, limit=5)
-    top_customers = get_top_customers(db, start_date, end_date, limit=5)
+    report = cached_report("reports_dashboard", compute, REPORT_TABLES, start_date, end_date)
     
     return templates.TemplateResponse("reports/dashboard.html", {
         "request": request,
-        "metrics": metrics,
-        "chart_data": chart_data,
-        "recent_sales": recent_sales,
-        "recent_purchases": recent_purchases,
-        "top_products": top_products,
-        "top_customers": top_customers,
+        **report,
         "start_date": start_date,
         "end_date": end_date,
         "current_user": current_user,
@@ -63,10 +78,26 @@ async def financial_reports(
     start_date: str = Query(None),
     end_date: str = Query(None),
     report_type: str = Query("summary"),
+    period: str = Query("monthly"),
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display financial reports"""
+    return await db.run_sync(
+        render_financial_reports, request, start_date, end_date, report_type, current_user, period
+    )
+
+def render_financial_reports(
+    db: Session,
+    request: Request,
+    start_date: str,
+    end_date: str,
+    report_type: str,
+    current_user: User,
+    period: str = "monthly"
+):
+    """Build the financial reports page"""
+    granularity = PERIOD_GRANULARITY.get(period, "month")
     
     # Parse dates
     if start_date:
@@ -81,38 +112,58 @@ async def financial_reports(
     
     # For staff users, filter by their hospital
     if current_user.role == "staff" and current_user.hospital_id:
+        hospital_id = current_user.hospital_id
+    else:
+        hospital_id = None
+    
+    financial_data = cached_report(
+        "financial", lambda: generate_financial_report_data(db, start_date, end_date, report_type, granularity, hospital_id),
+        REPORT_TABLES, start_date, end_date, hospital_id, report_type=report_type, granularity=granularity
+    )
+    
+    return templates.TemplateResponse("reports/financial.html", {
+        "request": request,
+        "financial_data": financial_data,
+        "start_date": start_date,
+        "end_date": end_date,
+        "report_type": report_type,
+        "current_user": current_user
+    })
+
+def generate_financial_report_data(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    report_type: str,
+    granularity: str,
+    hospital_id: Optional[int]
+) -> Dict[str, Any]:
+    """Pick the financial report generator for the report type and hospital scope"""
+    if hospital_id:
         # Generate hospital-specific financial data
         if report_type == "summary":
-            financial_data = generate_hospital_financial_summary(db, start_date, end_date, current_user.hospital_id)
+            financial_data = generate_hospital_financial_summary(db, start_date, end_date, hospital_id)
         elif report_type == "revenue":
-            financial_data = generate_hospital_revenue_report(db, start_date, end_date, current_user.hospital_id)
+            financial_data = generate_hospital_revenue_report(db, start_date, end_date, hospital_id, granularity)
         elif report_type == "expenses":
-            financial_data = generate_hospital_expense_report(db, start_date, end_date, current_user.hospital_id)
+            financial_data = generate_hospital_expense_report(db, start_date, end_date, hospital_id)
         elif report_type == "profit":
-            financial_data = generate_hospital_profit_report(db, start_date, end_date, current_user.hospital_id)
+            financial_data = generate_hospital_profit_report(db, start_date, end_date, hospital_id)
         else:
-            financial_data = generate_hospital_financial_summary(db, start_date, end_date, current_user.hospital_id)
+            financial_data = generate_hospital_financial_summary(db, start_date, end_date, hospital_id)
     else:
         # Generate full financial data for admin/manager
         if report_type == "summary":
-            financial_data = generate_financial_summary(db, start_date, end_date)
+            financial_data = generate_financial_summary(db, start_date, end_date, granularity)
         elif report_type == "revenue":
-            financial_data = generate_revenue_report(db, start_date, end_date)
+            financial_data = generate_revenue_report(db, start_date, end_date, granularity)
         elif report_type == "expenses":
-            financial_data = generate_expense_report(db, start_date, end_date)
+            financial_data = generate_expense_report(db, start_date, end_date, granularity)
         elif report_type == "profit":
             financial_data = generate_profit_report(db, start_date, end_date)
         else:
-            financial_data = generate_financial_summary(db, start_date, end_date)
-    
-    return templates.TemplateResponse("reports/financial.html", {
-        "request": request,
-        "financial_data": financial_data,
-        "start_date": start_date,
-        "end_date": end_date,
-        "report_type": report_type,
-        "current_user": current_user
-    })
+            financial_data = generate_financial_summary(db, start_date, end_date, granularity)
+    return financial_data
 
 # Inventory reports
 @router.get("/inventory", response_class=HTMLResponse)
@@ -121,9 +172,21 @@ async def inventory_reports(
     report_type: str = Query("overview"),
     category_id: int = Query(None),
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display inventory reports"""
+    return await db.run_sync(
+        render_inventory_reports, request, report_type, category_id, current_user
+    )
+
+def render_inventory_reports(
+    db: Session,
+    request: Request,
+    report_type: str,
+    category_id: int,
+    current_user: User
+):
+    """Build the inventory reports page"""
     
     # For staff users, filter by their hospital
     if current_user.role == "staff" and current_user.hospital_id:
@@ -174,9 +237,19 @@ async def customer_analytics(
     start_date: str = Query(None),
     end_date: str = Query(None),
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display customer analytics"""
+    return await db.run_sync(render_customer_analytics, request, start_date, end_date, current_user)
+
+def render_customer_analytics(
+    db: Session,
+    request: Request,
+    start_date: str,
+    end_date: str,
+    current_user: User
+):
+    """Build the customer analytics page"""
     
     # Parse dates
     if start_date:
@@ -210,9 +283,19 @@ async def vendor_analytics(
     start_date: str = Query(None),
     end_date: str = Query(None),
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display vendor analytics"""
+    return await db.run_sync(render_vendor_analytics, request, start_date, end_date, current_user)
+
+def render_vendor_analytics(
+    db: Session,
+    request: Request,
+    start_date: str,
+    end_date: str,
+    current_user: User
+):
+    """Build the vendor analytics page"""
     
     # Parse dates
     if start_date:
@@ -246,9 +329,19 @@ async def sales_report(
     start_date: str = Query(None),
     end_date: str = Query(None),
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display sales report with summary and recent sales orders"""
+    return await db.run_sync(render_sales_report, request, start_date, end_date, current_user)
+
+def render_sales_report(
+    db: Session,
+    request: Request,
+    start_date: str,
+    end_date: str,
+    current_user: User
+):
+    """Build the sales report page"""
     # Parse dates
     if start_date:
         start_date_dt = datetime.strptime(start_date, "%Y-%m-%d")
@@ -302,9 +395,13 @@ async def sales_report(
 async def api_financial_summary(
     start_date: str = Query(None),
     end_date: str = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint for financial summary"""
+    return await db.run_sync(build_financial_summary_payload, start_date, end_date)
+
+def build_financial_summary_payload(db: Session, start_date: str, end_date: str):
+    """Collect the financial summary for the API"""
     if start_date:
         start_date = datetime.strptime(start_date, "%Y-%m-%d")
     else:
@@ -315,34 +412,51 @@ async def api_financial_summary(
     else:
         end_date = datetime.utcnow()
     
-    data = generate_financial_summary(db, start_date, end_date)
+    data = cached_report(
+        "financial", lambda: generate_financial_summary(db, start_date, end_date), REPORT_TABLES,
+        start_date, end_date, report_type="summary", granularity="month"
+    )
     return JSONResponse(content=data)
 
 @router.get("/api/inventory-summary")
-async def api_inventory_summary(db: Session = Depends(get_db)):
+async def api_inventory_summary(db: AsyncSession = Depends(get_async_db)):
     """API endpoint for inventory summary"""
+    return await db.run_sync(build_inventory_summary_payload)
+
+def build_inventory_summary_payload(db: Session):
+    """Collect the inventory summary for the API"""
     data = generate_inventory_overview(db)
     return JSONResponse(content=data)
 
 @router.get("/api/dashboard-data")
 async def api_dashboard_data(
     days: int = Query(30, description="Number of days to look back"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint for dashboard chart data"""
+    return await db.run_sync(build_dashboard_data_payload, days)
+
+def build_dashboard_data_payload(db: Session, days: int):
+    """Collect chart data for the reports dashboard"""
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
     
-    chart_data = get_chart_data(db, start_date, end_date)
+    chart_data = cached_report(
+        "chart_data", lambda: get_chart_data(db, start_date, end_date), REPORT_TABLES, start_date, end_date
+    )
     return JSONResponse(content=chart_data)
 
 @router.get("/api/customer-analytics")
 async def api_customer_analytics(
     start_date: str = Query(None),
     end_date: str = Query(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """API endpoint for customer analytics"""
+    return await db.run_sync(build_customer_analytics_payload, start_date, end_date)
+
+def build_customer_analytics_payload(db: Session, start_date: str, end_date: str):
+    """Collect customer analytics for the API"""
     if start_date:
         start_date = datetime.strptime(start_date, "%Y-%m-%d")
     else:
@@ -356,39 +470,43 @@ async def api_customer_analytics(
     data = generate_customer_analytics(db, start_date, end_date)
     return JSONResponse(content=data)
 
+# Columnar exports for BI tools - Manager and Admin only
+@router.get("/export/{dataset}.parquet")
+async def export_parquet(
+    dataset: str,
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    hospital_id: Optional[int] = Query(None),
+    current_user: User = Depends(check_user_roles_from_cookie(["admin", "manager"]))
+):
+    """Stream inventory, sales orders, purchase orders or stock movements as Parquet"""
+    start, end = parse_export_dates(start_date, end_date)
+    columns, statement = build_export(dataset, start, end, hospital_id)
+    return parquet_response(columns, statement, f"{dataset}.parquet")
+
 # Helper functions
 def calculate_comprehensive_metrics(db: Session, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
     """Calculate comprehensive business metrics for dashboard"""
     
-    # Revenue metrics
-    monthly_revenue = db.query(func.sum(SalesOrder.total_amount)).filter(
-        SalesOrder.order_date.between(start_date, end_date),
-        SalesOrder.status.in_(["delivered", "shipped"])
-    ).scalar() or 0
-    
     # Previous period for comparison
     period_days = (end_date - start_date).days
     previous_start = start_date - timedelta(days=period_days)
     previous_end = start_date
     
-    previous_revenue = db.query(func.sum(SalesOrder.total_amount)).filter(
-        SalesOrder.order_date.between(previous_start, previous_end),
-        SalesOrder.status.in_(["delivered", "shipped"])
-    ).scalar() or 0
-    
-    # Calculate growth rate - ensure decimal values are converted to float
+    # Revenue, order and customer metrics for both periods - closed days come from the daily rollups
+    current_sales = sales_totals_by_status(db, start_date, end_date)
+    previous_sales = sales_totals_by_status(db, previous_start, previous_end)
+    total_orders, _ = sum_totals(current_sales)
+    previous_orders, _ = sum_totals(previous_sales)
+    _, monthly_revenue = sum_totals(current_sales, REVENUE_STATUSES)
+    _, previous_revenue = sum_totals(previous_sales, REVENUE_STATUSES)
+    active_customers = len(ordering_customer_ids(db, start_date, end_date))
+    previous_customers = len(ordering_customer_ids(db, previous_start, previous_end))
+    
+    # Calculate growth rate
     revenue_growth = 0
     if previous_revenue > 0:
-        revenue_growth = float(((monthly_revenue - previous_revenue) / previous_revenue) * 100)
-    
-    # Orders metrics
-    total_orders = db.query(SalesOrder).filter(
-        SalesOrder.order_date.between(start_date, end_date)
-    ).count()
-    
-    previous_orders = db.query(SalesOrder).filter(
-        SalesOrder.order_date.between(previous_start, previous_end)
-    ).count()
+        revenue_growth = ((monthly_revenue - previous_revenue) / previous_revenue) * 100
     
     orders_growth = 0
     if previous_orders > 0:
@@ -400,31 +518,13 @@ def calculate_comprehensive_metrics(db: Session, start_date: datetime, end_date:
     )).scalar() or 0
     
     # Profit metrics
-    total_expenses = db.query(func.sum(PurchaseOrder.total_amount)).filter(
-        PurchaseOrder.order_date.between(start_date, end_date),
-        PurchaseOrder.status.in_(["received", "shipped"])
-    ).scalar() or 0
+    _, total_expenses = sum_totals(purchase_totals_by_status(db, start_date, end_date), EXPENSE_STATUSES)
     
-    gross_profit = float(monthly_revenue - total_expenses)
-    profit_margin = float((gross_profit / float(monthly_revenue)) * 100) if monthly_revenue > 0 else 0
+    gross_profit = monthly_revenue - total_expenses
+    profit_margin = (gross_profit / monthly_revenue) * 100 if monthly_revenue > 0 else 0
     
     # Customer metrics
     total_customers = db.query(Customer).filter(Customer.is_active == True).count()
-    active_customers = db.query(Customer).filter(
-        Customer.id.in_(
-            db.query(SalesOrder.customer_id).filter(
-                SalesOrder.order_date.between(start_date, end_date)
-            ).distinct()
-        )
-    ).count()
-    
-    previous_customers = db.query(Customer).filter(
-        Customer.id.in_(
-            db.query(SalesOrder.customer_id).filter(
-                SalesOrder.order_date.between(previous_start, previous_end)
-            ).distinct()
-        )
-    ).count()
     
     customer_growth = 0
     if previous_customers > 0:
@@ -434,7 +534,7 @@ def calculate_comprehensive_metrics(db: Session, start_date: datetime, end_date:
     overall_growth = (float(revenue_growth) + float(orders_growth) + float(customer_growth)) / 3
     
     return {
-        "monthly_revenue": float(monthly_revenue),
+        "monthly_revenue": monthly_revenue,
         "total_orders": total_orders,
         "inventory_value": float(total_inventory_value),
         "profit_margin": round(profit_margin, 2),
@@ -450,31 +550,15 @@ def calculate_comprehensive_metrics(db: Session, start_date: datetime, end_date:
 def get_chart_data(db: Session, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
     """Get data for dashboard charts"""
     
-    # Monthly revenue and expenses for the last 6 months
-    chart_months = []
-    revenue_data = []
-    expenses_data = []
-    
-    current_date = start_date
-    for i in range(6):
-        month_start = current_date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_revenue = db.query(func.sum(SalesOrder.total_amount)).filter(
-            SalesOrder.order_date.between(month_start, month_end),
-            SalesOrder.status.in_(["delivered", "shipped"])
-        ).scalar() or 0
-        
-        month_expenses = db.query(func.sum(PurchaseOrder.total_amount)).filter(
-            PurchaseOrder.order_date.between(month_start, month_end),
-            PurchaseOrder.status.in_(["received", "shipped"])
-        ).scalar() or 0
-        
-        chart_months.append(month_start.strftime("%b"))
-        revenue_data.append(float(month_revenue))
-        expenses_data.append(float(month_expenses))
-        
-        current_date = month_start - timedelta(days=1)
+    # Monthly revenue and expenses for the last 6 months, oldest first
+    chart_start = bucket_start(end_date, "month")
+    for _ in range(5):
+        chart_start = bucket_start(chart_start - timedelta(days=1), "month")
+    series = financial_series(db, chart_start, end_date, "month")
+    
+    chart_months = [datetime.strptime(row["period"], "%Y-%m").strftime("%b") for row in series]
+    revenue_data = [row["revenue"] for row in series]
+    expenses_data = [row["expenses"] for row in series]
     
     # Orders status distribution
     orders_status = db.query(SalesOrder.status, func.count(SalesOrder.id)).filter(
@@ -485,12 +569,15 @@ def get_chart_data(db: Session, start_date: datetime, end_date: datetime) -> Dic
     orders_data = [count for status, count in orders_status]
     
     # Inventory status distribution
+    in_stock, low_stock, out_of_stock = db.query(
+        func.count(case((InventoryItem.quantity_available > 10, InventoryItem.id))),
+        func.count(case((InventoryItem.quantity_available.between(1, 10), InventoryItem.id))),
+        func.count(case((InventoryItem.quantity_available == 0, InventoryItem.id)))
+    ).one()
     inventory_status = [
-        ("In Stock", db.query(InventoryItem).filter(InventoryItem.quantity_available > 10).count()),
-        ("Low Stock", db.query(InventoryItem).filter(
-            InventoryItem.quantity_available.between(1, 10)
-        ).count()),
-        ("Out of Stock", db.query(InventoryItem).filter(InventoryItem.quantity_available == 0).count())
+        ("In Stock", in_stock),
+        ("Low Stock", low_stock),
+        ("Out of Stock", out_of_stock)
     ]
     
     inventory_labels = [status for status, count in inventory_status]
@@ -564,108 +651,72 @@ def get_top_customers(db: Session, start_date: datetime, end_date: datetime, lim
         for customer in customers
     ]
 
-def generate_financial_summary(db: Session, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+def generate_financial_summary(db: Session, start_date: datetime, end_date: datetime, granularity: str = "month") -> Dict[str, Any]:
     """Generate financial summary report"""
     metrics = calculate_comprehensive_metrics(db, start_date, end_date)
     
-    # Monthly trends
-    monthly_data = []
-    current_date = start_date
-    while current_date <= end_date:
-        month_start = current_date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_revenue = db.query(func.sum(SalesOrder.total_amount)).filter(
-            SalesOrder.order_date.between(month_start, month_end),
-            SalesOrder.status.in_(["delivered", "shipped"])
-        ).scalar() or 0
-        
-        month_expenses = db.query(func.sum(PurchaseOrder.total_amount)).filter(
-            PurchaseOrder.order_date.between(month_start, month_end),
-            PurchaseOrder.status.in_(["received", "shipped"])
-        ).scalar() or 0
-        
-        monthly_data.append({
-            "month": current_date.strftime("%Y-%m"),
-            "revenue": float(month_revenue),
-            "expenses": float(month_expenses),
-            "profit": float(month_revenue - month_expenses)
-        })
-        
-        current_date = (current_date + timedelta(days=32)).replace(day=1)
+    # Trends per period - one GROUP BY per table
+    monthly_data = [
+        {
+            "month": row["period"],
+            "revenue": row["revenue"],
+            "expenses": row["expenses"],
+            "profit": row["profit"]
+        }
+        for row in financial_series(db, start_date, end_date, granularity)
+    ]
     
     return {
         "metrics": metrics,
         "monthly_data": monthly_data,
+        "granularity": granularity,
         "period": {
             "start_date": start_date.strftime("%Y-%m-%d"),
             "end_date": end_date.strftime("%Y-%m-%d")
         }
     }
 
-def generate_revenue_report(db: Session, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+def generate_revenue_report(db: Session, start_date: datetime, end_date: datetime, granularity: str = "month") -> Dict[str, Any]:
     """Generate detailed revenue report"""
     # Calculate revenue metrics
     total_revenue = db.query(func.sum(SalesOrder.total_amount)).filter(
         SalesOrder.order_date.between(start_date, end_date),
-        SalesOrder.status.in_(["delivered", "shipped"])
+        SalesOrder.status.in_(REVENUE_STATUSES)
     ).scalar() or 0
     
-    # Revenue by month
-    monthly_revenue = []
-    current_date = start_date
-    while current_date <= end_date:
-        month_start = current_date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_rev = db.query(func.sum(SalesOrder.total_amount)).filter(
-            SalesOrder.order_date.between(month_start, month_end),
-            SalesOrder.status.in_(["delivered", "shipped"])
-        ).scalar() or 0
-        
-        monthly_revenue.append({
-            "month": current_date.strftime("%Y-%m"),
-            "revenue": float(month_rev)
-        })
-        
-        current_date = (current_date + timedelta(days=32)).replace(day=1)
+    # Revenue per period
+    revenue_by_bucket = sales_by_bucket(db, start_date, end_date, granularity)
+    monthly_revenue = [
+        {"month": label, "revenue": revenue_by_bucket.get(label, {}).get("revenue", 0.0)}
+        for label, _ in bucket_labels(start_date, end_date, granularity)
+    ]
     
     return {
         "total_revenue": float(total_revenue),
         "monthly_revenue": monthly_revenue,
+        "granularity": granularity,
         "report_type": "revenue"
     }
 
-def generate_expense_report(db: Session, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+def generate_expense_report(db: Session, start_date: datetime, end_date: datetime, granularity: str = "month") -> Dict[str, Any]:
     """Generate detailed expense report"""
     # Calculate expense metrics
     total_expenses = db.query(func.sum(PurchaseOrder.total_amount)).filter(
         PurchaseOrder.order_date.between(start_date, end_date),
-        PurchaseOrder.status.in_(["received", "shipped"])
+        PurchaseOrder.status.in_(EXPENSE_STATUSES)
     ).scalar() or 0
     
-    # Expenses by month
-    monthly_expenses = []
-    current_date = start_date
-    while current_date <= end_date:
-        month_start = current_date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        month_exp = db.query(func.sum(PurchaseOrder.total_amount)).filter(
-            PurchaseOrder.order_date.between(month_start, month_end),
-            PurchaseOrder.status.in_(["received", "shipped"])
-        ).scalar() or 0
-        
-        monthly_expenses.append({
-            "month": current_date.strftime("%Y-%m"),
-            "expenses": float(month_exp)
-        })
-        
-        current_date = (current_date + timedelta(days=32)).replace(day=1)
+    # Expenses per period
+    expenses_by_bucket = purchases_by_bucket(db, start_date, end_date, granularity)
+    monthly_expenses = [
+        {"month": label, "expenses": expenses_by_bucket.get(label, {}).get("expenses", 0.0)}
+        for label, _ in bucket_labels(start_date, end_date, granularity)
+    ]
     
     return {
         "total_expenses": float(total_expenses),
         "monthly_expenses": monthly_expenses,
+        "granularity": granularity,
         "report_type": "expenses"
     }
 
@@ -964,22 +1015,17 @@ def generate_hospital_financial_summary(db: Session, start_date: datetime, end_d
         "period": f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
     }
 
-def generate_hospital_revenue_report(db: Session, start_date: datetime, end_date: datetime, hospital_id: int) -> Dict[str, Any]:
+def generate_hospital_revenue_report(db: Session, start_date: datetime, end_date: datetime, hospital_id: int, granularity: str = "month") -> Dict[str, Any]:
     """Generate hospital-specific revenue report"""
-    # Get hospital's sales orders by month
-    monthly_revenue = db.query(
-        func.date_format(SalesOrder.order_date, '%Y-%m').label('month'),
-        func.sum(SalesOrder.total_amount).label('revenue')
-    ).filter(
-        SalesOrder.customer_id == hospital_id,
-        SalesOrder.order_date.between(start_date, end_date)
-    ).group_by(func.date_format(SalesOrder.order_date, '%Y-%m')).all()
+    # Value of the hospital's sales orders per period
+    orders_by_bucket = sales_by_bucket(db, start_date, end_date, granularity, customer_id=hospital_id)
     
     return {
         "monthly_revenue": [
-            {"month": month, "revenue": float(revenue)} 
-            for month, revenue in monthly_revenue
-        ]
+            {"month": label, "revenue": orders_by_bucket.get(label, {}).get("order_value", 0.0)}
+            for label, _ in bucket_labels(start_date, end_date, granularity)
+        ],
+        "granularity": granularity
     }
 
 def generate_hospital_expense_report(db: Session, start_date: datetime, end_date: datetime, hospital_id: int) -> Dict[str, Any]:
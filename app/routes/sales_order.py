@@ -1,11 +1,23 @@
 # app/routes/sales_orders.py
-from fastapi import APIRouter, Depends, HTTPException, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, Query
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.models import SalesOrder, SalesOrderItem, Product, Customer, InventoryItem, StockMovement, User
 from app.utils.auth import check_user_role_from_cookie, get_current_active_user_from_cookie, check_user_roles_from_cookie
+from app.utils.stock_summary import refresh_product_stock_summary
+from app.utils.stock_mutations import record_shipped_quantity, transition_order_status
+from app.utils.allocation import allocate_lines, release_order_allocations, ship_line
+from app.utils.reservations import available_to_promise, reserve_lines
+from app.utils.order_numbers import next_sales_order_number
+from app.utils.activity import movement_events, record_activity, sales_order_event
+from app.utils.alert_engine import evaluate_stock_alerts
+from app.utils.order_status import MAX_BULK_ORDERS, ORDER_STATUSES, transition_orders
+from app.utils.pagination import paginate_keyset
+from app.utils.exports import csv_response, parse_export_dates, sales_order_export
 from datetime import datetime, timedelta
 from typing import Optional, List
 
@@ -16,10 +28,24 @@ templates = Jinja2Templates(directory="app/templates")
 @router.get("/my-orders", response_class=HTMLResponse)
 async def hospital_my_orders(
     request: Request, 
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    per_page: int = Query(50),
     current_user: User = Depends(check_user_roles_from_cookie(["staff"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display hospital's own orders - Staff users only see their hospital's orders"""
+    return await db.run_sync(render_hospital_my_orders, request, after, before, per_page, current_user)
+
+def render_hospital_my_orders(
+    db: Session,
+    request: Request,
+    after: Optional[str],
+    before: Optional[str],
+    per_page: int,
+    current_user: User
+):
+    """Build the hospital's own orders page"""
     
     if not current_user.hospital_id:
         # If staff user has no hospital assigned, show empty orders
@@ -36,30 +62,33 @@ async def hospital_my_orders(
             "delivered_orders": 0,
             "total_spent": 0,
             "recent_orders": 0,
-            "pagination": {"pages": 1, "page": 1, "has_prev": False, "has_next": False}
+            "pagination": {"has_prev": False, "has_next": False}
         })
     
-    # Get orders for the staff user's specific hospital
+    # Get one page of orders for the staff user's specific hospital
     hospital_orders = db.query(SalesOrder).filter(
         SalesOrder.customer_id == current_user.hospital_id
-    ).order_by(SalesOrder.order_date.desc()).all()
-    
-    # Calculate hospital-specific metrics
-    total_orders = len(hospital_orders)
-    pending_orders = len([o for o in hospital_orders if o.status in ["pending", "confirmed"]])
-    shipped_orders = len([o for o in hospital_orders if o.status == "shipped"])
-    delivered_orders = len([o for o in hospital_orders if o.status == "delivered"])
+    )
+    pagination = paginate_keyset(
+        hospital_orders, SalesOrder.order_date, SalesOrder.id,
+        after=after, before=before, per_page=per_page, request=request
+    )
     
-    # Calculate total spent by hospital
-    total_spent = sum(float(order.total_amount) for order in hospital_orders)
-    
-    # Get recent orders (last 30 days)
+    # Calculate hospital-specific metrics over all orders in one aggregate query
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_orders = len([o for o in hospital_orders if o.order_date >= thirty_days_ago])
+    total_orders, pending_orders, shipped_orders, delivered_orders, total_spent, recent_orders = hospital_orders.with_entities(
+        func.count(SalesOrder.id),
+        func.coalesce(func.sum(case((SalesOrder.status.in_(["pending", "confirmed"]), 1), else_=0)), 0),
+        func.coalesce(func.sum(case((SalesOrder.status == "shipped", 1), else_=0)), 0),
+        func.coalesce(func.sum(case((SalesOrder.status == "delivered", 1), else_=0)), 0),
+        func.coalesce(func.sum(SalesOrder.total_amount), 0),
+        func.coalesce(func.sum(case((SalesOrder.order_date >= thirty_days_ago, 1), else_=0)), 0)
+    ).one()
+    total_spent = float(total_spent)
     
     return templates.TemplateResponse("sales_orders/my_orders.html", {
         "request": request, 
-        "sales_orders": hospital_orders,
+        "sales_orders": pagination.items,
         "current_user": current_user,
         "user_role": current_user.role,
         "current_datetime": datetime.utcnow(),
@@ -70,25 +99,57 @@ async def hospital_my_orders(
         "delivered_orders": delivered_orders,
         "total_spent": total_spent,
         "recent_orders": recent_orders,
-        "pagination": {"pages": 1, "page": 1, "has_prev": False, "has_next": False}
+        "pagination": pagination
     })
 
 # Sales orders list page - All authenticated users
 @router.get("/", response_class=HTMLResponse)
 async def sales_orders_list(
     request: Request, 
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    per_page: int = Query(50),
     current_user: User = Depends(get_current_active_user_from_cookie),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display sales orders list page - All authenticated users"""
-    sales_orders = db.query(SalesOrder).order_by(SalesOrder.order_date.desc()).all()
+    return await db.run_sync(render_sales_orders_list, request, after, before, per_page, current_user)
+
+def render_sales_orders_list(
+    db: Session,
+    request: Request,
+    after: Optional[str],
+    before: Optional[str],
+    per_page: int,
+    current_user: User
+):
+    """Build the sales orders list page"""
+    pagination = paginate_keyset(
+        db.query(SalesOrder), SalesOrder.order_date, SalesOrder.id,
+        after=after, before=before, per_page=per_page, request=request
+    )
+    
+    # Header statistics cover all orders, not just the current page
+    total_orders, pending_orders, total_value, shipped_orders = db.query(
+        func.count(SalesOrder.id),
+        func.coalesce(func.sum(case((SalesOrder.status == "pending", 1), else_=0)), 0),
+        func.coalesce(func.sum(SalesOrder.total_amount), 0),
+        func.coalesce(func.sum(case((SalesOrder.status == "shipped", 1), else_=0)), 0)
+    ).one()
+    
     return templates.TemplateResponse("sales_orders/list.html", {
         "request": request, 
-        "sales_orders": sales_orders,
+        "sales_orders": pagination.items,
+        "stats": {
+            "total_orders": total_orders,
+            "pending_orders": pending_orders,
+            "total_value": float(total_value),
+            "shipped_orders": shipped_orders
+        },
         "current_user": current_user,
         "user_role": current_user.role,
         "current_datetime": datetime.utcnow(),
-        "pagination": {"pages": 1, "page": 1, "has_prev": False, "has_next": False}  # Simple pagination placeholder
+        "pagination": pagination
     })
 
 # Create sales order page - Staff, Manager and Admin can create orders
@@ -96,9 +157,13 @@ async def sales_orders_list(
 async def create_sales_order_page(
     request: Request, 
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display create sales order page - Staff (hospital buyers) and Manager/Admin can create orders"""
+    return await db.run_sync(render_create_sales_order_page, request, current_user)
+
+def render_create_sales_order_page(db: Session, request: Request, current_user: User):
+    """Build the create sales order form"""
     
     # For staff users, only show their hospital; for managers, show all customers
     if current_user.role == "staff" and current_user.hospital_id:
@@ -117,6 +182,7 @@ async def create_sales_order_page(
         "request": request,
         "customers": customers,
         "products": available_products,
+        "available_to_promise": available_to_promise(db),
         "current_user": current_user,
         "user_role": current_user.role,
         "auto_customer_id": current_user.hospital_id if current_user.role == "staff" else None
@@ -134,9 +200,27 @@ async def create_sales_order(
     quantities: List[int] = Form(...),
     unit_prices: List[float] = Form(...),
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new sales order - Staff (hospital buyers) and Manager/Admin can create orders"""
+    return await db.run_sync(
+        process_create_sales_order, request, customer_id, delivery_date, discount_percentage,
+        notes, product_ids, quantities, unit_prices, current_user
+    )
+
+def process_create_sales_order(
+    db: Session,
+    request: Request,
+    customer_id: int,
+    delivery_date: str,
+    discount_percentage: float,
+    notes: str,
+    product_ids: List[int],
+    quantities: List[int],
+    unit_prices: List[float],
+    current_user: User
+):
+    """Validate and save a new sales order"""
     try:
         # For staff users, ensure they can only create orders for their hospital
         if current_user.role == "staff" and current_user.hospital_id:
@@ -146,8 +230,7 @@ async def create_sales_order(
             raise HTTPException(status_code=403, detail="Staff user must be assigned to a hospital to create orders")
         
         # Generate SO number
-        latest_so = db.query(SalesOrder).order_by(SalesOrder.id.desc()).first()
-        order_number = f"SO-{datetime.now().year}-{(latest_so.id + 1) if latest_so else 1:04d}"
+        order_number = next_sales_order_number(db)
         
         # Parse delivery date
         delivery_dt = None
@@ -171,38 +254,34 @@ async def create_sales_order(
         db.add(sales_order)
         db.flush()  # Get the ID
         
-        # Add sales order items and check inventory
+        # Add sales order items
         total_amount = 0
+        order_items = []
         for i in range(len(product_ids)):
             if product_ids[i] and quantities[i] and unit_prices[i]:
-                # Check inventory availability (optional - allow backorders)
-                available_inventory = db.query(InventoryItem).filter(
-                    InventoryItem.product_id == product_ids[i],
-                    InventoryItem.quantity_available >= quantities[i],
-                    InventoryItem.status == "available"
-                ).order_by(InventoryItem.received_date.asc()).first()  # FIFO - oldest first
-                
-                # Allow creating orders even without sufficient inventory (backorder)
-                inventory_item_id = available_inventory.id if available_inventory else None
-                
                 total_price = quantities[i] * unit_prices[i]
                 total_amount += total_price
                 
                 so_item = SalesOrderItem(
                     sales_order_id=sales_order.id,
                     product_id=product_ids[i],
-                    inventory_item_id=inventory_item_id,  # Can be None for backorders
                     quantity_ordered=quantities[i],
                     unit_price=unit_prices[i],
                     total_price=total_price
                 )
                 db.add(so_item)
+                order_items.append(so_item)
+        
+        # Split lines across batches, first expiry first out (any shortfall is a backorder)
+        allocate_lines(db, order_items)
         
         # Apply discount and update total amount
         discount_amount = total_amount * (discount_percentage / 100)
         final_amount = total_amount - discount_amount
         sales_order.total_amount = final_amount
         
+        customer_name = db.query(Customer.name).filter(Customer.id == customer_id).scalar()
+        record_activity(db, [sales_order_event(sales_order, "created", customer_name, current_user)])
         db.commit()
         
         return RedirectResponse(url="/sales-orders", status_code=302)
@@ -222,15 +301,36 @@ async def create_sales_order(
             "error": f"Error creating sales order: {str(e)}"
         })
 
+# CSV export - registered before /{so_id} so "export" is not parsed as an id
+@router.get("/export")
+async def export_sales_orders(
+    start_date: Optional[str] = Query(None),
+    end_date: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_active_user_from_cookie)
+):
+    """Stream sales order lines as CSV - staff get their hospital's orders only"""
+    start, end = parse_export_dates(start_date, end_date)
+    hospital_id = None
+    if current_user.role == "staff":
+        if not current_user.hospital_id:
+            raise HTTPException(status_code=403, detail="Staff user must be assigned to a hospital to export orders")
+        hospital_id = current_user.hospital_id
+    columns, statement = sales_order_export(start, end, hospital_id)
+    return csv_response(columns, statement, "sales_orders_export.csv")
+
 # Sales order details page
 @router.get("/{so_id}", response_class=HTMLResponse)
 async def sales_order_detail(
     request: Request, 
     so_id: int, 
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager", "admin"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display sales order details"""
+    return await db.run_sync(render_sales_order_detail, request, so_id, current_user)
+
+def render_sales_order_detail(db: Session, request: Request, so_id: int, current_user: User):
+    """Build the sales order detail page"""
     sales_order = db.query(SalesOrder).filter(SalesOrder.id == so_id).first()
     if not sales_order:
         raise HTTPException(status_code=404, detail="Sales order not found")
@@ -264,9 +364,13 @@ async def edit_sales_order_page(
     request: Request,
     so_id: int,
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Display edit sales order page - Staff (hospital buyers) and Manager/Admin can edit orders"""
+    return await db.run_sync(render_edit_sales_order_page, request, so_id, current_user)
+
+def render_edit_sales_order_page(db: Session, request: Request, so_id: int, current_user: User):
+    """Build the edit sales order form"""
     sales_order = db.query(SalesOrder).filter(SalesOrder.id == so_id).first()
     if not sales_order:
         raise HTTPException(status_code=404, detail="Sales order not found")
@@ -313,9 +417,28 @@ async def edit_sales_order(
     quantities: List[int] = Form(...),
     unit_prices: List[float] = Form(...),
     current_user: User = Depends(check_user_roles_from_cookie(["staff", "manager"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Edit an existing sales order - Staff (hospital buyers) and Manager/Admin can edit orders"""
+    return await db.run_sync(
+        process_edit_sales_order, request, so_id, customer_id, delivery_date,
+        discount_percentage, notes, product_ids, quantities, unit_prices, current_user
+    )
+
+def process_edit_sales_order(
+    db: Session,
+    request: Request,
+    so_id: int,
+    customer_id: int,
+    delivery_date: str,
+    discount_percentage: float,
+    notes: str,
+    product_ids: List[int],
+    quantities: List[int],
+    unit_prices: List[float],
+    current_user: User
+):
+    """Validate and save sales order changes"""
     try:
         sales_order = db.query(SalesOrder).filter(SalesOrder.id == so_id).first()
         if not sales_order:
@@ -338,11 +461,13 @@ async def edit_sales_order(
         sales_order.discount_percentage = discount_percentage
         sales_order.notes = notes
         
-        # Remove existing items
+        # Remove existing items and their batch allocations
+        release_order_allocations(db, so_id)
         db.query(SalesOrderItem).filter(SalesOrderItem.sales_order_id == so_id).delete()
         
         # Add new items
         total_amount = 0
+        order_items = []
         for i in range(len(product_ids)):
             if product_ids[i] and quantities[i] and unit_prices[i]:
                 total_price = quantities[i] * unit_prices[i]
@@ -356,6 +481,16 @@ async def edit_sales_order(
                     total_price=total_price
                 )
                 db.add(so_item)
+                order_items.append(so_item)
+        
+        # Re-allocate the edited lines against current stock; confirmed orders keep holding theirs
+        if sales_order.status == "confirmed":
+            shortfalls = reserve_lines(db, order_items)
+            if shortfalls:
+                db.rollback()
+                raise HTTPException(status_code=400, detail="Insufficient stock to reserve the edited quantities")
+        else:
+            allocate_lines(db, order_items)
         
         # Apply discount and update total amount
         discount_amount = total_amount * (discount_percentage / 100)
@@ -387,54 +522,62 @@ async def update_sales_order_status(
     so_id: int,
     status: str = Form(...),
     current_user: User = Depends(check_user_roles_from_cookie(["admin", "manager"])),  # Only admin/manager can update status
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update sales order status and process inventory - Only Admin and Manager can process orders"""
+    return await db.run_sync(process_sales_order_status, so_id, status, current_user)
+
+def process_sales_order_status(db: Session, so_id: int, status: str, current_user: User):
+    """Apply a status change and its stock movements"""
     sales_order = db.query(SalesOrder).filter(SalesOrder.id == so_id).first()
     if not sales_order:
         raise HTTPException(status_code=404, detail="Sales order not found")
     
-    old_status = sales_order.status
-    sales_order.status = status
-    
-    # If order is being shipped, reduce inventory
-    if status == "shipped" and old_status != "shipped":
-        for item in sales_order.items:
-            if item.inventory_item_id:
-                # Get the inventory item
-                inventory_item = db.query(InventoryItem).filter(InventoryItem.id == item.inventory_item_id).first()
-                if inventory_item and inventory_item.quantity_available >= item.quantity_ordered:
-                    # Reduce available quantity
-                    inventory_item.quantity_available -= item.quantity_ordered
-                    item.quantity_shipped = item.quantity_ordered
-                    
-                    # Create stock movement record
-                    stock_movement = StockMovement(
-                        product_id=item.product_id,
-                        inventory_item_id=item.inventory_item_id,
-                        movement_type="out",
-                        quantity=-item.quantity_ordered,
-                        reference_type="sales_order",
-                        reference_id=sales_order.id,
-                        reference_number=sales_order.order_number,
-                        notes=f"Sold to {sales_order.customer.name} - Order: {sales_order.order_number}",
-                        created_by=current_user.id
-                    )
-                    db.add(stock_movement)
-                else:
-                    # Handle insufficient stock or missing inventory item
-                    raise HTTPException(
-                        status_code=400, 
-                        detail=f"Insufficient stock for product {item.product.name if item.product else 'Unknown'}"
-                    )
-    
-    db.commit()
+    result = transition_orders(db, [so_id], status, current_user)[0]
+    if result["result"] == "error":
+        raise HTTPException(status_code=result["status_code"], detail=result["error"])
     return RedirectResponse(url=f"/sales-orders/{so_id}", status_code=302)
 
+# Move many sales orders at once (dispatch days) - Only Admin and Manager
+@router.post("/bulk-status")
+async def bulk_update_sales_order_status(
+    request: Request,
+    current_user: User = Depends(check_user_roles_from_cookie(["admin", "manager"])),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Apply one status change to many orders: JSON {"order_ids": [...], "status": "shipped"}
+
+    Every order succeeds or fails on its own; the response lists the outcome per order.
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(data, dict) or not isinstance(data.get("order_ids"), list):
+        raise HTTPException(status_code=400, detail="Body must be an object with an order_ids list")
+
+    status = data.get("status")
+    if status not in ORDER_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(ORDER_STATUSES)}")
+    try:
+        order_ids = [int(order_id) for order_id in data["order_ids"]]
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="order_ids must be integers")
+    if len(order_ids) > MAX_BULK_ORDERS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ORDERS} orders can be updated at once")
+
+    results = await db.run_sync(transition_orders, order_ids, status, current_user)
+    succeeded = sum(1 for result in results if result["result"] == "ok")
+    return JSONResponse(content={"updated": succeeded, "failed": len(results) - succeeded, "orders": results})
+
 # Get product inventory for AJAX
 @router.get("/api/product-inventory/{product_id}")
-async def get_product_inventory(product_id: int, db: Session = Depends(get_db)):
+async def get_product_inventory(product_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get available inventory for a product"""
+    return await db.run_sync(build_product_inventory_payload, product_id)
+
+def build_product_inventory_payload(db: Session, product_id: int):
+    """Collect available batches for a product"""
     try:
         inventory_items = db.query(InventoryItem).filter(
             InventoryItem.product_id == product_id,
@@ -447,12 +590,14 @@ async def get_product_inventory(product_id: int, db: Session = Depends(get_db)):
         
         return {
             "available_quantity": total_available,
+            "available_to_promise": available_to_promise(db, [product_id]).get(product_id, 0),
             "suggested_price": float(latest_selling_price),
             "inventory_items": len(inventory_items)
         }
     except Exception as e:
         return {
             "available_quantity": 0,
+            "available_to_promise": 0,
             "suggested_price": 0,
             "inventory_items": 0,
             "error": str(e)
@@ -460,8 +605,12 @@ async def get_product_inventory(product_id: int, db: Session = Depends(get_db)):
 
 # API: Get sales order summary
 @router.get("/api/summary")
-async def get_sales_order_summary(db: Session = Depends(get_db)):
+async def get_sales_order_summary(db: AsyncSession = Depends(get_async_db)):
     """Get sales order summary for API"""
+    return await db.run_sync(build_sales_order_summary)
+
+def build_sales_order_summary(db: Session):
+    """Count sales orders by status"""
     try:
         total_orders = db.query(SalesOrder).count()
         pending_orders = db.query(SalesOrder).filter(SalesOrder.status == "pending").count()
@@ -489,9 +638,21 @@ async def partial_shipment(
     item_id: int = Form(...),
     quantity_shipped: int = Form(...),
     current_user: User = Depends(check_user_roles_from_cookie(["admin", "manager"])),  # Admin and Manager only
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle partial shipment of a specific item - Only Admin and Manager can process shipments"""
+    return await db.run_sync(
+        process_partial_shipment, so_id, item_id, quantity_shipped, current_user
+    )
+
+def process_partial_shipment(
+    db: Session,
+    so_id: int,
+    item_id: int,
+    quantity_shipped: int,
+    current_user: User
+):
+    """Ship part of an order and record the stock movements"""
     sales_order = db.query(SalesOrder).filter(SalesOrder.id == so_id).first()
     if not sales_order:
         raise HTTPException(status_code=404, detail="Sales order not found")
@@ -505,38 +666,50 @@ async def partial_shipment(
     if not order_item:
         raise HTTPException(status_code=404, detail="Order item not found")
     
-    if quantity_shipped > order_item.quantity_ordered - order_item.quantity_shipped:
+    if quantity_shipped <= 0:
+        raise HTTPException(status_code=400, detail="Quantity must be greater than 0")
+    
+    # Both checks happen inside the UPDATE statements, so concurrent shipments cannot overship
+    if not record_shipped_quantity(db, order_item.id, quantity_shipped):
+        db.rollback()
         raise HTTPException(status_code=400, detail="Quantity exceeds remaining order amount")
+    taken = ship_line(db, order_item, quantity_shipped)
+    if taken is None:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Insufficient stock for partial shipment")
     
-    if order_item.inventory_item_id:
-        inventory_item = db.query(InventoryItem).filter(InventoryItem.id == order_item.inventory_item_id).first()
-        if inventory_item and inventory_item.quantity_available >= quantity_shipped:
-            # Reduce available quantity
-            inventory_item.quantity_available -= quantity_shipped
-            order_item.quantity_shipped += quantity_shipped
-            
-            # Create stock movement record
-            stock_movement = StockMovement(
-                product_id=order_item.product_id,
-                inventory_item_id=order_item.inventory_item_id,
-                movement_type="out",
-                quantity=-quantity_shipped,
-                reference_type="sales_order",
-                reference_id=sales_order.id,
-                reference_number=sales_order.order_number,
-                notes=f"Partial shipment: {quantity_shipped} units sold to {sales_order.customer.name} - Order: {sales_order.order_number}",
-                created_by=current_user.id
-            )
-            db.add(stock_movement)
-            
-            # Update order status if all items are shipped
-            all_shipped = all(item.quantity_shipped >= item.quantity_ordered for item in sales_order.items)
-            if all_shipped:
-                sales_order.status = "shipped"
-            
-            db.commit()
-            return RedirectResponse(url=f"/sales-orders/{so_id}", status_code=302)
-        else:
-            raise HTTPException(status_code=400, detail="Insufficient stock for partial shipment")
-    else:
-        raise HTTPException(status_code=400, detail="No inventory item linked to this order item")
\ No newline at end of file
+    # Create one stock movement record per batch
+    movements = []
+    for inventory_item_id, quantity in taken:
+        stock_movement = StockMovement(
+            product_id=order_item.product_id,
+            inventory_item_id=inventory_item_id,
+            movement_type="out",
+            quantity=-quantity,
+            reference_type="sales_order",
+            reference_id=sales_order.id,
+            reference_number=sales_order.order_number,
+            notes=f"Partial shipment: {quantity} units sold to {sales_order.customer.name} - Order: {sales_order.order_number}",
+            created_by=current_user.id
+        )
+        db.add(stock_movement)
+        movements.append(stock_movement)
+    events = movement_events(
+        movements, {order_item.product_id: order_item.product and order_item.product.name},
+        current_user, hospital_id=sales_order.customer_id
+    )
+    
+    # Update order status if all items are shipped
+    unshipped_lines = db.query(func.count(SalesOrderItem.id)).filter(
+        SalesOrderItem.sales_order_id == so_id,
+        func.coalesce(SalesOrderItem.quantity_shipped, 0) < SalesOrderItem.quantity_ordered
+    ).scalar()
+    if not unshipped_lines and sales_order.status != "shipped":
+        if transition_order_status(db, sales_order.id, sales_order.status, "shipped"):
+            events.append(sales_order_event(sales_order, "shipped", sales_order.customer.name, current_user))
+    
+    record_activity(db, events)
+    refresh_product_stock_summary(db, [order_item.product_id])
+    evaluate_stock_alerts(db, inventory_item_ids=[inventory_item_id for inventory_item_id, _ in taken])
+    db.commit()
+    return RedirectResponse(url=f"/sales-orders/{so_id}", status_code=302)
\ No newline at end of file
@@ -1,11 +1,18 @@
 # app/routes/settings.py
-from fastapi import APIRouter, Depends, HTTPException, Request, Form, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, UploadFile, File, Query
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, FileResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
+from sqlalchemy import func, case
 from app.database import get_db
 from app.models.models import User
 from app.utils.auth import check_user_role_from_cookie, get_current_active_user_from_cookie
+from app.utils.pagination import paginate_keyset
+from app.utils.report_cache import report_cache
+from app.utils.user_cache import user_cache
+from app.utils.pending_users import pending_users
+from app.utils.password_hashing import password_hasher
+from app.utils.query_stats import QUERY_STATS_ENABLED, get_route_query_summary, reset_route_query_summary
 from datetime import datetime
 from typing import Optional, Dict, Any
 import json
@@ -380,14 +387,33 @@ async def update_notification_settings(
 @router.get("/users", response_class=HTMLResponse)
 async def users_list_page(
     request: Request,
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    per_page: int = Query(50),
     current_user: User = Depends(check_user_role_from_cookie("admin")),
     db: Session = Depends(get_db)
 ):
     """Display user management page - Admin only"""
-    users = db.query(User).order_by(User.created_at.desc()).all()
+    pagination = paginate_keyset(
+        db.query(User), User.created_at, User.id,
+        after=after, before=before, per_page=per_page, request=request
+    )
+    total_users, active_users, admin_users, manager_users = db.query(
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.is_active == True, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((User.role == "admin", 1), else_=0)), 0),
+        func.coalesce(func.sum(case((User.role == "manager", 1), else_=0)), 0)
+    ).one()
     return templates.TemplateResponse("settings/users.html", {
         "request": request,
-        "users": users,
+        "users": pagination.items,
+        "stats": {
+            "total_users": total_users,
+            "active_users": active_users,
+            "admin_users": admin_users,
+            "manager_users": manager_users
+        },
+        "pagination": pagination,
         "current_user": current_user
     })
 
@@ -444,8 +470,8 @@ async def add_user_submit(
         if hospital_id_int == 1:  # Nathaniel Amponsah is not a hospital
             return templates.TemplateResponse("settings/users_add.html", {"request": request, "current_user": current_user, "error": "Please select a valid hospital"})
     
-    from app.utils.auth import get_password_hash
-    hashed_password = get_password_hash(password)
+    from app.utils.auth import get_password_hash_async
+    hashed_password = await get_password_hash_async(password)
     user = User(
         username=username,
         email=email,
@@ -495,15 +521,17 @@ async def edit_user_submit(
         return templates.TemplateResponse("settings/users_edit.html", {"request": request, "user": user, "current_user": current_user, "error": "Username already exists"})
     if db.query(User).filter(User.email == email, User.id != user_id).first():
         return templates.TemplateResponse("settings/users_edit.html", {"request": request, "user": user, "current_user": current_user, "error": "Email already exists"})
+    old_username = user.username
     user.username = username
     user.email = email
     user.full_name = full_name
     user.role = role
     user.is_active = is_active
     if password:
-        from app.utils.auth import get_password_hash
-        user.hashed_password = get_password_hash(password)
+        from app.utils.auth import get_password_hash_async
+        user.hashed_password = await get_password_hash_async(password)
     db.commit()
+    user_cache.invalidate(old_username, username)
     db.refresh(user)
     return RedirectResponse(url="/settings/users", status_code=302)
 
@@ -517,6 +545,7 @@ async def toggle_user_active(
     if user:
         user.is_active = not user.is_active
         db.commit()
+        user_cache.invalidate(user.username)
     return RedirectResponse(url="/settings/users", status_code=302)
 
 @router.post("/users/{user_id}/delete")
@@ -527,8 +556,12 @@ async def delete_user(
 ):
     user = db.query(User).filter(User.id == user_id).first()
     if user:
+        was_pending = user.requires_approval and not user.is_approved
         db.delete(user)
         db.commit()
+        user_cache.invalidate(user.username)
+        if was_pending:
+            pending_users.adjust(-1)
     return RedirectResponse(url="/settings/users", status_code=302)
 
 # API endpoints - Admin only
@@ -553,6 +586,53 @@ async def get_company_settings_api(
     """Get company settings API - Admin only"""
     return get_default_company_settings()
 
+@router.get("/api/query-stats")
+async def get_query_stats_api(
+    current_user: User = Depends(check_user_role_from_cookie("admin"))
+):
+    """Rolling per-route query counts and DB time - Admin only"""
+    return {
+        "enabled": QUERY_STATS_ENABLED,
+        "routes": get_route_query_summary()
+    }
+
+@router.post("/api/query-stats/reset")
+async def reset_query_stats_api(
+    current_user: User = Depends(check_user_role_from_cookie("admin"))
+):
+    """Clear the per-route query statistics - Admin only"""
+    reset_route_query_summary()
+    return {"message": "Query statistics cleared"}
+
+@router.get("/api/report-cache")
+async def get_report_cache_api(
+    current_user: User = Depends(check_user_role_from_cookie("admin"))
+):
+    """Report cache hit/miss statistics - Admin only"""
+    return report_cache.stats()
+
+@router.post("/api/report-cache/clear")
+async def clear_report_cache_api(
+    current_user: User = Depends(check_user_role_from_cookie("admin"))
+):
+    """Empty the report cache - Admin only"""
+    report_cache.clear()
+    return {"message": "Report cache cleared"}
+
+@router.get("/api/user-cache")
+async def get_user_cache_api(
+    current_user: User = Depends(check_user_role_from_cookie("admin"))
+):
+    """Authenticated-user cache hit/miss statistics - Admin only"""
+    return user_cache.stats()
+
+@router.get("/api/password-hashing")
+async def get_password_hashing_api(
+    current_user: User = Depends(check_user_role_from_cookie("admin"))
+):
+    """Password hashing pool size, queue depth and wait times - Admin only"""
+    return password_hasher.stats()
+
 # Helper functions
 def get_default_system_settings() -> Dict[str, Any]:
     """Get default system settings"""
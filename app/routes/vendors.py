@@ -1,11 +1,12 @@
 # app/routes/vendors.py
-from fastapi import APIRouter, Depends, HTTPException, Request, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, Query
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.models import Vendor, User
 from app.utils.auth import check_user_role_from_cookie, get_current_active_user_from_cookie
+from app.utils.pagination import paginate_keyset
 from typing import Optional
 
 router = APIRouter()
@@ -15,17 +16,23 @@ templates = Jinja2Templates(directory="app/templates")
 @router.get("/", response_class=HTMLResponse)
 async def vendors_list(
     request: Request, 
+    after: Optional[str] = Query(None),
+    before: Optional[str] = Query(None),
+    per_page: int = Query(50),
     current_user: User = Depends(get_current_active_user_from_cookie),
     db: Session = Depends(get_db)
 ):
     """Display vendors list page - All authenticated users"""
-    vendors = db.query(Vendor).all()
+    pagination = paginate_keyset(
+        db.query(Vendor), Vendor.created_at, Vendor.id,
+        after=after, before=before, per_page=per_page, request=request
+    )
     return templates.TemplateResponse("vendors/list.html", {
         "request": request, 
-        "vendors": vendors,
+        "vendors": pagination.items,
         "current_user": current_user,
         "user_role": current_user.role,
-        "pagination": {"pages": 1, "page": 1, "has_prev": False, "has_next": False}  # Simple pagination placeholder
+        "pagination": pagination
     })
 
 # Add vendor page - Manager and Admin only
@@ -177,9 +184,11 @@ async def delete_vendor(
 # API: Get all vendors - All authenticated users
 @router.get("/api/vendors")
 async def get_vendors(
+    after: Optional[str] = Query(None),
+    per_page: int = Query(100),
     current_user: User = Depends(get_current_active_user_from_cookie),
     db: Session = Depends(get_db)
 ):
-    """Get all vendors for API - All authenticated users"""
-    vendors = db.query(Vendor).all()
-    return {"vendors": [{"id": v.id, "name": v.name, "country": v.country} for v in vendors]} 
\ No newline at end of file
+    """List vendors for API, one cursor page at a time - All authenticated users"""
+    page = paginate_keyset(db.query(Vendor), Vendor.created_at, Vendor.id, after=after, per_page=per_page)
+    return {"vendors": [{"id": v.id, "name": v.name, "country": v.country} for v in page.items], **page.to_dict()}
\ No newline at end of file
@@ -0,0 +1,229 @@
+# app/utils/activity.py
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc, insert, or_, select, union_all
+from app.models.models import (
+    ActivityEvent, Customer, Product, PurchaseOrder, SalesOrder, StockMovement, User, Vendor
+)
+from app.utils.pagination import KeysetPage, decode_cursor, encode_cursor
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+import argparse
+import os
+
+# Events shown per dashboard page ("load more" fetches the next page)
+ACTIVITY_PAGE_SIZE = 10
+MAX_ACTIVITY_PAGE_SIZE = 50
+
+# Events of each kind copied from the existing tables when the feed is first created
+ACTIVITY_BACKFILL_ROWS = int(os.getenv("ACTIVITY_BACKFILL_ROWS", "500"))
+
+# Stock arriving in the warehouse is news for every hospital buyer
+PUBLIC_MOVEMENT_TYPES = ("in", "received", "available")
+
+ACTIVITY_ICONS = {
+    "stock_movement": "fas fa-boxes",
+    "purchase_order": "fas fa-shopping-cart",
+    "sales_order": "fas fa-truck",
+}
+
+Movement = Union[StockMovement, Mapping[str, Any]]
+
+def _actor(actor: Optional[User]) -> Dict[str, Any]:
+    if actor is None:
+        return {"actor_id": None, "actor_name": None}
+    return {"actor_id": actor.id, "actor_name": actor.full_name or actor.username}
+
+def _field(movement: Movement, key: str):
+    return movement.get(key) if isinstance(movement, Mapping) else getattr(movement, key)
+
+def product_names(db: Session, product_ids: Iterable[int]) -> Dict[int, str]:
+    """{product id: name} in one query"""
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return {}
+    return dict(db.query(Product.id, Product.name).filter(Product.id.in_(product_ids)).all())
+
+def movement_events(
+    movements: Iterable[Movement],
+    names: Mapping[int, str],
+    actor: Optional[User] = None,
+    hospital_id: Optional[int] = None,
+    now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """Feed rows for stock movements (ORM objects or the dicts given to a bulk insert)"""
+    now = now or datetime.utcnow()
+    events = []
+    for movement in movements:
+        movement_type = _field(movement, "movement_type")
+        product_name = names.get(_field(movement, "product_id")) or "Unknown Product"
+        events.append({
+            "event_type": "stock_movement",
+            "action": movement_type,
+            "message": f"{movement_type.title()} {abs(_field(movement, 'quantity'))} units of {product_name}"[:255],
+            "hospital_id": hospital_id,
+            "is_public": movement_type in PUBLIC_MOVEMENT_TYPES,
+            "reference_type": _field(movement, "reference_type"),
+            "reference_id": _field(movement, "reference_id"),
+            "created_at": _field(movement, "created_at") or now,
+            **_actor(actor),
+        })
+    return events
+
+def purchase_order_event(purchase_order: PurchaseOrder, action: str, vendor_name: Optional[str],
+                         actor: Optional[User] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Feed row for a purchase order being created or changing status"""
+    vendor_name = vendor_name or "Unknown Vendor"
+    if action == "created":
+        message = f"Purchase order {purchase_order.po_number} created for {vendor_name}"
+    else:
+        message = f"Purchase order {purchase_order.po_number} for {vendor_name} marked {action}"
+    return {
+        "event_type": "purchase_order",
+        "action": action,
+        "message": message[:255],
+        "hospital_id": None,
+        "is_public": False,
+        "reference_type": "purchase_order",
+        "reference_id": purchase_order.id,
+        "created_at": now or datetime.utcnow(),
+        **_actor(actor),
+    }
+
+def sales_order_event(sales_order: SalesOrder, action: str, customer_name: Optional[str],
+                      actor: Optional[User] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Feed row for a sales order being created or changing status, scoped to its hospital"""
+    customer_name = customer_name or "Unknown Customer"
+    if action == "created":
+        message = f"Sales order {sales_order.order_number} created for {customer_name}"
+    else:
+        message = f"Sales order {sales_order.order_number} for {customer_name} marked {action}"
+    return {
+        "event_type": "sales_order",
+        "action": action,
+        "message": message[:255],
+        "hospital_id": sales_order.customer_id,
+        "is_public": False,
+        "reference_type": "sales_order",
+        "reference_id": sales_order.id,
+        "created_at": now or datetime.utcnow(),
+        **_actor(actor),
+    }
+
+def record_activity(db: Session, events: List[Dict[str, Any]]):
+    """Append feed rows with one bulk insert, in the caller's transaction"""
+    if events:
+        db.execute(insert(ActivityEvent), events)
+
+def record_stock_movements(db: Session, movements: List[Movement], actor: Optional[User] = None,
+                           hospital_id: Optional[int] = None):
+    """Append feed rows for stock movements, resolving product names with one query"""
+    if movements:
+        names = product_names(db, (_field(movement, "product_id") for movement in movements))
+        record_activity(db, movement_events(movements, names, actor, hospital_id))
+
+def activity_feed(
+    db: Session,
+    hospital_id: Optional[int] = None,
+    after: Optional[str] = None,
+    limit: int = ACTIVITY_PAGE_SIZE
+) -> KeysetPage:
+    """Newest events first, limit at a time, continuing after the `after` cursor
+
+    Without hospital_id this is the whole feed, one range scan of
+    ix_activity_events_created. A hospital buyer sees their hospital's events
+    plus public ones: each half is read from its own index and only the newest
+    limit rows of the two are kept, still in one statement.
+    """
+    limit = min(max(limit, 1), MAX_ACTIVITY_PAGE_SIZE)
+    seek = None
+    if after:
+        created_at, event_id = decode_cursor(after)
+        seek = or_(
+            ActivityEvent.created_at < created_at,
+            and_(ActivityEvent.created_at == created_at, ActivityEvent.id < event_id)
+        )
+    newest_first = (desc(ActivityEvent.created_at), desc(ActivityEvent.id))
+
+    if hospital_id is None:
+        statement = select(ActivityEvent)
+        if seek is not None:
+            statement = statement.where(seek)
+    else:
+        branches = []
+        for scope in (ActivityEvent.hospital_id == hospital_id, ActivityEvent.is_public == True):
+            branch = select(ActivityEvent.id).where(scope)
+            if seek is not None:
+                branch = branch.where(seek)
+            branches.append(select(branch.order_by(*newest_first).limit(limit + 1).subquery()))
+        ids = union_all(*branches).subquery()
+        statement = select(ActivityEvent).where(ActivityEvent.id.in_(select(ids.c.id)))
+
+    events = db.execute(statement.order_by(*newest_first).limit(limit + 1)).scalars().all()
+    items, last = events[:limit], (events[limit - 1] if len(events) > limit else None)
+    return KeysetPage(
+        items=items,
+        has_next=last is not None,
+        has_prev=bool(after),
+        next_cursor=encode_cursor(last.created_at, last.id) if last is not None else None,
+        prev_cursor=None,
+        per_page=limit
+    )
+
+def as_activity(event: ActivityEvent) -> Dict[str, Any]:
+    """The shape the dashboard template and the feed API render"""
+    return {
+        "type": event.event_type,
+        "message": event.message,
+        "actor": event.actor_name,
+        "timestamp": event.created_at,
+        "icon": ACTIVITY_ICONS.get(event.event_type, "fas fa-info-circle"),
+    }
+
+def backfill_activity_events(db: Session, rows: int = ACTIVITY_BACKFILL_ROWS) -> int:
+    """Seed the feed from the latest stock movements and orders; returns the events written"""
+    now = datetime.utcnow()
+    events = []
+
+    movements = db.query(StockMovement, Product.name, SalesOrder.customer_id).outerjoin(
+        Product, Product.id == StockMovement.product_id
+    ).outerjoin(
+        SalesOrder, and_(StockMovement.reference_type == "sales_order", SalesOrder.id == StockMovement.reference_id)
+    ).order_by(desc(StockMovement.created_at)).limit(rows).all()
+    for movement, product_name, customer_id in movements:
+        events.extend(movement_events([movement], {movement.product_id: product_name}, hospital_id=customer_id, now=now))
+
+    for purchase_order, vendor_name in db.query(PurchaseOrder, Vendor.name).outerjoin(
+        Vendor, Vendor.id == PurchaseOrder.vendor_id
+    ).order_by(desc(PurchaseOrder.order_date)).limit(rows).all():
+        events.append(purchase_order_event(purchase_order, "created", vendor_name, now=purchase_order.order_date or now))
+
+    for sales_order, customer_name in db.query(SalesOrder, Customer.name).outerjoin(
+        Customer, Customer.id == SalesOrder.customer_id
+    ).order_by(desc(SalesOrder.order_date)).limit(rows).all():
+        events.append(sales_order_event(sales_order, "created", customer_name, now=sales_order.order_date or now))
+
+    # Oldest first so ids follow created_at
+    events.sort(key=lambda event: event["created_at"])
+    record_activity(db, events)
+    db.commit()
+    return len(events)
+
+def ensure_activity_events(db: Session):
+    """Seed the feed on first start after it was introduced"""
+    if db.query(ActivityEvent.id).first() is None:
+        backfill_activity_events(db)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the activity_events feed")
+    parser.add_argument("command", choices=["backfill"], help="backfill: copy the latest movements and orders into the feed")
+    parser.add_argument("--rows", type=int, default=ACTIVITY_BACKFILL_ROWS, help="rows of each kind to copy")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal, create_tables
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        print(f"Wrote {backfill_activity_events(db, args.rows)} activity events")
+    finally:
+        db.close()
@@ -0,0 +1,191 @@
+# app/utils/alert_engine.py
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, insert, inspect, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from app.models.models import Alert, InventoryItem, Product
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import argparse
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Batches expiring within this many days raise an expiry warning
+EXPIRY_WARNING_DAYS = int(os.getenv("EXPIRY_WARNING_DAYS", "30"))
+
+# Seconds between expiry sweeps (0 disables the background job)
+ALERT_SWEEP_INTERVAL = int(os.getenv("ALERT_SWEEP_INTERVAL", "3600"))
+
+# Dialects with the partial unique index on open alerts, where a racing
+# duplicate is skipped by the database instead of failing the insert
+_ON_CONFLICT_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+OPEN_ALERT_INDEX = "ux_alerts_open_item_type"
+
+def ensure_open_alert_index(engine: Engine):
+    """Build ux_alerts_open_item_type on alerts tables created before it existed
+
+    create_all does not add indexes to an existing table, and the ON CONFLICT
+    inserts above need it. All but the oldest of any open duplicates are
+    acknowledged first so the unique index can be built (as migration 0007 does).
+    """
+    if engine.dialect.name not in _ON_CONFLICT_INSERT:
+        return
+    if OPEN_ALERT_INDEX in {index["name"] for index in inspect(engine).get_indexes("alerts")}:
+        return
+
+    is_open = and_(Alert.is_acknowledged == False, Alert.inventory_item_id.isnot(None))
+    oldest_open = select(func.min(Alert.id)).where(is_open).group_by(Alert.inventory_item_id, Alert.alert_type)
+    with engine.begin() as connection:
+        connection.execute(
+            update(Alert).where(is_open, Alert.id.notin_(oldest_open)).values(is_acknowledged=True)
+        )
+        next(index for index in Alert.__table__.indexes if index.name == OPEN_ALERT_INDEX).create(connection)
+
+def _expiry_severity(days_until_expiry: int) -> str:
+    return "critical" if days_until_expiry <= 7 else "high" if days_until_expiry <= 14 else "medium"
+
+def _candidate_alerts(rows, now: datetime) -> List[Dict[str, Any]]:
+    """Low stock and expiry alerts the batch rows call for"""
+    expiry_limit = now + timedelta(days=EXPIRY_WARNING_DAYS)
+    alerts = []
+    for item_id, product_id, quantity, expiry_date, batch_number, name, sku, unit, reorder_point in rows:
+        if reorder_point is not None and quantity <= reorder_point:
+            alerts.append({
+                "alert_type": "low_stock",
+                "product_id": product_id,
+                "inventory_item_id": item_id,
+                "message": f"Low stock alert: {name} (SKU: {sku}) - Available: {quantity} {unit}",
+                "severity": "high",
+            })
+        if expiry_date is not None and now < expiry_date <= expiry_limit:
+            days_until_expiry = (expiry_date - now).days
+            alerts.append({
+                "alert_type": "expiry_warning",
+                "product_id": product_id,
+                "inventory_item_id": item_id,
+                "message": f"Expiry warning: {name} (Batch: {batch_number}) expires in {days_until_expiry} days",
+                "severity": _expiry_severity(days_until_expiry),
+            })
+    return alerts
+
+def _open_alert_keys(db: Session, inventory_item_ids: List[int]) -> Set[Tuple[int, str]]:
+    """(batch id, alert type) of the open alerts on these batches, from ux_alerts_open_item_type"""
+    if not inventory_item_ids:
+        return set()
+    return {
+        (item_id, alert_type)
+        for item_id, alert_type in db.query(Alert.inventory_item_id, Alert.alert_type).filter(
+            Alert.inventory_item_id.in_(inventory_item_ids),
+            Alert.is_acknowledged == False
+        )
+    }
+
+def insert_new_alerts(db: Session, alerts: List[Dict[str, Any]], now: Optional[datetime] = None) -> int:
+    """Insert the alerts that have no open twin yet, with one statement; returns how many were new"""
+    open_keys = _open_alert_keys(db, list({alert["inventory_item_id"] for alert in alerts}))
+    new = [alert for alert in alerts if (alert["inventory_item_id"], alert["alert_type"]) not in open_keys]
+    if not new:
+        return 0
+
+    now = now or datetime.utcnow()
+    for alert in new:
+        alert.update(is_acknowledged=False, created_at=now)
+    dialect_insert = _ON_CONFLICT_INSERT.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        db.execute(insert(Alert), new)
+    else:
+        db.execute(dialect_insert(Alert).on_conflict_do_nothing(
+            index_elements=["inventory_item_id", "alert_type"],
+            index_where=Alert.is_acknowledged == False
+        ), new)
+    return len(new)
+
+def _batch_rows(*conditions):
+    return select(
+        InventoryItem.id, InventoryItem.product_id, InventoryItem.quantity_available,
+        InventoryItem.expiry_date, InventoryItem.batch_number,
+        Product.name, Product.sku, Product.unit_of_measure, Product.reorder_point
+    ).join(Product, Product.id == InventoryItem.product_id).where(InventoryItem.quantity_available > 0, *conditions)
+
+def evaluate_stock_alerts(
+    db: Session,
+    product_ids: Optional[Iterable[int]] = None,
+    inventory_item_ids: Optional[Iterable[int]] = None,
+    now: Optional[datetime] = None
+) -> int:
+    """Raise low stock and expiry alerts for the batches a stock change touched
+
+    Only the given products' or batches' rows are read (both None means every
+    batch). Call it inside the write's transaction; returns the alerts added.
+    """
+    now = now or datetime.utcnow()
+    scope = []
+    if product_ids is not None or inventory_item_ids is not None:
+        product_ids, inventory_item_ids = list(set(product_ids or ())), list(set(inventory_item_ids or ()))
+        if not product_ids and not inventory_item_ids:
+            return 0
+        scope.append(or_(InventoryItem.product_id.in_(product_ids), InventoryItem.id.in_(inventory_item_ids)))
+
+    rows = db.execute(_batch_rows(*scope, or_(
+        InventoryItem.quantity_available <= Product.reorder_point,
+        and_(InventoryItem.expiry_date > now, InventoryItem.expiry_date <= now + timedelta(days=EXPIRY_WARNING_DAYS))
+    ))).all()
+    return insert_new_alerts(db, _candidate_alerts(rows, now), now)
+
+def sweep_expiry_alerts(db: Session, now: Optional[datetime] = None) -> int:
+    """Raise expiry warnings for batches that came within range since the last sweep
+
+    A range scan of ix_inventory_items_expiry_date over the warning window, so
+    the cost follows the batches about to expire, not the whole inventory.
+    """
+    now = now or datetime.utcnow()
+    rows = db.execute(_batch_rows(
+        InventoryItem.expiry_date > now,
+        InventoryItem.expiry_date <= now + timedelta(days=EXPIRY_WARNING_DAYS)
+    )).all()
+    alerts = [alert for alert in _candidate_alerts(rows, now) if alert["alert_type"] == "expiry_warning"]
+    created = insert_new_alerts(db, alerts, now)
+    db.commit()
+    return created
+
+def _sweep_with_new_session(session_factory):
+    db = session_factory()
+    try:
+        return sweep_expiry_alerts(db)
+    finally:
+        db.close()
+
+async def run_alert_sweeper(session_factory, interval: int = ALERT_SWEEP_INTERVAL):
+    """Background task: sweep for expiring batches every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            created = await run_in_threadpool(_sweep_with_new_session, session_factory)
+            if created:
+                logger.info("Raised %s expiry alerts", created)
+        except Exception:
+            logger.exception("Expiry alert sweep failed")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Raise stock alerts")
+    parser.add_argument("command", choices=["sweep", "evaluate"],
+                        help="sweep: expiry warnings only; evaluate: low stock and expiry for every batch")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        if args.command == "sweep":
+            created = sweep_expiry_alerts(db)
+        else:
+            created = evaluate_stock_alerts(db)
+            db.commit()
+        print(f"Raised {created} alerts")
+    finally:
+        db.close()
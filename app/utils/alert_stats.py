@@ -0,0 +1,83 @@
+# app/utils/alert_stats.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from app.models.models import Alert, HospitalInventory, InventoryItem
+from app.utils.report_cache import cached_report
+from typing import Any, Dict, List, Optional, Tuple
+import os
+
+# Seconds the alert counts are served from report_cache. Alert writes made
+# through this process (create, acknowledge, dismiss, delete) drop them on
+# commit; other workers see changes once the entry expires.
+ALERT_STATS_TTL = int(os.getenv("ALERT_STATS_TTL", "60"))
+
+# Tables the counts read: a hospital's scope also follows its product list
+ALERT_STATS_TABLES = ("alerts",)
+HOSPITAL_ALERT_STATS_TABLES = ("alerts", "hospital_inventory")
+
+SEVERITIES = ("critical", "high", "medium", "low")
+ALERT_TYPES = ("low_stock", "expiry_warning", "temperature_alert")
+
+# (severity, alert_type, is_acknowledged, alerts)
+AlertCount = Tuple[Optional[str], str, Optional[bool], int]
+
+def hospital_alert_scope(hospital_id: int):
+    """Condition limiting alerts to batches of the hospital's products"""
+    return Alert.inventory_item_id.in_(
+        select(InventoryItem.id).where(InventoryItem.product_id.in_(
+            select(HospitalInventory.product_id).where(HospitalInventory.hospital_id == hospital_id)
+        ))
+    )
+
+def query_alert_counts(db: Session, hospital_id: Optional[int] = None) -> List[AlertCount]:
+    """Alerts grouped by (severity, alert_type, is_acknowledged), in one statement"""
+    statement = select(Alert.severity, Alert.alert_type, Alert.is_acknowledged, func.count(Alert.id)).group_by(
+        Alert.severity, Alert.alert_type, Alert.is_acknowledged
+    )
+    if hospital_id is not None:
+        statement = statement.where(hospital_alert_scope(hospital_id))
+    return [tuple(row) for row in db.execute(statement)]
+
+def alert_counts(db: Session, hospital_id: Optional[int] = None) -> List[AlertCount]:
+    """query_alert_counts served from report_cache until the next alert write"""
+    tables = ALERT_STATS_TABLES if hospital_id is None else HOSPITAL_ALERT_STATS_TABLES
+    return cached_report(
+        "alert_counts", lambda: query_alert_counts(db, hospital_id), tables,
+        hospital_id=hospital_id, ttl=ALERT_STATS_TTL
+    )
+
+def summarize_alert_counts(
+    counts: List[AlertCount],
+    severity: Optional[str] = None,
+    alert_type: Optional[str] = None,
+    acknowledged: Optional[bool] = None
+) -> Dict[str, Any]:
+    """Totals for the alerts page and summary API
+
+    The grouping keys are exactly the list page's filters, so any filtered
+    view is answered from the same grouped rows.
+    """
+    summary = {
+        "total_alerts": 0,
+        "unacknowledged_alerts": 0,
+        "by_severity": dict.fromkeys(SEVERITIES, 0),
+        "unacknowledged_by_severity": dict.fromkeys(SEVERITIES, 0),
+        "unacknowledged_by_type": dict.fromkeys(ALERT_TYPES, 0),
+    }
+    for row_severity, row_type, is_acknowledged, alerts in counts:
+        if severity and row_severity != severity:
+            continue
+        if alert_type and row_type != alert_type:
+            continue
+        if acknowledged is not None and is_acknowledged != acknowledged:
+            continue
+        summary["total_alerts"] += alerts
+        if row_severity in summary["by_severity"]:
+            summary["by_severity"][row_severity] += alerts
+        if is_acknowledged == False:
+            summary["unacknowledged_alerts"] += alerts
+            if row_severity in summary["unacknowledged_by_severity"]:
+                summary["unacknowledged_by_severity"][row_severity] += alerts
+            if row_type in summary["unacknowledged_by_type"]:
+                summary["unacknowledged_by_type"][row_type] += alerts
+    return summary
@@ -0,0 +1,220 @@
+# app/utils/allocation.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select, update
+from app.models.models import InventoryItem, SalesOrderAllocation, SalesOrderItem
+from app.utils.stock_mutations import release_reserved_stock, take_reserved_stock, take_stock
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# First-expiry-first-out: batches expiring soonest first, batches without an
+# expiry date last, then oldest receipt
+FEFO_ORDER = (
+    InventoryItem.expiry_date.is_(None),
+    InventoryItem.expiry_date,
+    InventoryItem.received_date,
+    InventoryItem.id,
+)
+
+def free_quantity():
+    """Stock in a batch that is not held for anything else"""
+    return InventoryItem.quantity_available - func.coalesce(InventoryItem.quantity_reserved, 0)
+
+def load_candidate_batches(db: Session, product_ids: Iterable[int], now: Optional[datetime] = None) -> Dict[int, List[List[int]]]:
+    """Unexpired batches with free stock for all the products, as {product_id: [[batch_id, free], ...]} in FEFO order"""
+    product_ids = list(set(product_ids))
+    if not product_ids:
+        return {}
+    now = now or datetime.utcnow()
+    free = free_quantity()
+
+    rows = db.query(InventoryItem.id, InventoryItem.product_id, free).filter(
+        InventoryItem.product_id.in_(product_ids),
+        InventoryItem.status == "available",
+        free > 0,
+        or_(InventoryItem.expiry_date.is_(None), InventoryItem.expiry_date > now)
+    ).order_by(*FEFO_ORDER).all()
+
+    candidates: Dict[int, List[List[int]]] = {}
+    for batch_id, product_id, quantity in rows:
+        candidates.setdefault(product_id, []).append([batch_id, int(quantity)])
+    return candidates
+
+def allocate_lines(
+    db: Session,
+    lines: List[SalesOrderItem],
+    replan: bool = True,
+    now: Optional[datetime] = None
+) -> Dict[int, int]:
+    """Split order lines across batches FEFO and record one allocation per (line, batch)
+
+    With replan the unshipped part of every existing allocation is dropped and the
+    lines are allocated afresh (order created or edited); without it only the
+    quantity not yet allocated is added (top-up before shipping). Candidate
+    batches for all lines come from one query and stock taken by one line is not
+    offered to the next. Returns {line id: quantity that could not be allocated}.
+    """
+    lines = [line for line in lines if line.quantity_ordered]
+    if not lines:
+        return {}
+    db.flush()
+
+    existing: Dict[int, List[SalesOrderAllocation]] = {line.id: [] for line in lines}
+    allocations = db.query(SalesOrderAllocation).filter(
+        SalesOrderAllocation.sales_order_item_id.in_(list(existing))
+    ).all()
+    if replan:
+        # Stock held by the old plan goes back to the pool before re-planning
+        release_reservations(db, allocations)
+    for allocation in allocations:
+        if replan and not allocation.quantity_shipped:
+            db.delete(allocation)
+            continue
+        if replan:
+            allocation.quantity = allocation.quantity_shipped
+        existing[allocation.sales_order_item_id].append(allocation)
+
+    needed = {
+        line.id: line.quantity_ordered - sum(allocation.quantity for allocation in existing[line.id])
+        for line in lines
+    }
+    candidates = load_candidate_batches(db, [line.product_id for line in lines if needed[line.id] > 0], now)
+
+    shortfalls: Dict[int, int] = {}
+    for line in lines:
+        remaining = needed[line.id]
+        by_batch = {allocation.inventory_item_id: allocation for allocation in existing[line.id]}
+        batches = candidates.get(line.product_id, [])
+        while remaining > 0 and batches:
+            batch = batches[0]
+            quantity = min(remaining, batch[1])
+            if batch[0] in by_batch:
+                by_batch[batch[0]].quantity += quantity
+            else:
+                by_batch[batch[0]] = SalesOrderAllocation(
+                    sales_order_item_id=line.id, inventory_item_id=batch[0], quantity=quantity
+                )
+                db.add(by_batch[batch[0]])
+            batch[1] -= quantity
+            remaining -= quantity
+            if not batch[1]:
+                batches.pop(0)
+
+        if remaining > 0:
+            shortfalls[line.id] = remaining
+        if by_batch and (replan or not line.inventory_item_id):
+            # Keep the single-batch column pointing at the first batch the line draws from
+            line.inventory_item_id = next(iter(by_batch))
+
+    db.flush()
+    return shortfalls
+
+def release_reservations(db: Session, allocations: Iterable[SalesOrderAllocation]) -> Set[int]:
+    """Give the stock reserved by these allocations back to their batches; returns the batch ids touched"""
+    released: Dict[int, int] = {}
+    for allocation in allocations:
+        if allocation.quantity_reserved:
+            released[allocation.inventory_item_id] = released.get(allocation.inventory_item_id, 0) + allocation.quantity_reserved
+            allocation.quantity_reserved = 0
+            allocation.reserved_until = None
+    for inventory_item_id, quantity in released.items():
+        release_reserved_stock(db, inventory_item_id, quantity)
+    return set(released)
+
+def order_allocations(db: Session, sales_order_id: int) -> List[SalesOrderAllocation]:
+    """Every allocation of an order's lines"""
+    line_ids = select(SalesOrderItem.id).where(SalesOrderItem.sales_order_id == sales_order_id)
+    return db.query(SalesOrderAllocation).filter(SalesOrderAllocation.sales_order_item_id.in_(line_ids)).all()
+
+def release_order_allocations(db: Session, sales_order_id: int):
+    """Release and delete every allocation of an order's lines (before its lines are replaced)"""
+    allocations = order_allocations(db, sales_order_id)
+    release_reservations(db, allocations)
+    for allocation in allocations:
+        db.delete(allocation)
+    db.flush()
+
+def _record_allocation_shipped(db: Session, allocation_id: int, quantity: int, reserved: int) -> bool:
+    result = db.execute(
+        update(SalesOrderAllocation)
+        .where(
+            SalesOrderAllocation.id == allocation_id,
+            SalesOrderAllocation.quantity_shipped + quantity <= SalesOrderAllocation.quantity,
+            SalesOrderAllocation.quantity_reserved >= reserved
+        )
+        .values(
+            quantity_shipped=SalesOrderAllocation.quantity_shipped + quantity,
+            quantity_reserved=SalesOrderAllocation.quantity_reserved - reserved
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+OpenAllocation = Tuple[int, int, int, int]
+
+def _open_allocations(db: Session, line_ids: List[int]) -> Dict[int, List[OpenAllocation]]:
+    """{line id: [(allocation id, batch id, unshipped quantity, reserved quantity)]} in FEFO order, in one query"""
+    by_line: Dict[int, List[OpenAllocation]] = {line_id: [] for line_id in line_ids}
+    if not line_ids:
+        return by_line
+    rows = db.query(
+        SalesOrderAllocation.sales_order_item_id,
+        SalesOrderAllocation.id,
+        SalesOrderAllocation.inventory_item_id,
+        SalesOrderAllocation.quantity - SalesOrderAllocation.quantity_shipped,
+        SalesOrderAllocation.quantity_reserved
+    ).join(
+        InventoryItem, SalesOrderAllocation.inventory_item_id == InventoryItem.id
+    ).filter(
+        SalesOrderAllocation.sales_order_item_id.in_(line_ids),
+        SalesOrderAllocation.quantity_shipped < SalesOrderAllocation.quantity
+    ).order_by(*FEFO_ORDER).all()
+    for line_id, allocation_id, batch_id, open_quantity, reserved in rows:
+        by_line[line_id].append((allocation_id, batch_id, open_quantity, reserved))
+    return by_line
+
+def load_open_allocations(db: Session, lines: List[SalesOrderItem], quantities: Dict[int, int]) -> Dict[int, List[OpenAllocation]]:
+    """Open allocations of the lines about to ship quantities[line id]
+
+    Lines that are not (fully) allocated yet, e.g. backorders or orders created
+    before allocations existed, are topped up together first.
+    """
+    by_line = _open_allocations(db, [line.id for line in lines])
+    short = [
+        line for line in lines
+        if sum(open_quantity for _, _, open_quantity, _ in by_line[line.id]) < quantities[line.id]
+    ]
+    if short:
+        allocate_lines(db, short, replan=False)
+        by_line.update(_open_allocations(db, [line.id for line in short]))
+    return by_line
+
+def take_allocated(db: Session, allocations: List[OpenAllocation], quantity: int) -> Optional[List[Tuple[int, int]]]:
+    """Take quantity from open allocations in order; [(batch id, quantity)] taken, or None when the stock is not there"""
+    taken: List[Tuple[int, int]] = []
+    for allocation_id, batch_id, open_quantity, reserved in allocations:
+        if not quantity:
+            break
+        take = min(quantity, open_quantity)
+        # Reserved units are consumed with their reservation; the rest must still be free
+        from_reserved = min(take, reserved or 0)
+        if from_reserved and not take_reserved_stock(db, batch_id, from_reserved):
+            return None
+        if take > from_reserved and not take_stock(db, batch_id, take - from_reserved):
+            return None
+        if not _record_allocation_shipped(db, allocation_id, take, from_reserved):
+            return None
+        taken.append((batch_id, take))
+        quantity -= take
+    return None if quantity else taken
+
+def ship_line(db: Session, line: SalesOrderItem, quantity: int) -> Optional[List[Tuple[int, int]]]:
+    """Take quantity of a line from its allocated batches in FEFO order
+
+    Returns [(batch id, quantity)] taken, or None when the stock is not there;
+    the caller must roll back then.
+    """
+    allocations = load_open_allocations(db, [line], {line.id: quantity})[line.id]
+    taken = take_allocated(db, allocations, quantity)
+    if taken is not None:
+        db.expire(line, ["allocations"])
+    return taken
@@ -8,6 +8,9 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.models import User
+from app.utils.user_cache import user_cache
+from app.utils.password_hashing import password_hasher
+from app.utils.pending_users import pending_users
 import os
 from dotenv import load_dotenv
 from sqlalchemy.orm import joinedload
@@ -33,10 +36,27 @@ def get_password_hash(password):
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def verify_password_async(plain_password, hashed_password):
+    """Verify a password on the hashing pool, off the event loop"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    """Hash a password on the hashing pool, off the event loop"""
+    return await password_hasher.run(get_password_hash, password)
+
 def get_user_by_username(db: Session, username: str):
     """Get user by username with hospital relationship loaded"""
     return db.query(User).options(joinedload(User.hospital)).filter(User.username == username).first()
 
+def resolve_user(db: Session, username: str):
+    """User for a verified token subject, from the user cache when possible"""
+    user = user_cache.get(username)
+    if user is None:
+        user = get_user_by_username(db, username)
+        if user is not None:
+            user_cache.set(user)
+    return user
+
 def get_user_by_email(db: Session, email: str):
     """Get user by email"""
     return db.query(User).filter(User.email == email).first()
@@ -53,6 +73,21 @@ def authenticate_user(db: Session, username: str, password: str):
         return False
     return user
 
+async def authenticate_user_async(db: Session, username: str, password: str):
+    """authenticate_user for request handlers: the bcrypt check runs on the hashing pool"""
+    user = get_user_by_username(db, username)
+    if not user:
+        return False
+    # Give the pooled connection back while bcrypt runs; the user stays loaded
+    db.expunge(user)
+    db.rollback()
+    if not await verify_password_async(password, user.hashed_password):
+        return False
+    # Check if user requires approval and is not approved
+    if user.requires_approval and not user.is_approved:
+        return False
+    return user
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -78,7 +113,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = get_user_by_username(db, username=username)
+    user = resolve_user(db, username)
     if user is None:
         raise credentials_exception
     return user
@@ -104,7 +139,7 @@ async def get_current_user_from_cookie(access_token: Optional[str] = Cookie(None
     except JWTError:
         raise credentials_exception
     
-    user = get_user_by_username(db, username=username)
+    user = resolve_user(db, username)
     if user is None:
         raise credentials_exception
     return user
@@ -154,9 +189,6 @@ def check_user_roles_from_cookie(allowed_roles: list):
         return current_user
     return role_checker
 
-async def get_pending_users_count(db: Session = Depends(get_db)):
-    """Get count of pending user approvals"""
-    return db.query(User).filter(
-        User.requires_approval == True,
-        User.is_approved == False
-    ).count()
\ No newline at end of file
+async def get_pending_users_count():
+    """Get count of pending user approvals (in-memory counter, no query)"""
+    return pending_users.value()
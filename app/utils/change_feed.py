@@ -0,0 +1,74 @@
+# app/utils/change_feed.py
+from app.utils.report_cache import add_commit_listener
+from threading import Lock
+from typing import Iterable, Optional, Set
+import asyncio
+
+class Subscription:
+    """One listener's view of the feed: the tables changed since it last looked"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self._changed: Set[str] = set()
+        self._event = asyncio.Event()
+
+    def _notify(self, tables: frozenset):
+        # Runs on the subscriber's event loop; bursts collapse into one pending set
+        self._changed |= tables
+        self._event.set()
+
+    def drain(self) -> Set[str]:
+        """Tables changed since the last wait/drain, without waiting"""
+        changed, self._changed = self._changed, set()
+        self._event.clear()
+        return changed
+
+    async def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait for the next change; returns the changed tables, or an empty set on timeout"""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return set()
+        return self.drain()
+
+class ChangeFeed:
+    """In-process fan-out of committed table changes to asyncio subscribers
+
+    Every commit made through a Session in this process is published (the stock,
+    order and alert write paths included) after the report cache has dropped the
+    entries it made stale. Commits in other worker processes are not seen.
+    """
+
+    def __init__(self):
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = Lock()
+
+    def subscribe(self) -> Subscription:
+        """Start listening (call from the event loop that will wait on it)"""
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, tables: Iterable[str]):
+        """Tell every subscriber these tables changed (safe from any thread)"""
+        tables = frozenset(tables)
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._notify, tables)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+change_feed = ChangeFeed()
+add_commit_listener(change_feed.publish)
@@ -0,0 +1,330 @@
+# app/utils/exports.py
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from app.database import SessionLocal
+from app.models.models import (
+    Category, Customer, HospitalInventory, InventoryItem, Product, PurchaseOrder,
+    PurchaseOrderItem, SalesOrder, SalesOrderItem, StockMovement, User, Vendor
+)
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Iterator, List, NamedTuple, Optional, Tuple
+import csv
+import io
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+# Rows per Parquet row group (one cursor batch each)
+PARQUET_ROW_GROUP_SIZE = 10000
+PARQUET_COMPRESSION = "zstd"
+
+class ExportColumn(NamedTuple):
+    header: str
+    expression: Any
+    kind: str = "text"  # text, int, money, date, datetime
+
+    @property
+    def field_name(self) -> str:
+        """snake_case column name for columnar formats"""
+        return self.header.lower().replace(" ", "_")
+
+def parse_export_dates(start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Parse YYYY-MM-DD filters; end_date covers the whole day"""
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d") if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) if end_date else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must use the YYYY-MM-DD format")
+    return start, end
+
+def _date_filters(column, start: Optional[datetime], end: Optional[datetime]) -> list:
+    filters = []
+    if start:
+        filters.append(column >= start)
+    if end:
+        filters.append(column < end)
+    return filters
+
+def inventory_export(
+    hospital_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Tuple[List[ExportColumn], Any]:
+    """Inventory batches with product and category in one joined query, dates filter on received_date"""
+    columns = [
+        ExportColumn("Product Name", Product.name),
+        ExportColumn("SKU", Product.sku),
+        ExportColumn("Category", Category.name),
+        ExportColumn("Batch Number", InventoryItem.batch_number),
+        ExportColumn("Quantity Available", InventoryItem.quantity_available, "int"),
+        ExportColumn("Cost Price", InventoryItem.cost_price, "money"),
+        ExportColumn("Selling Price", InventoryItem.selling_price, "money"),
+        ExportColumn("Status", InventoryItem.status),
+        ExportColumn("Received Date", InventoryItem.received_date, "date"),
+        ExportColumn("Expiry Date", InventoryItem.expiry_date, "date"),
+    ]
+    statement = select(*[column.expression for column in columns]).select_from(InventoryItem).join(
+        Product, InventoryItem.product_id == Product.id
+    ).outerjoin(
+        Category, Product.category_id == Category.id
+    ).where(
+        *_date_filters(InventoryItem.received_date, start, end)
+    ).order_by(InventoryItem.id)
+
+    if hospital_id:
+        statement = statement.where(InventoryItem.product_id.in_(
+            select(HospitalInventory.product_id).where(HospitalInventory.hospital_id == hospital_id)
+        ))
+    return columns, statement
+
+def sales_order_export(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    hospital_id: Optional[int] = None
+) -> Tuple[List[ExportColumn], Any]:
+    """One row per sales order line with the order header and hospital"""
+    columns = [
+        ExportColumn("Order Number", SalesOrder.order_number),
+        ExportColumn("Order Date", SalesOrder.order_date, "datetime"),
+        ExportColumn("Status", SalesOrder.status),
+        ExportColumn("Hospital", Customer.name),
+        ExportColumn("SKU", Product.sku),
+        ExportColumn("Product Name", Product.name),
+        ExportColumn("Quantity Ordered", SalesOrderItem.quantity_ordered, "int"),
+        ExportColumn("Quantity Shipped", SalesOrderItem.quantity_shipped, "int"),
+        ExportColumn("Unit Price", SalesOrderItem.unit_price, "money"),
+        ExportColumn("Line Total", SalesOrderItem.total_price, "money"),
+        ExportColumn("Order Total", SalesOrder.total_amount, "money"),
+    ]
+    statement = select(*[column.expression for column in columns]).select_from(SalesOrder).join(
+        Customer, SalesOrder.customer_id == Customer.id
+    ).outerjoin(
+        SalesOrderItem, SalesOrderItem.sales_order_id == SalesOrder.id
+    ).outerjoin(
+        Product, SalesOrderItem.product_id == Product.id
+    ).where(
+        *_date_filters(SalesOrder.order_date, start, end)
+    ).order_by(SalesOrder.id, SalesOrderItem.id)
+
+    if hospital_id:
+        statement = statement.where(SalesOrder.customer_id == hospital_id)
+    return columns, statement
+
+def purchase_order_export(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Tuple[List[ExportColumn], Any]:
+    """One row per purchase order line with the order header and vendor"""
+    columns = [
+        ExportColumn("PO Number", PurchaseOrder.po_number),
+        ExportColumn("Order Date", PurchaseOrder.order_date, "datetime"),
+        ExportColumn("Expected Delivery", PurchaseOrder.expected_delivery_date, "date"),
+        ExportColumn("Status", PurchaseOrder.status),
+        ExportColumn("Vendor", Vendor.name),
+        ExportColumn("SKU", Product.sku),
+        ExportColumn("Product Name", Product.name),
+        ExportColumn("Quantity Ordered", PurchaseOrderItem.quantity_ordered, "int"),
+        ExportColumn("Quantity Received", PurchaseOrderItem.quantity_received, "int"),
+        ExportColumn("Unit Cost", PurchaseOrderItem.unit_cost, "money"),
+        ExportColumn("Line Total", PurchaseOrderItem.total_cost, "money"),
+        ExportColumn("Order Total", PurchaseOrder.total_amount, "money"),
+    ]
+    statement = select(*[column.expression for column in columns]).select_from(PurchaseOrder).join(
+        Vendor, PurchaseOrder.vendor_id == Vendor.id
+    ).outerjoin(
+        PurchaseOrderItem, PurchaseOrderItem.purchase_order_id == PurchaseOrder.id
+    ).outerjoin(
+        Product, PurchaseOrderItem.product_id == Product.id
+    ).where(
+        *_date_filters(PurchaseOrder.order_date, start, end)
+    ).order_by(PurchaseOrder.id, PurchaseOrderItem.id)
+    return columns, statement
+
+def stock_movement_export(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    hospital_id: Optional[int] = None
+) -> Tuple[List[ExportColumn], Any]:
+    """Stock movements with product, batch and the user who recorded them"""
+    created_by = aliased(User)
+    columns = [
+        ExportColumn("Date", StockMovement.created_at, "datetime"),
+        ExportColumn("Movement Type", StockMovement.movement_type),
+        ExportColumn("SKU", Product.sku),
+        ExportColumn("Product Name", Product.name),
+        ExportColumn("Batch Number", InventoryItem.batch_number),
+        ExportColumn("Quantity", StockMovement.quantity, "int"),
+        ExportColumn("Reference Type", StockMovement.reference_type),
+        ExportColumn("Reference Number", StockMovement.reference_number),
+        ExportColumn("Notes", StockMovement.notes),
+        ExportColumn("Recorded By", created_by.username),
+    ]
+    statement = select(*[column.expression for column in columns]).select_from(StockMovement).join(
+        Product, StockMovement.product_id == Product.id
+    ).outerjoin(
+        InventoryItem, StockMovement.inventory_item_id == InventoryItem.id
+    ).outerjoin(
+        created_by, StockMovement.created_by == created_by.id
+    ).where(
+        *_date_filters(StockMovement.created_at, start, end)
+    ).order_by(StockMovement.id)
+
+    if hospital_id:
+        statement = statement.where(StockMovement.product_id.in_(
+            select(HospitalInventory.product_id).where(HospitalInventory.hospital_id == hospital_id)
+        ))
+    return columns, statement
+
+# Datasets served by the columnar export: name -> (builder, accepts a hospital filter)
+EXPORT_DATASETS = {
+    "inventory": (lambda start, end, hospital_id: inventory_export(hospital_id, start, end), True),
+    "sales-orders": (sales_order_export, True),
+    "purchase-orders": (lambda start, end, hospital_id: purchase_order_export(start, end), False),
+    "stock-movements": (stock_movement_export, True),
+}
+
+def build_export(
+    dataset: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    hospital_id: Optional[int] = None
+) -> Tuple[List[ExportColumn], Any]:
+    """Columns and statement for a named dataset"""
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown export dataset '{dataset}'")
+    builder, hospital_filter = EXPORT_DATASETS[dataset]
+    if hospital_id and not hospital_filter:
+        raise HTTPException(status_code=400, detail=f"The {dataset} export cannot be filtered by hospital")
+    return builder(start, end, hospital_id)
+
+def stream_row_batches(statement, batch_size: int = EXPORT_BATCH_SIZE, session_factory=SessionLocal) -> Iterator[list]:
+    """Yield lists of result rows from a server-side cursor using a session owned by the stream"""
+    db = session_factory()
+    try:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+def _csv_value(value, kind: str):
+    if value is None:
+        return ""
+    if kind == "date":
+        return value.strftime("%Y-%m-%d")
+    if kind == "datetime":
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def stream_csv(columns: List[ExportColumn], statement, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """Encode a query as CSV one cursor batch at a time, so memory stays flat"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    kinds = [column.kind for column in columns]
+
+    writer.writerow([column.header for column in columns])
+    for rows in stream_row_batches(statement, batch_size):
+        writer.writerows(
+            [_csv_value(value, kind) for value, kind in zip(row, kinds)]
+            for row in rows
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header only when the query returned nothing
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def csv_response(columns: List[ExportColumn], statement, filename: str) -> StreamingResponse:
+    """Stream a query to the client as a CSV attachment"""
+    return StreamingResponse(
+        stream_csv(columns, statement),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+class _ChunkSink:
+    """Write-only file object that hands back whatever the Parquet writer has written so far"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+def _parquet_schema(columns: List[ExportColumn]):
+    import pyarrow as pa
+
+    types = {
+        "text": pa.string(),
+        "int": pa.int64(),
+        "money": pa.decimal128(14, 2),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("us"),
+    }
+    return pa.schema([pa.field(column.field_name, types[column.kind]) for column in columns])
+
+def stream_parquet(
+    columns: List[ExportColumn],
+    statement,
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+    compression: str = PARQUET_COMPRESSION
+) -> Iterator[bytes]:
+    """Encode a query as Parquet, writing one row group per cursor batch and yielding the bytes as they are produced"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(columns)
+    date_columns = [index for index, column in enumerate(columns) if column.kind == "date"]
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=compression)
+    try:
+        for rows in stream_row_batches(statement, row_group_size):
+            values = [list(column) for column in zip(*rows)]
+            for index in date_columns:
+                values[index] = [value.date() if isinstance(value, datetime) else value for value in values[index]]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(values, schema)],
+                schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    # Footer (and the whole file when the query returned nothing)
+    yield sink.drain()
+
+def parquet_response(columns: List[ExportColumn], statement, filename: str) -> StreamingResponse:
+    """Stream a query to the client as a Parquet attachment"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(status_code=503, detail="Parquet export requires the pyarrow package")
+    return StreamingResponse(
+        stream_parquet(columns, statement),
+        media_type="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -0,0 +1,249 @@
+# app/utils/goods_receipt.py
+from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, insert, or_, tuple_, update
+from app.models.models import InventoryItem, Product, StockMovement, User
+from app.utils.activity import movement_events, record_activity
+from app.utils.alert_engine import evaluate_stock_alerts
+from app.utils.stock_summary import refresh_product_stock_summary
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import io
+
+# Most lines accepted in one receipt
+MAX_RECEIPT_LINES = 5000
+
+ReceiptLine = Tuple[int, Dict[str, Any]]
+
+def read_receipt_csv(text: str) -> Iterator[ReceiptLine]:
+    """(row number, {column: text}) pairs from a CSV receipt; headers are case-insensitive"""
+    reader = csv.reader(io.StringIO(text.lstrip("\ufeff")))
+    headers = [header.strip().lower().replace(" ", "_") for header in next(reader, [])]
+    for row_number, values in enumerate(reader, start=2):
+        if any(value.strip() for value in values):
+            yield row_number, dict(zip(headers, values))
+
+def read_receipt_json(lines: Iterable[Dict[str, Any]]) -> Iterator[ReceiptLine]:
+    """(line number, line) pairs from a JSON receipt, numbered from 1"""
+    for line_number, line in enumerate(lines, start=1):
+        yield line_number, line if isinstance(line, dict) else {}
+
+def _text(line: Dict[str, Any], key: str) -> str:
+    value = line.get(key)
+    return "" if value is None else str(value).strip()
+
+def _decimal(line: Dict[str, Any], key: str, errors: List[str]) -> Optional[Decimal]:
+    raw = _text(line, key)
+    if not raw:
+        return None
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        errors.append(f"{key} must be a number")
+        return None
+    if not value.is_finite() or value < 0:
+        errors.append(f"{key} must be zero or more")
+        return None
+    return value.quantize(Decimal("0.01"))
+
+def _date(line: Dict[str, Any], key: str, errors: List[str]) -> Optional[datetime]:
+    raw = _text(line, key)
+    if not raw:
+        return None
+    try:
+        return datetime.strptime(raw, "%Y-%m-%d")
+    except ValueError:
+        errors.append(f"{key} must use the YYYY-MM-DD format")
+        return None
+
+def _load_products(db: Session, lines: List[ReceiptLine]) -> Tuple[Dict[int, Product], Dict[str, Product]]:
+    """One query for every product referenced by id or SKU"""
+    ids = {int(_text(line, "product_id")) for _, line in lines if _text(line, "product_id").isdigit()}
+    skus = {_text(line, "sku") for _, line in lines if _text(line, "sku")}
+    if not ids and not skus:
+        return {}, {}
+    products = db.query(Product).filter(or_(Product.id.in_(ids), Product.sku.in_(skus))).all()
+    return {product.id: product for product in products}, {product.sku: product for product in products}
+
+def _validate_line(
+    line: Dict[str, Any],
+    products_by_id: Dict[int, Product],
+    products_by_sku: Dict[str, Product],
+    today: datetime
+) -> Tuple[Dict[str, Any], List[str]]:
+    errors: List[str] = []
+
+    product_id, sku = _text(line, "product_id"), _text(line, "sku")
+    if product_id:
+        product = products_by_id.get(int(product_id)) if product_id.isdigit() else None
+    else:
+        product = products_by_sku.get(sku)
+    if not product_id and not sku:
+        errors.append("product_id or sku is required")
+    elif product is None:
+        errors.append(f"unknown product '{product_id or sku}'")
+    elif not product.is_active:
+        errors.append(f"product {product.sku} is inactive")
+
+    batch_number = _text(line, "batch_number")
+    if not batch_number:
+        errors.append("batch_number is required")
+    elif len(batch_number) > 50:
+        errors.append("batch_number must be at most 50 characters")
+
+    quantity = None
+    try:
+        quantity = int(_text(line, "quantity"))
+        if quantity <= 0:
+            errors.append("quantity must be greater than 0")
+    except ValueError:
+        errors.append("quantity must be a whole number")
+
+    cost_price = _decimal(line, "cost_price", errors)
+    if cost_price is None and not _text(line, "cost_price"):
+        errors.append("cost_price is required")
+    selling_price = _decimal(line, "selling_price", errors)
+
+    expiry_date = _date(line, "expiry_date", errors)
+    if expiry_date and expiry_date < today:
+        errors.append("expiry_date is in the past")
+
+    location = _text(line, "location")
+    if len(location) > 50:
+        errors.append("location must be at most 50 characters")
+
+    if errors:
+        return {}, errors
+    return {
+        "product": product,
+        "batch_number": batch_number,
+        "quantity": quantity,
+        "cost_price": cost_price,
+        "selling_price": selling_price if selling_price is not None else product.unit_price or cost_price,
+        "expiry_date": expiry_date,
+        "location": location or None,
+    }, []
+
+def receive_goods(
+    db: Session,
+    lines: Iterable[ReceiptLine],
+    received_by: Optional[User] = None,
+    reference_number: Optional[str] = None,
+    allow_partial: bool = False
+) -> Dict[str, Any]:
+    """Validate a multi-line delivery and book it in one transaction
+
+    Lines for a batch the product already has top up that batch; other lines
+    create new batches. Every accepted line gets a stock movement. Unless
+    allow_partial is set, a single invalid line rejects the whole receipt.
+    The delivery is also added to the activity feed.
+    """
+    lines = list(lines)
+    if len(lines) > MAX_RECEIPT_LINES:
+        raise ValueError(f"A receipt can have at most {MAX_RECEIPT_LINES} lines")
+
+    now = datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    products_by_id, products_by_sku = _load_products(db, lines)
+
+    results: List[Dict[str, Any]] = []
+    accepted: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+    for line_number, line in lines:
+        receipt, errors = _validate_line(line, products_by_id, products_by_sku, today)
+        result = {"line": line_number, "status": "error" if errors else "received"}
+        if errors:
+            result["errors"] = errors
+        else:
+            result.update(sku=receipt["product"].sku, batch_number=receipt["batch_number"], quantity=receipt["quantity"])
+            accepted.append((result, receipt))
+        results.append(result)
+
+    failed = len(results) - len(accepted)
+    if failed and not allow_partial:
+        for result, _ in accepted:
+            result["status"] = "not_received"
+        return {"received": 0, "failed": failed, "lines": results}
+    if not accepted:
+        return {"received": 0, "failed": failed, "lines": results}
+
+    # Existing batches for the delivered (product, batch) pairs, in one query
+    pairs = {(receipt["product"].id, receipt["batch_number"]) for _, receipt in accepted}
+
+    def batch_ids(keys) -> Dict[Tuple[int, str], int]:
+        return {
+            (product_id, batch_number): item_id
+            for item_id, product_id, batch_number in db.query(
+                InventoryItem.id, InventoryItem.product_id, InventoryItem.batch_number
+            ).filter(tuple_(InventoryItem.product_id, InventoryItem.batch_number).in_(keys)).all()
+        }
+
+    existing = batch_ids(pairs)
+    new_items: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    top_ups: Dict[int, int] = {}
+    for _, receipt in accepted:
+        key = (receipt["product"].id, receipt["batch_number"])
+        if key in existing:
+            top_ups[existing[key]] = top_ups.get(existing[key], 0) + receipt["quantity"]
+        elif key in new_items:
+            new_items[key]["quantity_available"] += receipt["quantity"]
+        else:
+            new_items[key] = {
+                "product_id": key[0],
+                "batch_number": key[1],
+                "quantity_available": receipt["quantity"],
+                "quantity_reserved": 0,
+                "cost_price": receipt["cost_price"],
+                "selling_price": receipt["selling_price"],
+                "expiry_date": receipt["expiry_date"],
+                "location": receipt["location"],
+                "status": "available",
+                "received_date": now,
+                "updated_at": now,
+            }
+
+    try:
+        if new_items:
+            # One executemany INSERT, then one SELECT for the generated ids
+            # (portable, unlike executemany RETURNING)
+            db.execute(insert(InventoryItem), list(new_items.values()))
+            existing.update(batch_ids(new_items.keys()))
+
+        if top_ups:
+            table = InventoryItem.__table__
+            db.execute(
+                update(table).where(table.c.id == bindparam("item_id")).values(
+                    quantity_available=table.c.quantity_available + bindparam("added"),
+                    updated_at=now
+                ),
+                [{"item_id": item_id, "added": added} for item_id, added in top_ups.items()]
+            )
+
+        movements = []
+        for result, receipt in accepted:
+            key = (receipt["product"].id, receipt["batch_number"])
+            item_id = existing[key]
+            result["inventory_item_id"] = item_id
+            movements.append({
+                "product_id": key[0],
+                "inventory_item_id": item_id,
+                "movement_type": "in",
+                "quantity": receipt["quantity"],
+                "reference_type": "goods_receipt",
+                "reference_number": reference_number or receipt["batch_number"],
+                "notes": f"Received {receipt['quantity']} units of batch {receipt['batch_number']}",
+                "created_by": received_by.id if received_by else None,
+                "created_at": now,
+            })
+        db.execute(insert(StockMovement), movements)
+        names = {receipt["product"].id: receipt["product"].name for _, receipt in accepted}
+        record_activity(db, movement_events(movements, names, received_by, now=now))
+
+        refresh_product_stock_summary(db, {key[0] for key in pairs})
+        evaluate_stock_alerts(db, inventory_item_ids=[existing[key] for key in pairs], now=now)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {"received": len(accepted), "failed": failed, "lines": results}
@@ -0,0 +1,91 @@
+# app/utils/order_numbers.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.models.models import NumberSequence, PurchaseOrder, SalesOrder
+from datetime import datetime
+from typing import Dict, List, Optional
+import os
+import threading
+
+# Numbers each worker claims from the counter table at a time. Unused numbers
+# of a block are lost when the worker stops, so numbering can have gaps.
+NUMBER_BLOCK_SIZE = int(os.getenv("ORDER_NUMBER_BLOCK_SIZE", "20"))
+
+def _seed(connection, column, prefix: str) -> int:
+    """First number for a new prefix: one past the highest number already issued with it"""
+    # Longest, then highest, so SO-2026-10000 sorts above SO-2026-9999
+    latest = connection.execute(
+        select(column).where(column.like(f"{prefix}-%"))
+        .order_by(func.length(column).desc(), column.desc()).limit(1)
+    ).scalar()
+    suffix = latest[len(prefix) + 1:] if latest else ""
+    return int(suffix) + 1 if suffix.isdigit() else 1
+
+class NumberAllocator:
+    """Hands out increasing numbers per prefix from blocks claimed in the number_sequences table
+
+    A block is claimed with one atomic increment of the prefix's counter in its
+    own short transaction, so workers never hand out the same number and no
+    lock is held while the caller's transaction runs. Within a worker numbers
+    come from memory until the block runs out.
+    """
+
+    def __init__(self, block_size: int = NUMBER_BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks: Dict[str, List[int]] = {}  # prefix -> [next, end)
+        self._lock = threading.Lock()
+
+    def _claim_block(self, db: Session, prefix: str, column) -> List[int]:
+        table = NumberSequence.__table__
+        # A separate connection: the claim commits whatever the caller's transaction does
+        with db.get_bind().connect() as connection:
+            for _ in range(2):
+                with connection.begin():
+                    result = connection.execute(
+                        update(table).where(table.c.prefix == prefix).values(
+                            next_value=table.c.next_value + self.block_size,
+                            updated_at=datetime.utcnow()
+                        )
+                    )
+                    if result.rowcount == 1:
+                        end = connection.execute(select(table.c.next_value).where(table.c.prefix == prefix)).scalar()
+                        return [end - self.block_size, end]
+                try:
+                    with connection.begin():
+                        start = _seed(connection, column, prefix)
+                        connection.execute(insert(table).values(
+                            prefix=prefix, next_value=start + self.block_size, updated_at=datetime.utcnow()
+                        ))
+                    return [start, start + self.block_size]
+                except IntegrityError:
+                    # Another worker created the counter first; take a block from it
+                    continue
+        raise RuntimeError(f"Could not claim a number block for {prefix}")
+
+    def next_value(self, db: Session, prefix: str, column) -> int:
+        """Next number for prefix; column holds the numbers already issued (used to seed a new counter)"""
+        with self._lock:
+            block = self._blocks.get(prefix)
+            if block is None or block[0] >= block[1]:
+                block = self._blocks[prefix] = self._claim_block(db, prefix, column)
+            value = block[0]
+            block[0] += 1
+            return value
+
+    def reset(self):
+        """Forget the cached blocks (tests, after restoring a database)"""
+        with self._lock:
+            self._blocks.clear()
+
+order_numbers = NumberAllocator()
+
+def next_sales_order_number(db: Session, now: Optional[datetime] = None) -> str:
+    """SO-{year}-{number:04d}"""
+    prefix = f"SO-{(now or datetime.utcnow()).year}"
+    return f"{prefix}-{order_numbers.next_value(db, prefix, SalesOrder.order_number):04d}"
+
+def next_purchase_order_number(db: Session, now: Optional[datetime] = None) -> str:
+    """PO-{year}-{number:04d}"""
+    prefix = f"PO-{(now or datetime.utcnow()).year}"
+    return f"{prefix}-{order_numbers.next_value(db, prefix, PurchaseOrder.po_number):04d}"
@@ -0,0 +1,176 @@
+# app/utils/order_status.py
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import insert
+from app.models.models import SalesOrder, SalesOrderItem, StockMovement, User
+from app.utils.activity import movement_events, record_activity, sales_order_event
+from app.utils.alert_engine import evaluate_stock_alerts
+from app.utils.allocation import OpenAllocation, load_open_allocations, take_allocated
+from app.utils.reservations import release_order_reservations, reserve_lines
+from app.utils.stock_mutations import record_shipped_quantity, transition_order_status
+from app.utils.stock_summary import refresh_product_stock_summary
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Set
+
+# Statuses a sales order can be moved to
+ORDER_STATUSES = ("pending", "confirmed", "shipped", "delivered", "cancelled")
+
+# Most orders accepted in one bulk transition
+MAX_BULK_ORDERS = 500
+
+def _remaining(item: SalesOrderItem) -> int:
+    # Lines already part-shipped only need the remainder
+    return item.quantity_ordered - (item.quantity_shipped or 0)
+
+def _conflict() -> HTTPException:
+    return HTTPException(status_code=409, detail="Sales order was changed by another request, please retry")
+
+def _ship_order(
+    db: Session,
+    sales_order: SalesOrder,
+    allocations: Dict[int, List[OpenAllocation]],
+    current_user: User,
+    now: datetime
+) -> List[Dict[str, Any]]:
+    """Take every open line of the order from its batches; returns the stock movements to write"""
+    # Claim the transition first so two concurrent requests cannot both ship the order
+    if not transition_order_status(db, sales_order.id, sales_order.status, "shipped"):
+        raise _conflict()
+
+    movements = []
+    for item in sales_order.items:
+        remaining = _remaining(item)
+        if remaining <= 0:
+            continue
+        # Take the remainder from the line's batches, first expiry first out
+        taken = take_allocated(db, allocations.get(item.id, []), remaining)
+        if taken is None:
+            product_name = item.product.name if item.product else 'Unknown'
+            raise HTTPException(status_code=400, detail=f"Insufficient stock for product {product_name}")
+        if not record_shipped_quantity(db, item.id, remaining):
+            # A partial shipment of this line landed in the meantime
+            raise _conflict()
+
+        # One stock movement per batch
+        for inventory_item_id, quantity in taken:
+            movements.append({
+                "product_id": item.product_id,
+                "inventory_item_id": inventory_item_id,
+                "movement_type": "out",
+                "quantity": -quantity,
+                "reference_type": "sales_order",
+                "reference_id": sales_order.id,
+                "reference_number": sales_order.order_number,
+                "notes": f"Sold to {sales_order.customer.name} - Order: {sales_order.order_number}",
+                "created_by": current_user.id,
+                "created_at": now,
+            })
+    return movements
+
+def _confirm_order(db: Session, sales_order: SalesOrder):
+    """Hold the order's stock so another hospital cannot promise the same units"""
+    if not transition_order_status(db, sales_order.id, "pending", "confirmed"):
+        raise _conflict()
+
+    shortfalls = reserve_lines(db, sales_order.items)
+    if shortfalls:
+        short_item = next(item for item in sales_order.items if item.id in shortfalls)
+        product_name = short_item.product.name if short_item.product else 'Unknown'
+        raise HTTPException(
+            status_code=400,
+            detail=f"Insufficient stock to reserve {shortfalls[short_item.id]} units of product {product_name}"
+        )
+
+def _apply_status(
+    db: Session,
+    sales_order: SalesOrder,
+    status: str,
+    allocations: Dict[int, List[OpenAllocation]],
+    current_user: User,
+    now: datetime
+) -> List[Dict[str, Any]]:
+    old_status = sales_order.status
+    if status == "shipped" and old_status != "shipped":
+        return _ship_order(db, sales_order, allocations, current_user, now)
+    if status == "confirmed" and old_status == "pending":
+        _confirm_order(db, sales_order)
+        return []
+
+    if status in ("pending", "cancelled") and old_status == "confirmed":
+        # Give the held stock back to the pool
+        release_order_reservations(db, sales_order.id)
+    if not transition_order_status(db, sales_order.id, old_status, status):
+        raise _conflict()
+    return []
+
+def transition_orders(db: Session, order_ids: Iterable[int], status: str, current_user: User) -> List[Dict[str, Any]]:
+    """Move many sales orders to status in one transaction, reporting each order separately
+
+    Orders, lines, products and the open batch allocations of every line to ship
+    are loaded with a few IN queries up front. Each order runs in its own
+    SAVEPOINT, so one that fails (stock gone, changed concurrently) is rolled
+    back and reported without aborting the others. Stock is taken with
+    conditional UPDATEs; the stock movements of all shipped orders, and the
+    activity feed rows of every order moved, are written with one bulk insert
+    each at the end.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    orders = {
+        order.id: order
+        for order in db.query(SalesOrder).options(
+            selectinload(SalesOrder.customer),
+            selectinload(SalesOrder.items).selectinload(SalesOrderItem.product)
+        ).filter(SalesOrder.id.in_(order_ids)).all()
+    }
+
+    allocations: Dict[int, List[OpenAllocation]] = {}
+    if status == "shipped":
+        lines = [
+            item for order in orders.values() if order.status != "shipped"
+            for item in order.items if _remaining(item) > 0
+        ]
+        allocations = load_open_allocations(db, lines, {line.id: _remaining(line) for line in lines})
+
+    now = datetime.utcnow()
+    results: List[Dict[str, Any]] = []
+    movements: List[Dict[str, Any]] = []
+    events: List[Dict[str, Any]] = []
+    shipped_products: Set[int] = set()
+    for order_id in order_ids:
+        sales_order = orders.get(order_id)
+        if sales_order is None:
+            results.append({"order_id": order_id, "result": "error", "status_code": 404, "error": "Sales order not found"})
+            continue
+
+        result = {"order_id": order_id, "order_number": sales_order.order_number, "from_status": sales_order.status}
+        savepoint = db.begin_nested()
+        try:
+            order_movements = _apply_status(db, sales_order, status, allocations, current_user, now)
+            savepoint.commit()
+        except HTTPException as error:
+            savepoint.rollback()
+            result.update(result="error", status_code=error.status_code, error=error.detail)
+        else:
+            result.update(result="ok", to_status=status)
+            movements.extend(order_movements)
+            customer_name = sales_order.customer.name if sales_order.customer else None
+            if order_movements:
+                shipped_products.update(item.product_id for item in sales_order.items)
+                names = {item.product_id: item.product.name for item in sales_order.items if item.product}
+                events.extend(movement_events(order_movements, names, current_user, sales_order.customer_id, now))
+            if result["from_status"] != status:
+                events.append(sales_order_event(sales_order, status, customer_name, current_user, now))
+        results.append(result)
+
+    try:
+        if movements:
+            db.execute(insert(StockMovement), movements)
+        record_activity(db, events)
+        if shipped_products:
+            refresh_product_stock_summary(db, shipped_products)
+            evaluate_stock_alerts(db, inventory_item_ids=[movement["inventory_item_id"] for movement in movements], now=now)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return results
@@ -0,0 +1,126 @@
+# app/utils/pagination.py
+from fastapi import HTTPException, Request
+from sqlalchemy import and_, or_
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 200
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode a (sort value, id) position as an opaque URL-safe token"""
+    if isinstance(sort_value, datetime):
+        payload = {"t": "dt", "v": sort_value.isoformat(), "id": row_id}
+    else:
+        payload = {"t": "raw", "v": sort_value, "id": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = payload["v"]
+        if payload["t"] == "dt" and value is not None:
+            value = datetime.fromisoformat(value)
+        return value, int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+class KeysetPage:
+    """One page of a newest-first keyset query plus the cursors around it"""
+
+    def __init__(self, items: List[Any], has_next: bool, has_prev: bool,
+                 next_cursor: Optional[str], prev_cursor: Optional[str],
+                 per_page: int, request: Optional[Request] = None):
+        self.items = items
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.per_page = per_page
+        self._request = request
+
+    def _url(self, **params) -> Optional[str]:
+        if self._request is None:
+            return None
+        url = self._request.url.remove_query_params(["after", "before"])
+        return str(url.include_query_params(**params))
+
+    @property
+    def next_url(self) -> Optional[str]:
+        """Link to the following (older) page, keeping the other query parameters"""
+        return self._url(after=self.next_cursor) if self.has_next else None
+
+    @property
+    def prev_url(self) -> Optional[str]:
+        """Link to the preceding (newer) page, keeping the other query parameters"""
+        return self._url(before=self.prev_cursor) if self.has_prev else None
+
+    def to_dict(self) -> dict:
+        """Cursor fields for JSON responses"""
+        return {
+            "has_next": self.has_next,
+            "next_cursor": self.next_cursor,
+            "has_prev": self.has_prev,
+            "prev_cursor": self.prev_cursor,
+            "per_page": self.per_page
+        }
+
+def clamp_per_page(per_page: Optional[int]) -> int:
+    """Keep page sizes between 1 and MAX_PER_PAGE"""
+    if not per_page or per_page < 1:
+        return DEFAULT_PER_PAGE
+    return min(per_page, MAX_PER_PAGE)
+
+def paginate_keyset(
+    query,
+    sort_column,
+    id_column,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+    per_page: Optional[int] = DEFAULT_PER_PAGE,
+    request: Optional[Request] = None
+) -> KeysetPage:
+    """Seek-paginate a query newest first on (sort_column, id_column).
+
+    `after` returns the rows older than the cursor, `before` the rows newer than it.
+    Only per_page + 1 rows are read, so the cost does not grow with the page number.
+    """
+    per_page = clamp_per_page(per_page)
+
+    if before:
+        sort_value, row_id = decode_cursor(before)
+        rows = query.filter(or_(
+            sort_column > sort_value,
+            and_(sort_column == sort_value, id_column > row_id)
+        )).order_by(sort_column.asc(), id_column.asc()).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_next = True
+    else:
+        if after:
+            sort_value, row_id = decode_cursor(after)
+            query = query.filter(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id)
+            ))
+        rows = query.order_by(sort_column.desc(), id_column.desc()).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = bool(after)
+
+    sort_key, id_key = sort_column.key, id_column.key
+    first, last = (items[0], items[-1]) if items else (None, None)
+    return KeysetPage(
+        items=items,
+        has_next=has_next and last is not None,
+        has_prev=has_prev and first is not None,
+        next_cursor=encode_cursor(getattr(last, sort_key), getattr(last, id_key)) if last is not None else None,
+        prev_cursor=encode_cursor(getattr(first, sort_key), getattr(first, id_key)) if first is not None else None,
+        per_page=per_page,
+        request=request
+    )
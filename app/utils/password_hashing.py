@@ -0,0 +1,90 @@
+# app/utils/password_hashing.py
+from fastapi import HTTPException
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import os
+import time
+
+# bcrypt costs ~200 ms of CPU per call; it runs on these threads (bcrypt releases
+# the GIL) instead of the event loop. 0 runs it inline, blocking the loop.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Calls allowed to wait for a worker; beyond this sign-ins are refused with a 503
+# instead of piling up behind each other
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+class PasswordHashExecutor:
+    """Bounded thread pool for password hashing with queue-depth metrics"""
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE):
+        self._lock = Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.configure(workers, max_queue)
+
+    def configure(self, workers: int, max_queue: int):
+        """(Re)size the pool and reset the metrics"""
+        with self._lock:
+            previous = self._executor
+            self.workers = workers
+            self.max_queue = max_queue
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash") if workers > 0 else None
+            self.queued = 0
+            self.running = 0
+            self.max_queued = 0
+            self.completed = 0
+            self.rejected = 0
+            self.total_wait = 0.0
+            self.total_run = 0.0
+        if previous is not None:
+            previous.shutdown(wait=False)
+
+    def _run_job(self, func: Callable, args, submitted: float):
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.total_wait += started - submitted
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.total_run += time.perf_counter() - started
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run func(*args) on the pool and await it; 503 when the queue is full"""
+        submitted = time.perf_counter()
+        with self._lock:
+            executor = self._executor
+            if executor is not None and self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many sign-ins in progress, please try again",
+                    headers={"Retry-After": "1"}
+                )
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        if executor is None:
+            # Inline on the caller's thread (blocks the event loop)
+            return self._run_job(func, args, submitted)
+        return await asyncio.wrap_future(executor.submit(self._run_job, func, args, submitted))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(1000 * self.total_wait / self.completed, 2) if self.completed else 0.0,
+                "avg_run_ms": round(1000 * self.total_run / self.completed, 2) if self.completed else 0.0
+            }
+
+password_hasher = PasswordHashExecutor()
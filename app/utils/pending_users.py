@@ -0,0 +1,82 @@
+# app/utils/pending_users.py
+from sqlalchemy.orm import Session
+from app.models.models import User
+from threading import Lock
+from typing import Optional
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds before the in-memory count is re-read from the database (catches
+# registrations and approvals handled by other workers)
+PENDING_USERS_RESYNC_SECONDS = int(os.getenv("PENDING_USERS_RESYNC_SECONDS", "300"))
+
+def count_pending_users(db: Session) -> int:
+    return db.query(User).filter(
+        User.requires_approval == True,
+        User.is_approved == False
+    ).count()
+
+class PendingUsersCounter:
+    """Number of users waiting for approval, kept in memory for the navigation badge
+
+    The registration and approval paths adjust it as they commit; a periodic
+    re-count in the background corrects drift. Reading it never touches the
+    database.
+    """
+
+    def __init__(self, resync_seconds: int = PENDING_USERS_RESYNC_SECONDS):
+        self.resync_seconds = resync_seconds
+        self._value = 0
+        self._loaded_at: Optional[float] = None
+        self._reloading = False
+        self._lock = Lock()
+
+    def load(self, db: Session) -> int:
+        """Re-count from the database"""
+        value = count_pending_users(db)
+        with self._lock:
+            self._value = value
+            self._loaded_at = time.monotonic()
+        return value
+
+    def _reload_with_new_session(self):
+        from app.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            self.load(db)
+        except Exception:
+            logger.exception("Re-counting pending users failed")
+        finally:
+            db.close()
+            with self._lock:
+                self._reloading = False
+
+    def adjust(self, delta: int):
+        """Apply a committed registration (+1) or approval/rejection/deletion (-1)"""
+        with self._lock:
+            self._value = max(self._value + delta, 0)
+
+    def value(self) -> int:
+        """Current count; schedules a background re-count (without waiting) when it is stale"""
+        with self._lock:
+            stale = self._loaded_at is None or time.monotonic() - self._loaded_at > self.resync_seconds
+            if stale and not self._reloading:
+                self._reloading = True
+            else:
+                stale = False
+            value = self._value
+        if stale:
+            try:
+                asyncio.get_running_loop().run_in_executor(None, self._reload_with_new_session)
+            except RuntimeError:
+                # No event loop (scripts): re-count inline
+                self._reload_with_new_session()
+                value = self._value
+        return value
+
+pending_users = PendingUsersCounter()
@@ -0,0 +1,326 @@
+# app/utils/product_import.py
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app.models.models import Category, Product, Vendor
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import io
+import os
+
+# Rows validated and upserted per statement/transaction
+IMPORT_CHUNK_SIZE = int(os.getenv("PRODUCT_IMPORT_CHUNK_SIZE", "500"))
+
+REQUIRED_COLUMNS = ("sku", "name")
+
+# Accepted alternative spellings of the import headers
+HEADER_ALIASES = {
+    "product_name": "name",
+    "category_name": "category",
+    "vendor_name": "vendor",
+    "uom": "unit_of_measure",
+}
+
+ProductRow = Tuple[int, Dict[str, Any]]
+
+def _normalize_header(header) -> str:
+    key = str(header or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return HEADER_ALIASES.get(key, key)
+
+def _text(max_length: Optional[int]) -> Callable[[str], str]:
+    def parse(value: str) -> str:
+        if max_length and len(value) > max_length:
+            raise ValueError(f"must be at most {max_length} characters")
+        return value
+    return parse
+
+def _money(value: str) -> Decimal:
+    try:
+        amount = Decimal(value.replace(",", ""))
+    except InvalidOperation:
+        raise ValueError("must be a number")
+    if not amount.is_finite() or amount < 0:
+        raise ValueError("must be zero or more")
+    return amount.quantize(Decimal("0.01"))
+
+def _count(value: str) -> int:
+    try:
+        number = int(float(value))
+    except ValueError:
+        raise ValueError("must be a whole number")
+    if number < 0:
+        raise ValueError("must be zero or more")
+    return number
+
+def _temperature(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError("must be a number")
+
+def _flag(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in ("1", "true", "yes", "y"):
+        return True
+    if lowered in ("0", "false", "no", "n"):
+        return False
+    raise ValueError("must be yes/no or true/false")
+
+# Product columns that can be imported: column -> parser
+FIELD_PARSERS = {
+    "name": _text(200),
+    "description": _text(None),
+    "unit_of_measure": _text(20),
+    "unit_price": _money,
+    "cost_price": _money,
+    "reorder_point": _count,
+    "max_stock_level": _count,
+    "storage_temperature_min": _temperature,
+    "storage_temperature_max": _temperature,
+    "requires_cold_chain": _flag,
+    "is_controlled_substance": _flag,
+    "is_active": _flag,
+}
+
+def _column_default(column: str):
+    default = Product.__table__.c[column].default
+    return default.arg if default is not None and default.is_scalar else None
+
+class ProductImportReport:
+    """Counts and per-row errors of one import run"""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def add_error(self, row_number: int, sku: Optional[str], messages: List[str]):
+        self.errors.append({"row": row_number, "sku": sku or "", "errors": messages})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def errors_csv(self) -> str:
+        """The error report as CSV (row, sku, error)"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(["Row", "SKU", "Error"])
+        for error in self.errors:
+            writer.writerow([error["row"], error["sku"], "; ".join(error["errors"])])
+        return buffer.getvalue()
+
+def _check_headers(headers: List[str]):
+    missing = [column for column in REQUIRED_COLUMNS if column not in headers]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+
+def _read_csv_rows(file) -> Iterator[ProductRow]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        headers = [_normalize_header(header) for header in next(reader, [])]
+        _check_headers(headers)
+        for row_number, values in enumerate(reader, start=2):
+            if any(value.strip() for value in values):
+                yield row_number, dict(zip(headers, values))
+    finally:
+        # Leave the underlying upload open for its owner
+        text.detach()
+
+def _read_xlsx_rows(file) -> Iterator[ProductRow]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the openpyxl package")
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_normalize_header(header) for header in next(rows, ())]
+        _check_headers(headers)
+        for row_number, values in enumerate(rows, start=2):
+            values = ["" if value is None else str(value) for value in values]
+            if any(value.strip() for value in values):
+                yield row_number, dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+def read_product_rows(file, filename: str) -> Iterator[ProductRow]:
+    """Stream (row number, {column: text}) pairs from a CSV or XLSX upload"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".csv":
+        return _read_csv_rows(file)
+    if extension in (".xlsx", ".xlsm"):
+        return _read_xlsx_rows(file)
+    raise ValueError("Upload a .csv or .xlsx file")
+
+def _lookup_map(db: Session, model) -> Dict[str, int]:
+    return {name.strip().lower(): model_id for model_id, name in db.query(model.id, model.name).all() if name}
+
+def _validate_row(
+    values: Dict[str, Any],
+    columns: List[str],
+    categories: Dict[str, int],
+    vendors: Dict[str, int]
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Parse one row into product column values, collecting every problem"""
+    record: Dict[str, Any] = {}
+    errors: List[str] = []
+
+    sku = str(values.get("sku") or "").strip()
+    if not sku:
+        errors.append("sku is required")
+    elif len(sku) > 50:
+        errors.append("sku must be at most 50 characters")
+    record["sku"] = sku
+
+    for column in columns:
+        raw = str(values.get(column) or "").strip()
+        if column == "category" or column == "vendor":
+            lookup = categories if column == "category" else vendors
+            if raw and raw.lower() not in lookup:
+                errors.append(f"unknown {column} '{raw}'")
+            record[f"{column}_id"] = lookup.get(raw.lower()) if raw else None
+        elif not raw:
+            if column in REQUIRED_COLUMNS:
+                errors.append(f"{column} is required")
+            record[column] = _column_default(column)
+        else:
+            try:
+                record[column] = FIELD_PARSERS[column](raw)
+            except ValueError as error:
+                errors.append(f"{column} {error}")
+
+    return record, errors
+
+def _upsert_statement(dialect_name: str, columns: List[str], now: datetime):
+    """INSERT ... ON CONFLICT (sku) DO UPDATE for the dialects the app runs on"""
+    table = Product.__table__
+    if dialect_name in ("sqlite", "postgresql"):
+        insert = sqlite.insert(table) if dialect_name == "sqlite" else postgresql.insert(table)
+        updates = {column: insert.excluded[column] for column in columns}
+        updates["updated_at"] = now
+        return insert.on_conflict_do_update(index_elements=[table.c.sku], set_=updates)
+    if dialect_name == "mysql":
+        insert = mysql.insert(table)
+        updates = {column: insert.inserted[column] for column in columns}
+        updates["updated_at"] = now
+        return insert.on_duplicate_key_update(updates)
+    raise ValueError(f"No upsert for dialect {dialect_name}")
+
+def _write_chunk(
+    db: Session,
+    records: List[Dict[str, Any]],
+    columns: List[str],
+    update_existing: bool,
+    report: ProductImportReport
+):
+    existing = {
+        sku for (sku,) in db.query(Product.sku).filter(Product.sku.in_([record["sku"] for record in records])).all()
+    }
+    if not update_existing:
+        report.skipped += sum(1 for record in records if record["sku"] in existing)
+        records = [record for record in records if record["sku"] not in existing]
+        if not records:
+            return
+
+    db.execute(_upsert_statement(db.bind.dialect.name, columns, datetime.utcnow()), records)
+    updated = sum(1 for record in records if record["sku"] in existing)
+    report.updated += updated
+    report.created += len(records) - updated
+
+def _finish_chunk(db: Session, dry_run: bool):
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+
+def import_products(
+    db: Session,
+    rows: Iterable[ProductRow],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    update_existing: bool = True,
+    dry_run: bool = False
+) -> ProductImportReport:
+    """Validate rows and upsert them by SKU in chunks; invalid rows are reported and left out
+
+    Columns present in the file are written for every row (blank cells take the
+    column default); columns absent from the file keep their current values.
+    Each chunk commits on its own unless dry_run is set.
+    """
+    report = ProductImportReport()
+    categories = _lookup_map(db, Category)
+    vendors = _lookup_map(db, Vendor)
+
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return report
+    headers = list(first[1].keys())
+    columns = [column for column in headers if column in FIELD_PARSERS or column in ("category", "vendor")]
+    record_columns = [f"{column}_id" if column in ("category", "vendor") else column for column in columns]
+
+    seen: Dict[str, int] = {}
+    chunk: List[Dict[str, Any]] = []
+    for row_number, values in chain([first], rows):
+        record, errors = _validate_row(values, columns, categories, vendors)
+        sku = record["sku"]
+        if sku and sku in seen:
+            errors.append(f"duplicate sku, first seen on row {seen[sku]}")
+        if errors:
+            report.add_error(row_number, sku, errors)
+            continue
+        seen[sku] = row_number
+        chunk.append(record)
+
+        if len(chunk) >= chunk_size:
+            _write_chunk(db, chunk, record_columns, update_existing, report)
+            _finish_chunk(db, dry_run)
+            chunk = []
+
+    if chunk:
+        _write_chunk(db, chunk, record_columns, update_existing, report)
+        _finish_chunk(db, dry_run)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a product catalog from CSV or XLSX")
+    parser.add_argument("path", help="CSV or XLSX file with at least sku and name columns")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="rows per upsert statement")
+    parser.add_argument("--skip-existing", action="store_true", help="leave products whose SKU already exists untouched")
+    parser.add_argument("--dry-run", action="store_true", help="validate and roll back")
+    parser.add_argument("--errors", help="write the per-row error report to this CSV file")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as file:
+            report = import_products(
+                db,
+                read_product_rows(file, args.path),
+                chunk_size=args.chunk_size,
+                update_existing=not args.skip_existing,
+                dry_run=args.dry_run
+            )
+        print(f"Created: {report.created}, updated: {report.updated}, "
+              f"skipped: {report.skipped}, failed: {len(report.errors)}")
+        if args.errors:
+            with open(args.errors, "w", newline="") as errors_file:
+                errors_file.write(report.errors_csv())
+        else:
+            for error in report.errors[:20]:
+                print(f"  row {error['row']} ({error['sku']}): {'; '.join(error['errors'])}")
+    finally:
+        db.close()
@@ -0,0 +1,132 @@
+# app/utils/query_stats.py
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from collections import Counter, deque
+from contextvars import ContextVar
+from threading import Lock
+from typing import Deque, Dict, Optional
+import os
+import time
+
+# Opt-in: set QUERY_STATS_ENABLED=1 to count queries per request
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "").lower() in ("1", "true", "yes")
+
+# The same statement issued this many times in one request is reported as a likely N+1
+REPEAT_THRESHOLD = int(os.getenv("QUERY_STATS_REPEAT_THRESHOLD", "5"))
+
+# Requests kept per route for the rolling summary
+ROUTE_WINDOW = int(os.getenv("QUERY_STATS_WINDOW", "200"))
+
+class RequestQueryStats:
+    """Statements executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    @property
+    def repeated(self) -> Dict[str, int]:
+        """Statements executed at least REPEAT_THRESHOLD times"""
+        return {sql: n for sql, n in self.statements.items() if n >= REPEAT_THRESHOLD}
+
+    def server_timing(self, total_ms: float) -> str:
+        """Server-Timing header value for this request"""
+        parts = [
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"',
+            f"app;dur={total_ms:.2f}"
+        ]
+        repeated = self.repeated
+        if repeated:
+            parts.append(f'db-repeated;desc="{len(repeated)} statements x{max(repeated.values())}"')
+        return ", ".join(parts)
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("query_stats", default=None)
+
+_route_samples: Dict[str, Deque[dict]] = {}
+_route_lock = Lock()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    starts = conn.info.get("query_stats_start")
+    if stats is None or not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+def install_query_stats(engine: Engine):
+    """Attach the per-request counters to a sync engine (use async_engine.sync_engine for async)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def _route_key(request: Request) -> str:
+    """Group requests by route template rather than by concrete URL"""
+    route = request.scope.get("route")
+    return f"{request.method} {getattr(route, 'path', request.url.path)}"
+
+def _record_route_sample(key: str, stats: RequestQueryStats, total_ms: float):
+    sample = {
+        "queries": stats.count,
+        "db_ms": stats.duration * 1000,
+        "total_ms": total_ms,
+        "repeated": stats.repeated
+    }
+    with _route_lock:
+        _route_samples.setdefault(key, deque(maxlen=ROUTE_WINDOW)).append(sample)
+
+async def query_stats_middleware(request: Request, call_next):
+    """Count statements and DB time for a request and report them as Server-Timing"""
+    stats = RequestQueryStats()
+    token = _current_stats.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    total_ms = (time.perf_counter() - started) * 1000
+    response.headers["Server-Timing"] = stats.server_timing(total_ms)
+    _record_route_sample(_route_key(request), stats, total_ms)
+    return response
+
+def get_route_query_summary() -> Dict[str, dict]:
+    """Rolling per-route query statistics over the last ROUTE_WINDOW requests"""
+    with _route_lock:
+        snapshot = {key: list(samples) for key, samples in _route_samples.items()}
+
+    summary = {}
+    for key, samples in snapshot.items():
+        queries = sorted(sample["queries"] for sample in samples)
+        repeated = Counter()
+        for sample in samples:
+            for sql, n in sample["repeated"].items():
+                repeated[sql] = max(repeated[sql], n)
+
+        summary[key] = {
+            "requests": len(samples),
+            "avg_queries": round(sum(queries) / len(samples), 2),
+            "p95_queries": queries[min(len(queries) - 1, int(len(queries) * 0.95))],
+            "max_queries": queries[-1],
+            "avg_db_ms": round(sum(sample["db_ms"] for sample in samples) / len(samples), 2),
+            "max_db_ms": round(max(sample["db_ms"] for sample in samples), 2),
+            "avg_total_ms": round(sum(sample["total_ms"] for sample in samples) / len(samples), 2),
+            "repeated_statements": [
+                {"statement": sql, "max_per_request": n} for sql, n in repeated.most_common(5)
+            ]
+        }
+    return dict(sorted(summary.items(), key=lambda item: item[1]["avg_queries"], reverse=True))
+
+def reset_route_query_summary():
+    """Forget every recorded sample"""
+    with _route_lock:
+        _route_samples.clear()
@@ -0,0 +1,191 @@
+# app/utils/report_cache.py
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from datetime import date, datetime
+from itertools import chain
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import os
+import pickle
+import time
+
+REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", "300"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Tables read by the reports and dashboards
+SALES_TABLES = ("sales_orders", "sales_order_items", "customers")
+PURCHASE_TABLES = ("purchase_orders", "purchase_order_items", "vendors")
+INVENTORY_TABLES = ("inventory_items", "products", "product_stock_summary", "stock_movements")
+ROLLUP_TABLES = ("daily_sales_rollup", "daily_purchase_rollup", "rollup_watermarks")
+
+class ReportCache:
+    """In-process LRU cache for report payloads with TTLs, a memory cap and table-based invalidation"""
+
+    def __init__(self, max_bytes: int = REPORT_CACHE_MAX_BYTES, default_ttl: int = REPORT_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        # key -> (expires_at, size, tables, value), least recently used first
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, frozenset, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _remove(self, key):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[3]
+
+    def set(self, key, value, tables: Iterable[str], ttl: Optional[int] = None):
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, frozenset(tables), value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute: Callable[[], Any], tables: Iterable[str], ttl: Optional[int] = None):
+        """Return the cached payload for key, computing and storing it on a miss"""
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.set(key, value, tables, ttl)
+        return value
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Drop every entry that read one of the given tables"""
+        tables = set(tables)
+        if not tables:
+            return 0
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[2] & tables]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "default_ttl": self.default_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+report_cache = ReportCache()
+
+def _key_part(value):
+    # Default ranges end at "now"; flooring to the TTL window lets viewers share an entry
+    if isinstance(value, datetime):
+        return int(value.timestamp() // max(REPORT_CACHE_TTL, 1))
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def report_cache_key(report_name: str, start_date=None, end_date=None, hospital_id: Optional[int] = None, **params) -> Tuple:
+    """Cache key covering the report type, date range and hospital scope"""
+    return (
+        report_name,
+        _key_part(start_date),
+        _key_part(end_date),
+        hospital_id,
+        tuple(sorted((name, _key_part(value)) for name, value in params.items()))
+    )
+
+def cached_report(
+    report_name: str,
+    compute: Callable[[], Any],
+    tables: Iterable[str],
+    start_date=None,
+    end_date=None,
+    hospital_id: Optional[int] = None,
+    ttl: Optional[int] = None,
+    **params
+):
+    """Serve a report payload from report_cache, recomputing it when missing or stale"""
+    key = report_cache_key(report_name, start_date, end_date, hospital_id, **params)
+    return report_cache.get_or_compute(key, compute, tables, ttl)
+
+# Write-driven invalidation: remember which tables a transaction touched and
+# drop the dependent reports once it commits. SAVEPOINTs (begin_nested) fire
+# the commit and rollback events too; only the outermost transaction decides,
+# so one failed savepoint keeps the writes of the ones that succeeded.
+
+def _touched_tables(session: Session) -> set:
+    return session.info.setdefault("report_cache_tables", set())
+
+def _after_flush(session: Session, flush_context):
+    touched = _touched_tables(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            touched.add(table)
+
+def _do_orm_execute(orm_execute_state):
+    # Bulk UPDATE / DELETE / INSERT statements bypass the unit of work
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _touched_tables(orm_execute_state.session).add(table.name)
+
+# Called with the tables of every commit once the cache has dropped its stale
+# entries (e.g. the dashboard change feed), so listeners recompute fresh data
+_commit_listeners: List[Callable[[set], None]] = []
+
+def add_commit_listener(callback: Callable[[set], None]):
+    if callback not in _commit_listeners:
+        _commit_listeners.append(callback)
+
+def _after_commit(session: Session):
+    if session.in_nested_transaction():
+        return
+    touched = session.info.pop("report_cache_tables", None)
+    if touched:
+        report_cache.invalidate_tables(touched)
+        for callback in _commit_listeners:
+            callback(touched)
+
+def _after_soft_rollback(session: Session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop("report_cache_tables", None)
+
+def install_report_cache_invalidation():
+    """Invalidate cached reports from every session's commits (sync and async)"""
+    if not event.contains(Session, "after_commit", _after_commit):
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "do_orm_execute", _do_orm_execute)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_soft_rollback", _after_soft_rollback)
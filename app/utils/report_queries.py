@@ -0,0 +1,158 @@
+# app/utils/report_queries.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case
+from app.models.models import PurchaseOrder, SalesOrder
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+GRANULARITIES = ("day", "week", "month")
+
+# Order statuses that count as booked revenue / incurred expense
+REVENUE_STATUSES = ["delivered", "shipped"]
+EXPENSE_STATUSES = ["received", "shipped"]
+
+# Period options offered by the report filters
+PERIOD_GRANULARITY = {"daily": "day", "weekly": "week", "monthly": "month"}
+
+def _label_format(granularity: str) -> str:
+    return "%Y-%m" if granularity == "month" else "%Y-%m-%d"
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """First instant of the bucket containing value (weeks start on Monday)"""
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+def next_bucket(start: datetime, granularity: str) -> datetime:
+    """First instant of the bucket after the one starting at start"""
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(days=7)
+    return (start + timedelta(days=32)).replace(day=1)
+
+def bucket_labels(start_date: datetime, end_date: datetime, granularity: str) -> List[Tuple[str, datetime]]:
+    """Every bucket touching [start_date, end_date], oldest first, as (label, bucket start)"""
+    buckets = []
+    current = bucket_start(start_date, granularity)
+    while current <= end_date:
+        buckets.append((current.strftime(_label_format(granularity)), current))
+        current = next_bucket(current, granularity)
+    return buckets
+
+def bucket_expression(column, granularity: str, dialect_name: str):
+    """SQL expression truncating a datetime column to its bucket label.
+
+    Labels match bucket_labels(): 'YYYY-MM' for months, the Monday 'YYYY-MM-DD' for weeks.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    if dialect_name == "sqlite":
+        if granularity == "week":
+            # Step forward to Sunday, then back six days to that week's Monday
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime(_label_format(granularity), column)
+
+    if dialect_name == "mysql":
+        if granularity == "week":
+            return func.date_format(func.subdate(column, func.weekday(column)), "%Y-%m-%d")
+        return func.date_format(column, _label_format(granularity))
+
+    if dialect_name == "postgresql":
+        pattern = "YYYY-MM" if granularity == "month" else "YYYY-MM-DD"
+        return func.to_char(func.date_trunc(granularity, column), pattern)
+
+    raise ValueError(f"No date truncation for dialect {dialect_name}")
+
+def _bucketed_range(start_date: datetime, end_date: datetime, granularity: str) -> Tuple[datetime, datetime]:
+    """Half-open range covering every whole bucket touching [start_date, end_date]"""
+    buckets = bucket_labels(start_date, end_date, granularity)
+    return buckets[0][1], next_bucket(buckets[-1][1], granularity)
+
+def sales_by_bucket(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    granularity: str = "month",
+    customer_id: Optional[int] = None
+) -> Dict[str, Dict[str, float]]:
+    """Revenue, total order value and order count per bucket in one GROUP BY"""
+    range_start, range_end = _bucketed_range(start_date, end_date, granularity)
+    bucket = bucket_expression(SalesOrder.order_date, granularity, db.bind.dialect.name).label("bucket")
+
+    query = db.query(
+        bucket,
+        func.coalesce(func.sum(case(
+            (SalesOrder.status.in_(REVENUE_STATUSES), SalesOrder.total_amount), else_=0
+        )), 0),
+        func.coalesce(func.sum(SalesOrder.total_amount), 0),
+        func.count(SalesOrder.id)
+    ).filter(
+        SalesOrder.order_date >= range_start,
+        SalesOrder.order_date < range_end
+    )
+    if customer_id is not None:
+        query = query.filter(SalesOrder.customer_id == customer_id)
+
+    return {
+        label: {"revenue": float(revenue), "order_value": float(order_value), "orders": orders}
+        for label, revenue, order_value, orders in query.group_by(bucket).all()
+    }
+
+def purchases_by_bucket(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    granularity: str = "month"
+) -> Dict[str, Dict[str, float]]:
+    """Expenses and order count per bucket in one GROUP BY"""
+    range_start, range_end = _bucketed_range(start_date, end_date, granularity)
+    bucket = bucket_expression(PurchaseOrder.order_date, granularity, db.bind.dialect.name).label("bucket")
+
+    rows = db.query(
+        bucket,
+        func.coalesce(func.sum(case(
+            (PurchaseOrder.status.in_(EXPENSE_STATUSES), PurchaseOrder.total_amount), else_=0
+        )), 0),
+        func.count(PurchaseOrder.id)
+    ).filter(
+        PurchaseOrder.order_date >= range_start,
+        PurchaseOrder.order_date < range_end
+    ).group_by(bucket).all()
+
+    return {label: {"expenses": float(expenses), "orders": orders} for label, expenses, orders in rows}
+
+def financial_series(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    granularity: str = "month",
+    customer_id: Optional[int] = None,
+    include_expenses: bool = True
+) -> List[Dict[str, float]]:
+    """Revenue, expenses, profit and order counts for every bucket, empty buckets included"""
+    sales = sales_by_bucket(db, start_date, end_date, granularity, customer_id)
+    purchases = purchases_by_bucket(db, start_date, end_date, granularity) if include_expenses else {}
+
+    series = []
+    for label, _ in bucket_labels(start_date, end_date, granularity):
+        sold = sales.get(label, {})
+        bought = purchases.get(label, {})
+        revenue = sold.get("revenue", 0.0)
+        expenses = bought.get("expenses", 0.0)
+        series.append({
+            "period": label,
+            "revenue": revenue,
+            "order_value": sold.get("order_value", 0.0),
+            "sales_orders": sold.get("orders", 0),
+            "expenses": expenses,
+            "purchase_orders": bought.get("orders", 0),
+            "profit": revenue - expenses
+        })
+    return series
@@ -0,0 +1,130 @@
+# app/utils/reservations.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+from starlette.concurrency import run_in_threadpool
+from app.models.models import InventoryItem, SalesOrderAllocation, SalesOrderItem
+from app.utils.allocation import allocate_lines, free_quantity, order_allocations, release_reservations
+from app.utils.stock_mutations import reserve_stock
+from app.utils.stock_summary import refresh_product_stock_summary
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+import argparse
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# How long a confirmed order holds its stock before the sweeper releases it
+RESERVATION_TTL_HOURS = int(os.getenv("RESERVATION_TTL_HOURS", "72"))
+
+# Seconds between sweeps for expired reservations (0 disables the background job)
+RESERVATION_SWEEP_INTERVAL = int(os.getenv("RESERVATION_SWEEP_INTERVAL", "300"))
+
+def reserve_lines(db: Session, lines: List[SalesOrderItem], now: Optional[datetime] = None) -> Dict[int, int]:
+    """Re-plan the lines against free stock and reserve every allocated unit
+
+    Reservations are atomic increments of quantity_reserved that only succeed while
+    the batch still has that much free stock. Returns {line id: quantity that could
+    not be reserved}; the caller decides whether a shortfall is acceptable.
+    """
+    now = now or datetime.utcnow()
+    shortfalls = allocate_lines(db, lines, replan=True, now=now)
+
+    line_ids = [line.id for line in lines]
+    reserved_until = now + timedelta(hours=RESERVATION_TTL_HOURS)
+    for allocation in db.query(SalesOrderAllocation).filter(
+        SalesOrderAllocation.sales_order_item_id.in_(line_ids),
+        SalesOrderAllocation.quantity > SalesOrderAllocation.quantity_shipped
+    ).all():
+        quantity = allocation.quantity - allocation.quantity_shipped
+        if reserve_stock(db, allocation.inventory_item_id, quantity):
+            allocation.quantity_reserved = quantity
+            allocation.reserved_until = reserved_until
+        else:
+            # Another order reserved the batch between planning and reserving
+            allocation.quantity = allocation.quantity_shipped
+            line_id = allocation.sales_order_item_id
+            shortfalls[line_id] = shortfalls.get(line_id, 0) + quantity
+
+    refresh_product_stock_summary(db, {line.product_id for line in lines})
+    return shortfalls
+
+def release_order_reservations(db: Session, sales_order_id: int) -> int:
+    """Release everything an order holds (cancellation, back to pending); returns the batches touched"""
+    allocations = order_allocations(db, sales_order_id)
+    released = release_reservations(db, allocations)
+    if released:
+        refresh_product_stock_summary(db, {
+            product_id for (product_id,) in db.query(InventoryItem.product_id).filter(InventoryItem.id.in_(released))
+        })
+    return len(released)
+
+def release_expired_reservations(db: Session, now: Optional[datetime] = None) -> int:
+    """Release reservations past reserved_until (indexed); returns the number of allocations released"""
+    now = now or datetime.utcnow()
+    expired = db.query(SalesOrderAllocation).filter(
+        SalesOrderAllocation.reserved_until < now,
+        SalesOrderAllocation.quantity_reserved > 0
+    ).all()
+    if not expired:
+        return 0
+
+    released = release_reservations(db, expired)
+    refresh_product_stock_summary(db, {
+        product_id for (product_id,) in db.query(InventoryItem.product_id).filter(InventoryItem.id.in_(released))
+    })
+    db.commit()
+    return len(expired)
+
+def _sweep_with_new_session(session_factory):
+    db = session_factory()
+    try:
+        return release_expired_reservations(db)
+    finally:
+        db.close()
+
+async def run_reservation_sweeper(session_factory, interval: int = RESERVATION_SWEEP_INTERVAL):
+    """Background task: release expired reservations every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            released = await run_in_threadpool(_sweep_with_new_session, session_factory)
+            if released:
+                logger.info("Released %s expired stock reservations", released)
+        except Exception:
+            logger.exception("Reservation sweep failed")
+
+def available_to_promise(db: Session, product_ids: Optional[Iterable[int]] = None, now: Optional[datetime] = None) -> Dict[int, int]:
+    """Available minus reserved per product over sellable, unexpired batches
+
+    Served from ix_inventory_items_atp (product, status, expiry, available, reserved),
+    so the aggregate never touches the table rows.
+    """
+    now = now or datetime.utcnow()
+    query = db.query(
+        InventoryItem.product_id,
+        func.sum(free_quantity())
+    ).filter(
+        InventoryItem.status == "available",
+        or_(InventoryItem.expiry_date.is_(None), InventoryItem.expiry_date > now)
+    )
+    if product_ids is not None:
+        query = query.filter(InventoryItem.product_id.in_(list(product_ids)))
+    return {
+        product_id: max(int(quantity or 0), 0)
+        for product_id, quantity in query.group_by(InventoryItem.product_id).all()
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain sales order stock reservations")
+    parser.add_argument("command", choices=["sweep"], help="sweep: release reservations past their expiry")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Released {release_expired_reservations(db)} expired reservations")
+    finally:
+        db.close()
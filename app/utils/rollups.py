@@ -0,0 +1,290 @@
+# app/utils/rollups.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, inspect, text
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from app.models.models import (
+    DailyPurchaseRollup, DailySalesRollup, PurchaseOrder, RollupWatermark, SalesOrder
+)
+from app.utils.report_queries import bucket_expression
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import argparse
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background refreshes (0 disables the background job)
+ROLLUP_REFRESH_INTERVAL = int(os.getenv("ROLLUP_REFRESH_INTERVAL", "300"))
+
+# Re-read rows changed shortly before the watermark to catch late-committing transactions
+WATERMARK_OVERLAP = timedelta(minutes=10)
+
+# Days recomputed per statement
+DAY_CHUNK = 200
+
+# (rollup model, order model, party column on the order, party column on the rollup)
+ROLLUPS = {
+    "daily_sales_rollup": (DailySalesRollup, SalesOrder, SalesOrder.customer_id, "customer_id"),
+    "daily_purchase_rollup": (DailyPurchaseRollup, PurchaseOrder, PurchaseOrder.vendor_id, "vendor_id"),
+}
+
+def ensure_order_change_tracking(engine: Engine):
+    """Add updated_at to orders on databases created before the rollups existed"""
+    inspector = inspect(engine)
+    column_type = "TIMESTAMP" if engine.dialect.name == "postgresql" else "DATETIME"
+    with engine.begin() as connection:
+        for table in ("sales_orders", "purchase_orders"):
+            columns = {column["name"] for column in inspector.get_columns(table)}
+            if "updated_at" in columns:
+                continue
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at {column_type}"))
+            connection.execute(text(f"UPDATE {table} SET updated_at = order_date"))
+            connection.execute(text(f"CREATE INDEX ix_{table}_updated_at ON {table} (updated_at)"))
+
+def _start_of_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _recompute_days(db: Session, name: str, days: List[date]):
+    """Replace the rollup rows for the given days with fresh aggregates from the order table"""
+    rollup, order, party_column, party_key = ROLLUPS[name]
+    bucket = bucket_expression(order.order_date, "day", db.bind.dialect.name).label("bucket")
+
+    for start in range(0, len(days), DAY_CHUNK):
+        chunk = sorted(days[start:start + DAY_CHUNK])
+        db.query(rollup).filter(rollup.day.in_(chunk)).delete(synchronize_session=False)
+
+        labels = {day.isoformat() for day in chunk}
+        rows = db.query(
+            bucket,
+            party_column,
+            order.status,
+            func.count(order.id),
+            func.coalesce(func.sum(order.total_amount), 0)
+        ).filter(
+            order.order_date >= datetime.combine(chunk[0], datetime.min.time()),
+            order.order_date < datetime.combine(chunk[-1] + timedelta(days=1), datetime.min.time())
+        ).group_by(bucket, party_column, order.status).all()
+
+        rollup_rows = [
+            {
+                "day": date.fromisoformat(label),
+                party_key: party_id,
+                "status": status or "unknown",
+                "order_count": order_count,
+                "total_amount": total_amount
+            }
+            for label, party_id, status, order_count, total_amount in rows
+            if label in labels
+        ]
+        # A Core insert (unlike bulk_insert_mappings) is seen by report_cache invalidation
+        if rollup_rows:
+            db.execute(insert(rollup), rollup_rows)
+
+def refresh_rollup(db: Session, name: str, now: Optional[datetime] = None) -> int:
+    """Fold orders changed since the watermark into one rollup; returns the number of days recomputed"""
+    rollup, order, _, _ = ROLLUPS[name]
+    now = now or datetime.utcnow()
+    today = _start_of_day(now)
+
+    watermark = db.get(RollupWatermark, name)
+    if watermark is None:
+        watermark = RollupWatermark(name=name)
+        db.add(watermark)
+
+    bucket = bucket_expression(order.order_date, "day", db.bind.dialect.name)
+    changed = db.query(bucket).filter(order.order_date < today)
+    if watermark.last_change_at is not None:
+        changed = changed.filter(order.updated_at > watermark.last_change_at - WATERMARK_OVERLAP)
+    labels = {row[0] for row in changed.distinct().all()}
+
+    if watermark.closed_through is not None and watermark.closed_through < today:
+        # Days that closed since the last run are folded in whether or not they changed since
+        labels.update(row[0] for row in db.query(bucket).filter(
+            order.order_date >= watermark.closed_through,
+            order.order_date < today
+        ).distinct().all())
+    days = sorted(date.fromisoformat(label) for label in labels if label)
+
+    latest_change = db.query(func.max(order.updated_at)).scalar()
+    _recompute_days(db, name, days)
+
+    # Never move past the open day: its orders are only folded in once it closes
+    if latest_change is not None:
+        watermark.last_change_at = min(latest_change, today)
+    watermark.closed_through = today
+    watermark.last_run_at = now
+    db.commit()
+    return len(days)
+
+def refresh_daily_rollups(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Incrementally refresh both daily rollups"""
+    return {name: refresh_rollup(db, name, now) for name in ROLLUPS}
+
+def _refresh_with_new_session(session_factory):
+    db = session_factory()
+    try:
+        return refresh_daily_rollups(db)
+    finally:
+        db.close()
+
+async def run_rollup_refresher(session_factory, interval: int = ROLLUP_REFRESH_INTERVAL):
+    """Background task: refresh the rollups every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_refresh_with_new_session, session_factory)
+        except Exception:
+            logger.exception("Daily rollup refresh failed")
+
+def rebuild_daily_rollups(db: Session) -> Dict[str, int]:
+    """Drop the rollups and watermarks and recompute every closed day (repair command)"""
+    for name, (rollup, _, _, _) in ROLLUPS.items():
+        db.query(rollup).delete(synchronize_session=False)
+        db.query(RollupWatermark).filter(RollupWatermark.name == name).delete(synchronize_session=False)
+    db.commit()
+    return refresh_daily_rollups(db)
+
+def _stale_days(db: Session, name: str, watermark: RollupWatermark, full_from: datetime, full_to: datetime) -> List[date]:
+    """Rolled-up days in [full_from, full_to) with orders changed since the rollup last folded them in
+
+    Order writes (status changes, edits, backdated orders) only reach the
+    rollup on the next refresh; until then those days are read live, found
+    with a range scan of ix_*_updated_at over the recent changes.
+    """
+    _, order, _, _ = ROLLUPS[name]
+    bucket = bucket_expression(order.order_date, "day", db.bind.dialect.name)
+    changed = db.query(bucket).filter(order.order_date >= full_from, order.order_date < full_to)
+    if watermark.last_change_at is not None:
+        changed = changed.filter(order.updated_at > watermark.last_change_at - WATERMARK_OVERLAP)
+    return sorted(date.fromisoformat(row[0]) for row in changed.distinct().all() if row[0])
+
+def _split_range(db: Session, name: str, start_date: datetime, end_date: datetime):
+    """Split [start_date, end_date] into whole rolled-up days and the live ranges around and between them
+
+    Returns ((first day, day after last) or None, stale days to leave out of
+    the rollup, [(range start, range end, end inclusive)] read from the orders).
+    """
+    watermark = db.get(RollupWatermark, name)
+    closed_through = watermark.closed_through if watermark else None
+
+    full_from = _start_of_day(start_date)
+    if full_from < start_date:
+        full_from += timedelta(days=1)
+    full_to = _start_of_day(end_date)
+    if closed_through is not None:
+        full_to = min(full_to, closed_through)
+
+    if closed_through is None or full_from >= full_to:
+        return None, [], [(start_date, end_date, True)]
+
+    live = []
+    if start_date < full_from:
+        live.append((start_date, full_from, False))
+    stale = _stale_days(db, name, watermark, full_from, full_to)
+    for day in stale:
+        day_start = datetime.combine(day, datetime.min.time())
+        live.append((day_start, day_start + timedelta(days=1), False))
+    live.append((full_to, end_date, True))
+    return (full_from.date(), full_to.date()), stale, live
+
+def _order_totals(
+    db: Session,
+    name: str,
+    start_date: datetime,
+    end_date: datetime,
+    party_id: Optional[int] = None
+) -> Dict[str, Tuple[int, float]]:
+    rollup, order, party_column, party_key = ROLLUPS[name]
+    closed_days, stale_days, live_ranges = _split_range(db, name, start_date, end_date)
+
+    totals: Dict[str, Tuple[int, float]] = {}
+
+    def add(rows):
+        for status, order_count, amount in rows:
+            status = status or "unknown"
+            count_so_far, amount_so_far = totals.get(status, (0, 0.0))
+            totals[status] = (count_so_far + int(order_count or 0), amount_so_far + float(amount or 0))
+
+    if closed_days:
+        query = db.query(
+            rollup.status, func.sum(rollup.order_count), func.sum(rollup.total_amount)
+        ).filter(rollup.day >= closed_days[0], rollup.day < closed_days[1])
+        if stale_days:
+            query = query.filter(rollup.day.notin_(stale_days))
+        if party_id is not None:
+            query = query.filter(getattr(rollup, party_key) == party_id)
+        add(query.group_by(rollup.status).all())
+
+    for range_start, range_end, inclusive in live_ranges:
+        upper = order.order_date <= range_end if inclusive else order.order_date < range_end
+        query = db.query(
+            order.status, func.count(order.id), func.sum(order.total_amount)
+        ).filter(order.order_date >= range_start, upper)
+        if party_id is not None:
+            query = query.filter(party_column == party_id)
+        add(query.group_by(order.status).all())
+
+    return totals
+
+def sales_totals_by_status(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    customer_id: Optional[int] = None
+) -> Dict[str, Tuple[int, float]]:
+    """(order count, amount) per sales order status in [start_date, end_date], closed days from the rollup"""
+    return _order_totals(db, "daily_sales_rollup", start_date, end_date, customer_id)
+
+def purchase_totals_by_status(
+    db: Session,
+    start_date: datetime,
+    end_date: datetime,
+    vendor_id: Optional[int] = None
+) -> Dict[str, Tuple[int, float]]:
+    """(order count, amount) per purchase order status in [start_date, end_date], closed days from the rollup"""
+    return _order_totals(db, "daily_purchase_rollup", start_date, end_date, vendor_id)
+
+def ordering_customer_ids(db: Session, start_date: datetime, end_date: datetime) -> Set[int]:
+    """Customers with at least one sales order in [start_date, end_date]"""
+    closed_days, stale_days, live_ranges = _split_range(db, "daily_sales_rollup", start_date, end_date)
+
+    customer_ids = set()
+    if closed_days:
+        query = db.query(DailySalesRollup.customer_id).filter(
+            DailySalesRollup.day >= closed_days[0],
+            DailySalesRollup.day < closed_days[1]
+        )
+        if stale_days:
+            query = query.filter(DailySalesRollup.day.notin_(stale_days))
+        customer_ids.update(row[0] for row in query.distinct().all())
+    for range_start, range_end, inclusive in live_ranges:
+        upper = SalesOrder.order_date <= range_end if inclusive else SalesOrder.order_date < range_end
+        customer_ids.update(row[0] for row in db.query(SalesOrder.customer_id).filter(
+            SalesOrder.order_date >= range_start, upper
+        ).distinct().all())
+    return customer_ids
+
+def sum_totals(totals: Dict[str, Tuple[int, float]], statuses: Optional[Iterable[str]] = None) -> Tuple[int, float]:
+    """Add up (count, amount) over the given statuses (all statuses when None)"""
+    selected = [value for status, value in totals.items() if statuses is None or status in statuses]
+    return sum(count for count, _ in selected), sum(amount for _, amount in selected)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the daily sales and purchase rollups")
+    parser.add_argument("command", choices=["refresh", "rebuild"],
+                        help="refresh: fold in orders changed since the watermark; rebuild: recompute every closed day")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal, create_tables, engine
+
+    create_tables()
+    ensure_order_change_tracking(engine)
+    db = SessionLocal()
+    try:
+        result = rebuild_daily_rollups(db) if args.command == "rebuild" else refresh_daily_rollups(db)
+        print(f"Recomputed days: {result}")
+    finally:
+        db.close()
@@ -0,0 +1,125 @@
+# app/utils/stock_mutations.py
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy import case, func, update
+from app.models.models import InventoryItem, SalesOrder, SalesOrderItem
+from datetime import datetime
+
+# Stock levels are changed with single conditional UPDATE statements so that
+# concurrent requests can neither lose each other's changes nor oversell:
+# the database checks and applies each change atomically and the rowcount
+# tells the caller whether it happened.
+
+def _expire_cached(db: Session, model, pk, attributes):
+    """Drop stale in-session values for a row changed behind the ORM's back"""
+    instance = db.identity_map.get(identity_key(model, pk))
+    if instance is not None:
+        db.expire(instance, attributes)
+
+_reserved = func.coalesce(InventoryItem.quantity_reserved, 0)
+
+def take_stock(db: Session, inventory_item_id: int, quantity: int) -> bool:
+    """Remove quantity from a batch if that much is free (not reserved); False when it is not"""
+    if quantity <= 0:
+        raise ValueError("quantity must be greater than 0")
+    result = db.execute(
+        update(InventoryItem)
+        .where(InventoryItem.id == inventory_item_id, InventoryItem.quantity_available - _reserved >= quantity)
+        .values(quantity_available=InventoryItem.quantity_available - quantity, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached(db, InventoryItem, inventory_item_id, ["quantity_available", "updated_at"])
+    return result.rowcount == 1
+
+def take_reserved_stock(db: Session, inventory_item_id: int, quantity: int) -> bool:
+    """Remove quantity that was reserved on a batch, consuming the reservation with it"""
+    if quantity <= 0:
+        raise ValueError("quantity must be greater than 0")
+    result = db.execute(
+        update(InventoryItem)
+        .where(
+            InventoryItem.id == inventory_item_id,
+            _reserved >= quantity,
+            InventoryItem.quantity_available >= quantity
+        )
+        .values(
+            quantity_available=InventoryItem.quantity_available - quantity,
+            quantity_reserved=_reserved - quantity,
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached(db, InventoryItem, inventory_item_id, ["quantity_available", "quantity_reserved", "updated_at"])
+    return result.rowcount == 1
+
+def reserve_stock(db: Session, inventory_item_id: int, quantity: int) -> bool:
+    """Hold quantity of a batch for an order if that much is still free; False when it is not"""
+    if quantity <= 0:
+        raise ValueError("quantity must be greater than 0")
+    result = db.execute(
+        update(InventoryItem)
+        .where(
+            InventoryItem.id == inventory_item_id,
+            InventoryItem.status == "available",
+            InventoryItem.quantity_available - _reserved >= quantity
+        )
+        .values(quantity_reserved=_reserved + quantity, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached(db, InventoryItem, inventory_item_id, ["quantity_reserved", "updated_at"])
+    return result.rowcount == 1
+
+def release_reserved_stock(db: Session, inventory_item_id: int, quantity: int) -> bool:
+    """Give back a reservation (never driving quantity_reserved below zero)"""
+    if quantity <= 0:
+        raise ValueError("quantity must be greater than 0")
+    result = db.execute(
+        update(InventoryItem)
+        .where(InventoryItem.id == inventory_item_id)
+        .values(
+            quantity_reserved=case((_reserved >= quantity, _reserved - quantity), else_=0),
+            updated_at=datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached(db, InventoryItem, inventory_item_id, ["quantity_reserved", "updated_at"])
+    return result.rowcount == 1
+
+def add_stock(db: Session, inventory_item_id: int, quantity: int) -> bool:
+    """Add quantity to a batch; False when the batch does not exist"""
+    if quantity <= 0:
+        raise ValueError("quantity must be greater than 0")
+    result = db.execute(
+        update(InventoryItem)
+        .where(InventoryItem.id == inventory_item_id)
+        .values(quantity_available=InventoryItem.quantity_available + quantity, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached(db, InventoryItem, inventory_item_id, ["quantity_available", "updated_at"])
+    return result.rowcount == 1
+
+def record_shipped_quantity(db: Session, order_item_id: int, quantity: int) -> bool:
+    """Add to an order line's shipped quantity unless that would exceed the ordered quantity"""
+    if quantity <= 0:
+        raise ValueError("quantity must be greater than 0")
+    shipped = func.coalesce(SalesOrderItem.quantity_shipped, 0) + quantity
+    result = db.execute(
+        update(SalesOrderItem)
+        .where(SalesOrderItem.id == order_item_id, shipped <= SalesOrderItem.quantity_ordered)
+        .values(quantity_shipped=shipped)
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached(db, SalesOrderItem, order_item_id, ["quantity_shipped"])
+    return result.rowcount == 1
+
+def transition_order_status(db: Session, sales_order_id: int, from_status: str, to_status: str) -> bool:
+    """Move an order from one status to another; False if another request changed it first"""
+    current = SalesOrder.status == from_status if from_status is not None else SalesOrder.status.is_(None)
+    result = db.execute(
+        update(SalesOrder)
+        .where(SalesOrder.id == sales_order_id, current)
+        .values(status=to_status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    _expire_cached(db, SalesOrder, sales_order_id, ["status", "updated_at"])
+    return result.rowcount == 1
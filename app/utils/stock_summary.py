@@ -0,0 +1,116 @@
+# app/utils/stock_summary.py
+from sqlalchemy.orm import Session
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.models import InventoryItem, Product, ProductStockSummary
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+import argparse
+
+# Dialects whose insert skips rows that already exist via ON CONFLICT DO NOTHING
+# (MySQL uses INSERT IGNORE)
+_ON_CONFLICT_INSERT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def _ensure_summary_rows(db: Session, product_ids):
+    """Insert zero rows for products without a summary, skipping ones that exist or race in concurrently"""
+    rows = [{"product_id": product_id} for product_id in product_ids]
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in _ON_CONFLICT_INSERT:
+        statement = _ON_CONFLICT_INSERT[dialect_name](ProductStockSummary).on_conflict_do_nothing(
+            index_elements=["product_id"]
+        )
+    else:
+        statement = insert(ProductStockSummary).prefix_with("IGNORE", dialect="mysql")
+    db.execute(statement, rows)
+
+def _summary_columns(now: datetime) -> Dict[str, Any]:
+    """Summary columns as subselects over the row's own product's batches"""
+    is_available = InventoryItem.status == "available"
+    available_qty = case((is_available, InventoryItem.quantity_available), else_=0)
+    on_hand = is_available & (InventoryItem.quantity_available > 0)
+
+    def batches(column):
+        return select(column).where(InventoryItem.product_id == ProductStockSummary.product_id).scalar_subquery()
+
+    return {
+        "quantity_available": batches(func.coalesce(func.sum(available_qty), 0)),
+        "quantity_reserved": batches(func.coalesce(func.sum(InventoryItem.quantity_reserved), 0)),
+        "batch_count": batches(func.count(case((on_hand, InventoryItem.id)))),
+        "earliest_expiry": batches(func.min(case((on_hand, InventoryItem.expiry_date)))),
+        "stock_value": batches(func.coalesce(func.sum(available_qty * InventoryItem.cost_price), 0)),
+        "updated_at": now,
+    }
+
+def refresh_product_stock_summary(db: Session, product_ids: Iterable[int]):
+    """Recompute the summary rows for the given products inside the caller's transaction
+
+    Concurrent stock writes to one product are serialized on its summary row:
+    the rows are created if missing, locked in product id order, and only then
+    recomputed by a single UPDATE, so a writer never saves an aggregate read
+    before another writer's change committed.
+    """
+    product_ids = sorted({product_id for product_id in product_ids if product_id})
+    if not product_ids:
+        return
+
+    # Pending inventory changes must be visible to the aggregate subselects
+    db.flush()
+
+    _ensure_summary_rows(db, product_ids)
+    in_scope = ProductStockSummary.product_id.in_(product_ids)
+    db.query(ProductStockSummary.product_id).filter(in_scope).order_by(
+        ProductStockSummary.product_id
+    ).with_for_update().all()
+    db.execute(
+        update(ProductStockSummary).where(in_scope).values(**_summary_columns(datetime.utcnow())),
+        execution_options={"synchronize_session": "fetch"}
+    )
+
+def rebuild_product_stock_summary(db: Session) -> int:
+    """Rebuild the whole summary table from inventory_items (repair command)"""
+    db.query(ProductStockSummary).delete(synchronize_session=False)
+
+    product_ids = [row[0] for row in db.query(Product.id).all()]
+    if product_ids:
+        _ensure_summary_rows(db, product_ids)
+        db.execute(
+            update(ProductStockSummary).values(**_summary_columns(datetime.utcnow())),
+            execution_options={"synchronize_session": False}
+        )
+
+    db.commit()
+    return len(product_ids)
+
+def ensure_product_stock_summary(db: Session):
+    """Populate the summary table on first start after it was introduced"""
+    has_summary = db.query(ProductStockSummary.product_id).first() is not None
+    has_products = db.query(Product.id).first() is not None
+    if has_products and not has_summary:
+        rebuild_product_stock_summary(db)
+
+def get_stock_summaries(db: Session, product_ids: Optional[Iterable[int]] = None) -> Dict[int, ProductStockSummary]:
+    """Load summary rows keyed by product id"""
+    query = db.query(ProductStockSummary)
+    if product_ids is not None:
+        query = query.filter(ProductStockSummary.product_id.in_(list(product_ids)))
+    return {summary.product_id: summary for summary in query.all()}
+
+def get_available_stock(summaries: Dict[int, ProductStockSummary], product_id: int) -> int:
+    """Available quantity for a product, zero when it has never been stocked"""
+    summary = summaries.get(product_id)
+    return summary.quantity_available if summary else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the product_stock_summary table")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: recompute every row from inventory_items")
+    args = parser.parse_args()
+
+    from app.database import SessionLocal, create_tables
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        count = rebuild_product_stock_summary(db)
+        print(f"Rebuilt product_stock_summary for {count} products")
+    finally:
+        db.close()
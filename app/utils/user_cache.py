@@ -0,0 +1,94 @@
+# app/utils/user_cache.py
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from app.models.models import Customer, User
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+import os
+import time
+
+# Seconds a resolved user is trusted without going back to the database. Edits
+# made through this process invalidate immediately; other workers see them
+# once the entry expires.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "1024"))
+
+def _columns(instance) -> Dict[str, Any]:
+    return {column.key: getattr(instance, column.key) for column in inspect(type(instance)).column_attrs}
+
+def _detached(model, values: Dict[str, Any]):
+    instance = model(**values)
+    # Known identity, no pending changes: never INSERTed if it reaches a session
+    make_transient_to_detached(instance)
+    return instance
+
+class UserCache:
+    """In-process LRU of authenticated users keyed by token subject (username), with a TTL
+
+    Entries are column snapshots of the user and their hospital; every hit
+    builds fresh detached instances, so requests never share ORM objects.
+    """
+
+    def __init__(self, max_entries: int = USER_CACHE_MAX_ENTRIES, ttl: int = USER_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # username -> (expires_at, user columns, hospital columns or None), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[username]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(username)
+            self.hits += 1
+
+        _, user_columns, hospital_columns = entry
+        user = User(**user_columns)
+        user.hospital = _detached(Customer, hospital_columns) if hospital_columns else None
+        make_transient_to_detached(user)
+        return user
+
+    def set(self, user: User):
+        """Remember a user loaded with its hospital"""
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        hospital = user.hospital
+        entry = (time.monotonic() + self.ttl, _columns(user), _columns(hospital) if hospital else None)
+        with self._lock:
+            self._entries[user.username] = entry
+            self._entries.move_to_end(user.username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *usernames: Optional[str]):
+        """Forget users whose record changed (edit, (de)activation, deletion, approval)"""
+        with self._lock:
+            for username in usernames:
+                if username:
+                    self._entries.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+user_cache = UserCache()
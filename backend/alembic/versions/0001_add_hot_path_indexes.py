@@ -0,0 +1,48 @@
+"""Add composite indexes for dashboard and report hot paths
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) - plain B-tree indexes supported by SQLite, MySQL and PostgreSQL
+HOT_PATH_INDEXES = [
+    ("ix_inventory_items_product_status_qty", "inventory_items", ["product_id", "status", "quantity_available"]),
+    ("ix_inventory_items_expiry_date", "inventory_items", ["expiry_date"]),
+    ("ix_sales_orders_customer_date_status", "sales_orders", ["customer_id", "order_date", "status"]),
+    ("ix_sales_orders_order_date_status", "sales_orders", ["order_date", "status"]),
+    ("ix_sales_order_items_sales_order_id", "sales_order_items", ["sales_order_id"]),
+    ("ix_purchase_orders_order_date_status", "purchase_orders", ["order_date", "status"]),
+    ("ix_purchase_order_items_purchase_order_id", "purchase_order_items", ["purchase_order_id"]),
+    ("ix_stock_movements_product_created", "stock_movements", ["product_id", "created_at"]),
+    ("ix_alerts_ack_severity_type_created", "alerts", ["is_acknowledged", "severity", "alert_type", "created_at"]),
+    ("ix_hospital_inventory_hospital_product", "hospital_inventory", ["hospital_id", "product_id"]),
+]
+
+
+def _existing_indexes(table_name):
+    """Index names already present on a table (databases built by create_tables have them)"""
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    for index_name, table_name, columns in HOT_PATH_INDEXES:
+        if index_name not in _existing_indexes(table_name):
+            op.create_index(index_name, table_name, columns)
+
+
+def downgrade() -> None:
+    for index_name, table_name, columns in reversed(HOT_PATH_INDEXES):
+        if index_name in _existing_indexes(table_name):
+            op.drop_index(index_name, table_name=table_name)
@@ -0,0 +1,81 @@
+"""Add daily sales/purchase rollups and order updated_at watermarks
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+ORDER_TABLES = ["sales_orders", "purchase_orders"]
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def upgrade() -> None:
+    inspector = _inspector()
+    tables = set(inspector.get_table_names())
+
+    for table_name in ORDER_TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table_name)}
+        if "updated_at" not in columns:
+            op.add_column(table_name, sa.Column("updated_at", sa.DateTime(), nullable=True))
+            op.execute(f"UPDATE {table_name} SET updated_at = order_date")
+        indexes = {index["name"] for index in inspector.get_indexes(table_name)}
+        if f"ix_{table_name}_updated_at" not in indexes:
+            op.create_index(f"ix_{table_name}_updated_at", table_name, ["updated_at"])
+
+    if "daily_sales_rollup" not in tables:
+        op.create_table(
+            "daily_sales_rollup",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("customer_id", sa.Integer(), sa.ForeignKey("customers.id"), primary_key=True),
+            sa.Column("status", sa.String(20), primary_key=True),
+            sa.Column("order_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("total_amount", sa.DECIMAL(14, 2), nullable=False, server_default="0"),
+        )
+    if "daily_purchase_rollup" not in tables:
+        op.create_table(
+            "daily_purchase_rollup",
+            sa.Column("day", sa.Date(), primary_key=True),
+            sa.Column("vendor_id", sa.Integer(), sa.ForeignKey("vendors.id"), primary_key=True),
+            sa.Column("status", sa.String(20), primary_key=True),
+            sa.Column("order_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("total_amount", sa.DECIMAL(14, 2), nullable=False, server_default="0"),
+        )
+    if "rollup_watermarks" not in tables:
+        op.create_table(
+            "rollup_watermarks",
+            sa.Column("name", sa.String(50), primary_key=True),
+            sa.Column("last_change_at", sa.DateTime(), nullable=True),
+            sa.Column("closed_through", sa.DateTime(), nullable=True),
+            sa.Column("last_run_at", sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade() -> None:
+    inspector = _inspector()
+    tables = set(inspector.get_table_names())
+
+    for table_name in ("rollup_watermarks", "daily_purchase_rollup", "daily_sales_rollup"):
+        if table_name in tables:
+            op.drop_table(table_name)
+
+    for table_name in ORDER_TABLES:
+        indexes = {index["name"] for index in inspector.get_indexes(table_name)}
+        if f"ix_{table_name}_updated_at" in indexes:
+            op.drop_index(f"ix_{table_name}_updated_at", table_name=table_name)
+        columns = {column["name"] for column in inspector.get_columns(table_name)}
+        if "updated_at" in columns:
+            with op.batch_alter_table(table_name) as batch_op:
+                batch_op.drop_column("updated_at")
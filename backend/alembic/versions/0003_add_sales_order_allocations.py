@@ -0,0 +1,41 @@
+"""Add FEFO batch allocations for sales order lines
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "sales_order_allocations" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "sales_order_allocations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("sales_order_item_id", sa.Integer(), sa.ForeignKey("sales_order_items.id"), nullable=False),
+        sa.Column("inventory_item_id", sa.Integer(), sa.ForeignKey("inventory_items.id"), nullable=False),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("quantity_shipped", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_sales_order_allocations_id", "sales_order_allocations", ["id"])
+    op.create_index("ix_sales_order_allocations_item", "sales_order_allocations", ["sales_order_item_id"])
+    op.create_index("ix_sales_order_allocations_inventory_item", "sales_order_allocations", ["inventory_item_id"])
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "sales_order_allocations" in inspector.get_table_names():
+        op.drop_table("sales_order_allocations")
@@ -0,0 +1,57 @@
+"""Add expiring stock reservations to sales order allocations
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("sales_order_allocations")}
+    if "quantity_reserved" not in columns:
+        op.add_column(
+            "sales_order_allocations",
+            sa.Column("quantity_reserved", sa.Integer(), nullable=False, server_default="0")
+        )
+    if "reserved_until" not in columns:
+        op.add_column("sales_order_allocations", sa.Column("reserved_until", sa.DateTime(), nullable=True))
+
+    allocation_indexes = {index["name"] for index in inspector.get_indexes("sales_order_allocations")}
+    if "ix_sales_order_allocations_reserved_until" not in allocation_indexes:
+        op.create_index("ix_sales_order_allocations_reserved_until", "sales_order_allocations", ["reserved_until"])
+
+    # Covering index for the available-to-promise aggregate
+    inventory_indexes = {index["name"] for index in inspector.get_indexes("inventory_items")}
+    if "ix_inventory_items_atp" not in inventory_indexes:
+        op.create_index(
+            "ix_inventory_items_atp", "inventory_items",
+            ["product_id", "status", "expiry_date", "quantity_available", "quantity_reserved"]
+        )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    inventory_indexes = {index["name"] for index in inspector.get_indexes("inventory_items")}
+    if "ix_inventory_items_atp" in inventory_indexes:
+        op.drop_index("ix_inventory_items_atp", table_name="inventory_items")
+
+    allocation_indexes = {index["name"] for index in inspector.get_indexes("sales_order_allocations")}
+    if "ix_sales_order_allocations_reserved_until" in allocation_indexes:
+        op.drop_index("ix_sales_order_allocations_reserved_until", table_name="sales_order_allocations")
+    columns = {column["name"] for column in inspector.get_columns("sales_order_allocations")}
+    with op.batch_alter_table("sales_order_allocations") as batch_op:
+        if "reserved_until" in columns:
+            batch_op.drop_column("reserved_until")
+        if "quantity_reserved" in columns:
+            batch_op.drop_column("quantity_reserved")
@@ -0,0 +1,36 @@
+"""Add per-prefix counters for order numbers
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "number_sequences" in inspector.get_table_names():
+        return
+
+    # Counters are seeded from the highest existing number on first use
+    op.create_table(
+        "number_sequences",
+        sa.Column("prefix", sa.String(50), primary_key=True),
+        sa.Column("next_value", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "number_sequences" in inspector.get_table_names():
+        op.drop_table("number_sequences")
@@ -0,0 +1,57 @@
+"""Add the append-only activity_events feed
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_activity_events_created": ["created_at", "id"],
+    "ix_activity_events_hospital_created": ["hospital_id", "created_at", "id"],
+    "ix_activity_events_public_created": ["is_public", "created_at", "id"],
+}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "activity_events" not in inspector.get_table_names():
+        # The app seeds the feed from recent movements and orders on first start
+        # (python -m app.utils.activity backfill does the same by hand)
+        op.create_table(
+            "activity_events",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("event_type", sa.String(20), nullable=False),
+            sa.Column("action", sa.String(20), nullable=True),
+            sa.Column("message", sa.String(255), nullable=False),
+            sa.Column("actor_id", sa.Integer(), nullable=True),
+            sa.Column("actor_name", sa.String(100), nullable=True),
+            sa.Column("hospital_id", sa.Integer(), nullable=True),
+            sa.Column("is_public", sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column("reference_type", sa.String(20), nullable=True),
+            sa.Column("reference_id", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        inspector = sa.inspect(op.get_bind())
+
+    existing = {index["name"] for index in inspector.get_indexes("activity_events")}
+    if "ix_activity_events_id" not in existing:
+        op.create_index("ix_activity_events_id", "activity_events", ["id"])
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, "activity_events", columns)
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "activity_events" in inspector.get_table_names():
+        op.drop_table("activity_events")
@@ -0,0 +1,58 @@
+"""Allow one open alert of each type per batch
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ux_alerts_open_item_type"
+
+# MySQL has no partial indexes; there the alert engine's existence check is the only guard
+OPEN_CONDITION = {
+    "sqlite": "is_acknowledged = 0",
+    "postgresql": "is_acknowledged = false",
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    condition = OPEN_CONDITION.get(bind.dialect.name)
+    if condition is None:
+        return
+    existing = {index["name"] for index in sa.inspect(bind).get_indexes("alerts")}
+    if INDEX_NAME in existing:
+        return
+
+    # Acknowledge all but the oldest of any open duplicates so the index can be built
+    op.execute(sa.text(f"""
+        UPDATE alerts SET is_acknowledged = :acknowledged
+        WHERE {condition}
+          AND inventory_item_id IS NOT NULL
+          AND id NOT IN (
+              SELECT MIN(id) FROM alerts
+              WHERE {condition} AND inventory_item_id IS NOT NULL
+              GROUP BY inventory_item_id, alert_type
+          )
+    """).bindparams(acknowledged=True))
+    op.create_index(
+        INDEX_NAME, "alerts", ["inventory_item_id", "alert_type"], unique=True,
+        sqlite_where=sa.text(OPEN_CONDITION["sqlite"]),
+        postgresql_where=sa.text(OPEN_CONDITION["postgresql"])
+    )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    existing = {index["name"] for index in sa.inspect(bind).get_indexes("alerts")}
+    if INDEX_NAME in existing:
+        op.drop_index(INDEX_NAME, table_name="alerts")
@@ -0,0 +1,63 @@
+"""Add the per-product stock summary table
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "product_stock_summary" not in inspector.get_table_names():
+        op.create_table(
+            "product_stock_summary",
+            sa.Column("product_id", sa.Integer(), sa.ForeignKey("products.id"), primary_key=True),
+            sa.Column("quantity_available", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("quantity_reserved", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("batch_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("earliest_expiry", sa.DateTime(), nullable=True),
+            sa.Column("stock_value", sa.DECIMAL(14, 2), nullable=False, server_default="0"),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+
+    # Backfill every product from its available batches, once (as ensure_product_stock_summary does)
+    has_summary = op.get_bind().execute(sa.text("SELECT 1 FROM product_stock_summary LIMIT 1")).first()
+    if has_summary is None:
+        op.execute(sa.text("""
+            INSERT INTO product_stock_summary (
+                product_id, quantity_available, quantity_reserved, batch_count,
+                earliest_expiry, stock_value, updated_at
+            )
+            SELECT
+                products.id,
+                COALESCE(SUM(CASE WHEN inventory_items.status = :available
+                                  THEN inventory_items.quantity_available ELSE 0 END), 0),
+                COALESCE(SUM(inventory_items.quantity_reserved), 0),
+                COUNT(CASE WHEN inventory_items.status = :available AND inventory_items.quantity_available > 0
+                           THEN inventory_items.id END),
+                MIN(CASE WHEN inventory_items.status = :available AND inventory_items.quantity_available > 0
+                         THEN inventory_items.expiry_date END),
+                COALESCE(SUM(CASE WHEN inventory_items.status = :available
+                                  THEN inventory_items.quantity_available * inventory_items.cost_price
+                                  ELSE 0 END), 0),
+                CURRENT_TIMESTAMP
+            FROM products
+            LEFT JOIN inventory_items ON inventory_items.product_id = products.id
+            GROUP BY products.id
+        """).bindparams(available="available"))
+
+
+def downgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if "product_stock_summary" in inspector.get_table_names():
+        op.drop_table("product_stock_summary")
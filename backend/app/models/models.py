@@ -1,5 +1,5 @@
 # warehouse_management_system/backend/app/models/models.py
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, ForeignKey, DECIMAL, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -115,6 +115,10 @@ class Product(Base):
 
 class InventoryItem(Base):
     __tablename__ = "inventory_items"
+    __table_args__ = (
+        Index("ix_inventory_items_product_status_qty", "product_id", "status", "quantity_available"),
+        Index("ix_inventory_items_expiry_date", "expiry_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -136,6 +140,9 @@ class InventoryItem(Base):
 
 class PurchaseOrder(Base):
     __tablename__ = "purchase_orders"
+    __table_args__ = (
+        Index("ix_purchase_orders_order_date_status", "order_date", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     po_number = Column(String(50), unique=True, index=True, nullable=False)
@@ -154,6 +161,9 @@ class PurchaseOrder(Base):
 
 class PurchaseOrderItem(Base):
     __tablename__ = "purchase_order_items"
+    __table_args__ = (
+        Index("ix_purchase_order_items_purchase_order_id", "purchase_order_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     purchase_order_id = Column(Integer, ForeignKey("purchase_orders.id"), nullable=False)
@@ -169,6 +179,10 @@ class PurchaseOrderItem(Base):
 
 class SalesOrder(Base):
     __tablename__ = "sales_orders"
+    __table_args__ = (
+        Index("ix_sales_orders_customer_date_status", "customer_id", "order_date", "status"),
+        Index("ix_sales_orders_order_date_status", "order_date", "status"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     order_number = Column(String(50), unique=True, index=True, nullable=False)
@@ -187,6 +201,9 @@ class SalesOrder(Base):
 
 class SalesOrderItem(Base):
     __tablename__ = "sales_order_items"
+    __table_args__ = (
+        Index("ix_sales_order_items_sales_order_id", "sales_order_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     sales_order_id = Column(Integer, ForeignKey("sales_orders.id"), nullable=False)
@@ -204,6 +221,9 @@ class SalesOrderItem(Base):
 
 class StockMovement(Base):
     __tablename__ = "stock_movements"
+    __table_args__ = (
+        Index("ix_stock_movements_product_created", "product_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
@@ -219,6 +239,9 @@ class StockMovement(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_ack_severity_type_created", "is_acknowledged", "severity", "alert_type", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     alert_type = Column(String(30), nullable=False)  # low_stock, expiry_warning, temperature_alert
@@ -233,6 +256,9 @@ class Alert(Base):
 
 class HospitalInventory(Base):
     __tablename__ = "hospital_inventory"
+    __table_args__ = (
+        Index("ix_hospital_inventory_hospital_product", "hospital_id", "product_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     hospital_id = Column(Integer, ForeignKey("customers.id"), nullable=False)  # Hospital customer
@@ -0,0 +1,81 @@
+# benchmarks/dashboard_stats.py
+"""Statements issued and latency of the dashboard statistics.
+
+Seeds the benchmark dataset if it is not there yet, then times the admin and
+hospital-buyer statistics and counts the statements each one sends.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.dashboard_stats --inventory-rows 100000 --repeat 20
+"""
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, Dict
+import argparse
+import statistics
+import time
+
+def measure(db: Session, fn: Callable, repeat: int) -> Dict[str, float]:
+    """Run fn(db) repeat times; statements per call and latency percentiles (ms)"""
+    engine = db.get_bind()
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    latencies = []
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        for _ in range(repeat):
+            db.expire_all()
+            started = time.perf_counter()
+            fn(db)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    ordered = sorted(latencies)
+    return {
+        "statements": len(statements) / repeat,
+        "p50_ms": 1000 * statistics.median(latencies),
+        "p95_ms": 1000 * ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))],
+    }
+
+def main(inventory_rows: int, repeat: int):
+    from app.database import SessionLocal, create_tables
+    from app.models.models import HospitalInventory, InventoryItem
+    from app.routes.dashboard import calculate_dashboard_stats, calculate_staff_dashboard_stats
+    from benchmarks.seed_benchmark_data import seed_benchmark_data
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        seed_benchmark_data(db, inventory_rows=inventory_rows)
+        print(f"inventory rows: {db.query(InventoryItem).count()}")
+
+        # The hospital with the most stock rows, the worst case for the staff dashboard
+        hospital_id = db.query(HospitalInventory.hospital_id).group_by(
+            HospitalInventory.hospital_id
+        ).order_by(func.count().desc()).limit(1).scalar()
+        buyer = SimpleNamespace(hospital_id=hospital_id)
+
+        now = datetime.utcnow()
+        thirty_days_ago = now - timedelta(days=30)
+        for label, fn in (
+            ("admin", lambda db: calculate_dashboard_stats(db, now, thirty_days_ago)),
+            ("staff", lambda db: calculate_staff_dashboard_stats(db, now, thirty_days_ago, buyer)),
+        ):
+            result = measure(db, fn, repeat)
+            print(
+                f"{label:>6}: {result['statements']:.0f} statements, "
+                f"p50 {result['p50_ms']:.1f} ms, p95 {result['p95_ms']:.1f} ms"
+            )
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the dashboard statistics queries")
+    parser.add_argument("--inventory-rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.inventory_rows, args.repeat)
@@ -0,0 +1,87 @@
+# benchmarks/login_storm.py
+"""Latency of ordinary requests while a burst of logins is being processed.
+
+Runs the app in-process and fires concurrent form logins while a probe keeps
+requesting /health/live, once with bcrypt inline on the event loop and once on
+the password hashing pool, and prints login throughput and probe latencies.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.login_storm --logins 40 --workers 4
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import statistics
+import time
+
+# Pause between probe requests
+PROBE_INTERVAL = 0.01
+
+async def _probe(client, stop: asyncio.Event, latencies: List[float]):
+    """Latency as a client sees it: from when the request was due until its response,
+    so time the event loop spent blocked before sending it counts too"""
+    due = time.perf_counter()
+    while not stop.is_set():
+        await client.get("/health/live")
+        finished = time.perf_counter()
+        latencies.append(finished - due)
+        due = finished + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+
+async def _login(client, username: str, password: str) -> bool:
+    response = await client.post("/auth/login", data={"username": username, "password": password})
+    return response.status_code == 302
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+async def run_storm(app, logins: int, username: str, password: str) -> Dict[str, float]:
+    """Fire logins concurrently with a latency probe; returns throughput and probe percentiles (ms)"""
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        latencies: List[float] = []
+        probe = asyncio.create_task(_probe(client, stop, latencies))
+        await asyncio.sleep(0.1)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(_login(client, username, password) for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    return {
+        "logins_ok": sum(results),
+        "logins_per_second": len(results) / elapsed,
+        "probe_requests": len(latencies),
+        "probe_p50_ms": 1000 * statistics.median(latencies) if latencies else 0.0,
+        "probe_p95_ms": 1000 * _percentile(latencies, 0.95),
+        "probe_max_ms": 1000 * max(latencies, default=0.0),
+    }
+
+async def main(logins: int, workers: int, username: str, password: str):
+    from app.utils.password_hashing import PASSWORD_HASH_MAX_QUEUE, password_hasher
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        for label, pool_size in (("inline", 0), (f"pool x{workers}", workers)):
+            password_hasher.configure(pool_size, max(PASSWORD_HASH_MAX_QUEUE, logins))
+            result = await run_storm(app, logins, username, password)
+            print(
+                f"{label:>10}: {result['logins_ok']}/{logins} logins, {result['logins_per_second']:.1f}/s | "
+                f"/health/live during storm: {result['probe_requests']} requests, "
+                f"p50 {result['probe_p50_ms']:.1f} ms, p95 {result['probe_p95_ms']:.1f} ms, "
+                f"max {result['probe_max_ms']:.1f} ms"
+            )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure request latency during a login storm")
+    parser.add_argument("--logins", type=int, default=40, help="concurrent logins in the storm")
+    parser.add_argument("--workers", type=int, default=4, help="password hashing pool size to compare with inline")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers, args.username, args.password))
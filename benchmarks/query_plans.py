@@ -0,0 +1,171 @@
+# benchmarks/query_plans.py
+"""Fail when a hot-path query needs a full table scan.
+
+Usage (after seeding with benchmarks.seed_benchmark_data):
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.query_plans
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from app.models.models import (
+    ActivityEvent, Alert, Customer, HospitalInventory, InventoryItem, Product, PurchaseOrder,
+    PurchaseOrderItem, SalesOrder, SalesOrderItem, StockMovement
+)
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+import json
+import re
+import sys
+
+# Tables that grow with usage - a full scan of these is a regression
+LARGE_TABLES = {
+    "inventory_items", "sales_orders", "sales_order_items", "purchase_orders",
+    "purchase_order_items", "stock_movements", "alerts", "hospital_inventory",
+    "activity_events"
+}
+
+def hot_path_queries(product_id: int, hospital_id: int, sales_order_id: int,
+                     purchase_order_id: int, now: datetime) -> Dict[str, object]:
+    """Statements issued by the dashboards, reports, alerts and order pages"""
+    thirty_days_ago = now - timedelta(days=30)
+    return {
+        "available batches for a product": select(InventoryItem).where(
+            InventoryItem.product_id == product_id,
+            InventoryItem.status == "available",
+            InventoryItem.quantity_available > 0
+        ),
+        "batches expiring within 30 days": select(InventoryItem).where(
+            InventoryItem.expiry_date.between(now, now + timedelta(days=30))
+        ),
+        "hospital order history": select(SalesOrder).where(
+            SalesOrder.customer_id == hospital_id
+        ).order_by(SalesOrder.order_date.desc()),
+        "hospital orders by status in period": select(func.count(SalesOrder.id)).where(
+            SalesOrder.customer_id == hospital_id,
+            SalesOrder.order_date >= thirty_days_ago,
+            SalesOrder.status == "pending"
+        ),
+        "revenue in period": select(func.sum(SalesOrder.total_amount)).where(
+            SalesOrder.order_date >= thirty_days_ago,
+            SalesOrder.status != "cancelled"
+        ),
+        "sales order lines": select(SalesOrderItem).where(
+            SalesOrderItem.sales_order_id == sales_order_id
+        ),
+        "purchases in period": select(func.sum(PurchaseOrder.total_amount)).where(
+            PurchaseOrder.order_date >= thirty_days_ago,
+            PurchaseOrder.status == "received"
+        ),
+        "purchase order lines": select(PurchaseOrderItem).where(
+            PurchaseOrderItem.purchase_order_id == purchase_order_id
+        ),
+        "product movement history": select(StockMovement).where(
+            StockMovement.product_id == product_id
+        ).order_by(StockMovement.created_at.desc()).limit(10),
+        "open alerts by severity": select(Alert).where(
+            Alert.is_acknowledged == False,
+            Alert.severity == "high"
+        ).order_by(Alert.created_at.desc()),
+        "hospital inventory": select(HospitalInventory).where(
+            HospitalInventory.hospital_id == hospital_id
+        ),
+        "hospital stock for a product": select(HospitalInventory).where(
+            HospitalInventory.hospital_id == hospital_id,
+            HospitalInventory.product_id == product_id
+        ),
+        "activity feed": select(ActivityEvent).order_by(
+            ActivityEvent.created_at.desc(), ActivityEvent.id.desc()
+        ).limit(11),
+        "hospital activity feed": select(ActivityEvent.id).where(
+            ActivityEvent.hospital_id == hospital_id
+        ).order_by(ActivityEvent.created_at.desc(), ActivityEvent.id.desc()).limit(11),
+    }
+
+def _compile(db: Session, statement) -> Tuple[str, object]:
+    """Render a statement and its parameters in the driver's paramstyle"""
+    compiled = statement.compile(dialect=db.bind.dialect)
+    if compiled.positional:
+        return str(compiled), tuple(compiled.params[name] for name in compiled.positiontup)
+    return str(compiled), compiled.params
+
+def _sqlite_scans(db: Session, sql: str, params) -> List[str]:
+    """SQLite: 'SCAN <table>' without an index is a full table scan"""
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        match = re.match(r"SCAN (?:TABLE )?(\w+)", detail)
+        if match and match.group(1) in LARGE_TABLES and "INDEX" not in detail:
+            scans.append(detail)
+    return scans
+
+def _mysql_scans(db: Session, sql: str, params) -> List[str]:
+    """MySQL: access type ALL is a full table scan"""
+    result = db.connection().exec_driver_sql(f"EXPLAIN {sql}", params)
+    return [
+        f"ALL on {row['table']}"
+        for row in result.mappings()
+        if row["type"] == "ALL" and row["table"] in LARGE_TABLES
+    ]
+
+def _postgresql_scans(db: Session, sql: str, params) -> List[str]:
+    """PostgreSQL: a Seq Scan that survives enable_seqscan=off has no usable index"""
+    connection = db.connection()
+    connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scans = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+PLAN_INSPECTORS = {
+    "sqlite": _sqlite_scans,
+    "mysql": _mysql_scans,
+    "postgresql": _postgresql_scans,
+}
+
+def find_full_table_scans(db: Session) -> Dict[str, List[str]]:
+    """Explain every hot-path query and return the ones that scan a large table"""
+    inspector = PLAN_INSPECTORS.get(db.bind.dialect.name)
+    if inspector is None:
+        raise RuntimeError(f"No query plan inspector for dialect {db.bind.dialect.name}")
+
+    queries = hot_path_queries(
+        product_id=db.query(Product.id).limit(1).scalar() or 1,
+        hospital_id=db.query(Customer.id).limit(1).scalar() or 1,
+        sales_order_id=db.query(SalesOrder.id).limit(1).scalar() or 1,
+        purchase_order_id=db.query(PurchaseOrder.id).limit(1).scalar() or 1,
+        now=datetime.utcnow()
+    )
+
+    offenders = {}
+    try:
+        for name, statement in queries.items():
+            sql, params = _compile(db, statement)
+            scans = inspector(db, sql, params)
+            if scans:
+                offenders[name] = scans
+    finally:
+        db.rollback()
+    return offenders
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        offenders = find_full_table_scans(db)
+    finally:
+        db.close()
+
+    for name, scans in offenders.items():
+        print(f"FULL SCAN  {name}: {'; '.join(scans)}")
+    if offenders:
+        sys.exit(1)
+    print("All hot-path queries use an index")
@@ -0,0 +1,211 @@
+# benchmarks/seed_benchmark_data.py
+"""Seed a large, deterministic dataset for query-plan checks and benchmarks.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed_benchmark_data --inventory-rows 100000
+"""
+from sqlalchemy.orm import Session
+from app.models.models import (
+    Alert, Category, Customer, HospitalInventory, InventoryItem, Product, PurchaseOrder,
+    PurchaseOrderItem, SalesOrder, SalesOrderItem, StockMovement, User, Vendor
+)
+from app.utils.activity import backfill_activity_events
+from app.utils.seed_data import seed_all_data
+from app.utils.stock_summary import rebuild_product_stock_summary
+from datetime import datetime, timedelta
+import argparse
+import random
+
+BENCHMARK_SKU_PREFIX = "BENCH-"
+CHUNK_SIZE = 5000
+
+SALES_ORDER_STATUSES = ["pending", "confirmed", "shipped", "delivered", "cancelled"]
+PURCHASE_ORDER_STATUSES = ["pending", "confirmed", "shipped", "received", "cancelled"]
+INVENTORY_STATUSES = ["available"] * 8 + ["reserved", "expired"]
+ALERT_TYPES = ["low_stock", "expiry_warning", "temperature_alert"]
+ALERT_SEVERITIES = ["low", "medium", "high", "critical"]
+
+def _bulk_insert(db: Session, model, rows):
+    """Insert rows in chunks with executemany"""
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.execute(model.__table__.insert(), rows[start:start + CHUNK_SIZE])
+
+def _ids(db: Session, column, since_id: int):
+    """Primary keys inserted after since_id"""
+    return [row[0] for row in db.query(column).filter(column > since_id).order_by(column).all()]
+
+def _max_id(db: Session, column) -> int:
+    """Highest primary key currently in a table"""
+    return db.query(column).order_by(column.desc()).limit(1).scalar() or 0
+
+def benchmark_data_exists(db: Session) -> bool:
+    """True when the benchmark products have already been seeded"""
+    return db.query(Product.id).filter(Product.sku.like(f"{BENCHMARK_SKU_PREFIX}%")).first() is not None
+
+def seed_benchmark_data(db: Session, inventory_rows: int = 100_000, seed: int = 42) -> dict:
+    """Seed products, hospitals, stock, orders, movements and alerts scaled from inventory_rows"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    seed_all_data(db)
+    if benchmark_data_exists(db):
+        return {"skipped": True}
+
+    category_ids = [row[0] for row in db.query(Category.id).all()]
+    vendor_ids = [row[0] for row in db.query(Vendor.id).all()]
+    admin_id = db.query(User.id).filter(User.username == "admin").scalar()
+
+    product_count = max(50, inventory_rows // 20)
+    hospital_count = max(10, min(200, inventory_rows // 500))
+    sales_order_count = max(100, inventory_rows // 4)
+    purchase_order_count = max(50, inventory_rows // 10)
+    movement_count = inventory_rows
+    alert_count = max(50, inventory_rows // 20)
+
+    # Products
+    since = _max_id(db, Product.id)
+    _bulk_insert(db, Product, [{
+        "sku": f"{BENCHMARK_SKU_PREFIX}{i:06d}",
+        "name": f"Benchmark Product {i}",
+        "category_id": rng.choice(category_ids) if category_ids else None,
+        "vendor_id": rng.choice(vendor_ids) if vendor_ids else None,
+        "unit_of_measure": "pcs",
+        "unit_price": round(rng.uniform(5, 500), 2),
+        "cost_price": round(rng.uniform(2, 300), 2),
+        "reorder_point": rng.randint(5, 50),
+        "max_stock_level": rng.randint(200, 2000),
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now
+    } for i in range(product_count)])
+    product_ids = _ids(db, Product.id, since)
+
+    # Hospitals
+    since = _max_id(db, Customer.id)
+    _bulk_insert(db, Customer, [{
+        "name": f"Benchmark Hospital {i}",
+        "city": "Accra",
+        "is_active": True,
+        "created_at": now
+    } for i in range(hospital_count)])
+    hospital_ids = _ids(db, Customer.id, since)
+
+    # Inventory batches
+    since = _max_id(db, InventoryItem.id)
+    _bulk_insert(db, InventoryItem, [{
+        "product_id": rng.choice(product_ids),
+        "batch_number": f"BB-{i:07d}",
+        "expiry_date": now + timedelta(days=rng.randint(-60, 720)),
+        "quantity_available": rng.randint(0, 500),
+        "quantity_reserved": 0,
+        "cost_price": round(rng.uniform(2, 300), 2),
+        "selling_price": round(rng.uniform(5, 500), 2),
+        "status": rng.choice(INVENTORY_STATUSES),
+        "received_date": now - timedelta(days=rng.randint(0, 365)),
+        "updated_at": now
+    } for i in range(inventory_rows)])
+    inventory_ids = _ids(db, InventoryItem.id, since)
+
+    # Hospital inventory
+    _bulk_insert(db, HospitalInventory, [{
+        "hospital_id": hospital_id,
+        "product_id": product_id,
+        "current_stock": rng.randint(0, 100),
+        "reorder_point": 5,
+        "max_stock": 100,
+        "created_at": now,
+        "updated_at": now
+    } for hospital_id in hospital_ids for product_id in rng.sample(product_ids, min(20, len(product_ids)))])
+
+    # Sales orders with two lines each
+    since = _max_id(db, SalesOrder.id)
+    _bulk_insert(db, SalesOrder, [{
+        "order_number": f"SO-BENCH-{i:07d}",
+        "customer_id": rng.choice(hospital_ids),
+        "order_date": now - timedelta(days=rng.randint(0, 730), minutes=rng.randint(0, 1440)),
+        "status": rng.choice(SALES_ORDER_STATUSES),
+        "total_amount": round(rng.uniform(100, 20000), 2),
+        "discount_percentage": 0.0,
+        "created_by": admin_id
+    } for i in range(sales_order_count)])
+    sales_order_ids = _ids(db, SalesOrder.id, since)
+    _bulk_insert(db, SalesOrderItem, [{
+        "sales_order_id": sales_order_id,
+        "product_id": rng.choice(product_ids),
+        "inventory_item_id": rng.choice(inventory_ids),
+        "quantity_ordered": quantity,
+        "quantity_shipped": 0,
+        "unit_price": 10,
+        "total_price": quantity * 10
+    } for sales_order_id in sales_order_ids for quantity in (rng.randint(1, 20), rng.randint(1, 20))])
+
+    # Purchase orders with two lines each
+    since = _max_id(db, PurchaseOrder.id)
+    _bulk_insert(db, PurchaseOrder, [{
+        "po_number": f"PO-BENCH-{i:07d}",
+        "vendor_id": rng.choice(vendor_ids),
+        "order_date": now - timedelta(days=rng.randint(0, 730), minutes=rng.randint(0, 1440)),
+        "status": rng.choice(PURCHASE_ORDER_STATUSES),
+        "total_amount": round(rng.uniform(100, 50000), 2),
+        "created_by": admin_id
+    } for i in range(purchase_order_count)])
+    purchase_order_ids = _ids(db, PurchaseOrder.id, since)
+    _bulk_insert(db, PurchaseOrderItem, [{
+        "purchase_order_id": purchase_order_id,
+        "product_id": rng.choice(product_ids),
+        "quantity_ordered": quantity,
+        "quantity_received": 0,
+        "unit_cost": 5,
+        "total_cost": quantity * 5
+    } for purchase_order_id in purchase_order_ids for quantity in (rng.randint(10, 200), rng.randint(10, 200))])
+
+    # Stock movements
+    _bulk_insert(db, StockMovement, [{
+        "product_id": rng.choice(product_ids),
+        "inventory_item_id": rng.choice(inventory_ids),
+        "movement_type": rng.choice(["in", "out"]),
+        "quantity": rng.randint(1, 100),
+        "reference_number": f"MV-{i:07d}",
+        "created_by": admin_id,
+        "created_at": now - timedelta(days=rng.randint(0, 730), minutes=rng.randint(0, 1440))
+    } for i in range(movement_count)])
+
+    # Alerts
+    _bulk_insert(db, Alert, [{
+        "alert_type": rng.choice(ALERT_TYPES),
+        "product_id": rng.choice(product_ids),
+        "message": f"Benchmark alert {i}",
+        "severity": rng.choice(ALERT_SEVERITIES),
+        "is_acknowledged": rng.random() < 0.7,
+        "created_at": now - timedelta(days=rng.randint(0, 365))
+    } for i in range(alert_count)])
+
+    db.commit()
+    rebuild_product_stock_summary(db)
+    activity_events = backfill_activity_events(db, rows=max(movement_count, sales_order_count))
+
+    return {
+        "products": len(product_ids),
+        "hospitals": len(hospital_ids),
+        "inventory_items": len(inventory_ids),
+        "sales_orders": len(sales_order_ids),
+        "purchase_orders": len(purchase_order_ids),
+        "stock_movements": movement_count,
+        "alerts": alert_count,
+        "activity_events": activity_events
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the benchmark dataset into DATABASE_URL")
+    parser.add_argument("--inventory-rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from app.database import SessionLocal, create_tables
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        print(seed_benchmark_data(db, inventory_rows=args.inventory_rows, seed=args.seed))
+    finally:
+        db.close()
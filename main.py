@@ -6,13 +6,21 @@ from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from app.database import get_db, create_tables
+from app.database import get_db, create_tables, dispose_async_engine, engine, SessionLocal
 from app.models.models import User
 from app.routes import auth, categories, products, customers, inventory, purchase_orders, sales_order, dashboard, vendors, reports, alerts, settings
 from app.utils.auth import get_current_user_from_cookie
 from app.utils.seed_data import seed_all_data
+from app.utils.stock_summary import ensure_product_stock_summary
+from app.utils.rollups import ROLLUP_REFRESH_INTERVAL, ensure_order_change_tracking, refresh_daily_rollups, run_rollup_refresher
+from app.utils.reservations import RESERVATION_SWEEP_INTERVAL, run_reservation_sweeper
+from app.utils.alert_engine import ALERT_SWEEP_INTERVAL, ensure_open_alert_index, run_alert_sweeper
+from app.utils.pending_users import pending_users
+from app.utils.activity import ensure_activity_events
+from app.utils.query_stats import QUERY_STATS_ENABLED, query_stats_middleware
 from typing import Optional
 from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import os
 import time
@@ -23,6 +31,8 @@ async def lifespan(app: FastAPI):
     # Startup
     print("Starting up warehouse management system...")
     create_tables()
+    ensure_order_change_tracking(engine)
+    ensure_open_alert_index(engine)
     print("Database tables created successfully!")
     
     # Run database migration for user approval system
@@ -89,9 +99,38 @@ async def lifespan(app: FastAPI):
     # Seed initial data
     db = next(get_db())
     seed_all_data(db)
+    
+    # Backfill the per-product stock summary for databases created before it existed
+    ensure_product_stock_summary(db)
+    
+    # Fold closed days into the daily sales/purchase rollups, then keep them current
+    refresh_daily_rollups(db)
+    
+    # Seed the activity feed from recent movements and orders on first start
+    ensure_activity_events(db)
+    
+    # Seed the in-memory pending approvals count
+    pending_users.load(db)
+    db.close()
+    rollup_task = None
+    if ROLLUP_REFRESH_INTERVAL > 0:
+        rollup_task = asyncio.create_task(run_rollup_refresher(SessionLocal))
+    reservation_task = None
+    if RESERVATION_SWEEP_INTERVAL > 0:
+        reservation_task = asyncio.create_task(run_reservation_sweeper(SessionLocal))
+    alert_task = None
+    if ALERT_SWEEP_INTERVAL > 0:
+        alert_task = asyncio.create_task(run_alert_sweeper(SessionLocal))
     yield
     # Shutdown (cleanup if needed)
     print("Application shutting down...")
+    if rollup_task:
+        rollup_task.cancel()
+    if reservation_task:
+        reservation_task.cancel()
+    if alert_task:
+        alert_task.cancel()
+    await dispose_async_engine()
 
 # Create FastAPI instance with lifespan
 app = FastAPI(
@@ -122,29 +161,16 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 # Templates
 templates = Jinja2Templates(directory="app/templates")
 
-# Middleware to inject pending users count
+# Pending-approval count for the navigation badge, from memory (no DB work per request)
 @app.middleware("http")
 async def add_pending_users_count(request: Request, call_next):
-    """Add pending users count to request state for templates"""
-    response = await call_next(request)
-    
-    # Only add to HTML responses
-    if isinstance(response, HTMLResponse):
-        try:
-            # Get database session
-            db = next(get_db())
-            from app.models.models import User
-            pending_count = db.query(User).filter(
-                User.requires_approval == True,
-                User.is_approved == False
-            ).count()
-            
-            # Add to request state
-            request.state.pending_users_count = pending_count
-        except:
-            request.state.pending_users_count = 0
-    
-    return response
+    """Expose the pending users count to templates through request.state"""
+    request.state.pending_users_count = pending_users.value()
+    return await call_next(request)
+
+# Per-request query counts and DB time as Server-Timing headers (QUERY_STATS_ENABLED=1)
+if QUERY_STATS_ENABLED:
+    app.middleware("http")(query_stats_middleware)
 
 # Root endpoint - Login Page (Direct)
 @app.get("/", response_class=HTMLResponse)
@@ -0,0 +1,76 @@
+import pytest
+from fastapi.testclient import TestClient
+import os
+import sys
+import tempfile
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Test database configuration - set before the app is imported so the sync
+# and async engines both point at the same throwaway SQLite file (with query
+# counting switched on)
+TEST_DB_PATH = os.path.join(tempfile.gettempdir(), "warehouse_test.db")
+if os.path.exists(TEST_DB_PATH):
+    os.remove(TEST_DB_PATH)
+os.environ.pop("MYSQL_URL", None)
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DB_PATH}"
+os.environ["QUERY_STATS_ENABLED"] = "1"
+
+from app.database import SessionLocal
+from main import app
+
+@pytest.fixture(scope="session")
+def client():
+    """Test client fixture (runs the lifespan, which creates and seeds the tables)"""
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def db_session(client):
+    """Database session fixture (the client's lifespan has created the tables)"""
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture(scope="session")
+def admin_client(client):
+    """Test client logged in as the seeded admin user"""
+    response = client.post("/auth/login", data={
+        "username": "admin",
+        "password": "admin123"
+    }, follow_redirects=False)
+    assert response.status_code == 302
+    return client
+
+@pytest.fixture
+def sample_product(db_session):
+    """Create a sample product with one batch of stock"""
+    from app.models.models import Product, InventoryItem
+    import uuid
+
+    product = Product(
+        sku=f"TEST-{uuid.uuid4().hex[:8]}",
+        name="Test Product",
+        unit_of_measure="pcs",
+        unit_price=10,
+        cost_price=5,
+        reorder_point=10,
+        max_stock_level=1000
+    )
+    db_session.add(product)
+    db_session.flush()
+    db_session.add(InventoryItem(
+        product_id=product.id,
+        batch_number=f"BATCH-{product.id}",
+        quantity_available=100,
+        cost_price=5,
+        selling_price=10,
+        status="available"
+    ))
+    db_session.commit()
+    db_session.refresh(product)
+    return product
@@ -0,0 +1,72 @@
+from datetime import datetime
+from sqlalchemy import event
+from app.models.models import ActivityEvent, Customer, InventoryItem, SalesOrder, SalesOrderItem
+from app.utils.activity import activity_feed, record_activity
+import uuid
+
+def test_write_paths_append_events(admin_client, db_session, sample_product):
+    """Receiving stock is public; an order's events are scoped to its hospital"""
+    batch = db_session.query(InventoryItem).filter(InventoryItem.product_id == sample_product.id).one()
+    response = admin_client.post(f"/inventory/{batch.id}/receive", json={"quantity": 7})
+    assert response.status_code == 200
+
+    ordering, other = Customer(name="Feed Hospital"), Customer(name="Other Feed Hospital")
+    db_session.add_all([ordering, other])
+    db_session.flush()
+    order = SalesOrder(order_number=f"SO-FEED-{uuid.uuid4().hex[:8]}", customer_id=ordering.id, status="pending")
+    db_session.add(order)
+    db_session.flush()
+    db_session.add(SalesOrderItem(
+        sales_order_id=order.id, product_id=sample_product.id, quantity_ordered=2, unit_price=10, total_price=20
+    ))
+    db_session.commit()
+    response = admin_client.post("/sales-orders/bulk-status", json={"order_ids": [order.id], "status": "shipped"})
+    assert response.json()["updated"] == 1
+
+    received = f"In 7 units of {sample_product.name}"
+    shipped = f"Sales order {order.order_number} for Feed Hospital marked shipped"
+    everything = [event.message for event in activity_feed(db_session, limit=50).items]
+    assert received in everything and shipped in everything
+    assert f"Out 2 units of {sample_product.name}" in everything
+
+    ordering_feed = activity_feed(db_session, hospital_id=ordering.id, limit=50).items
+    assert {received, shipped} <= {event.message for event in ordering_feed}
+    assert all(event.hospital_id == ordering.id or event.is_public for event in ordering_feed)
+    other_feed = [event.message for event in activity_feed(db_session, hospital_id=other.id, limit=50).items]
+    assert received in other_feed and shipped not in other_feed
+
+    response = admin_client.get("/dashboard/api/activity", params={"limit": 2})
+    body = response.json()
+    assert len(body["activities"]) == 2 and body["has_next"]
+    assert body["activities"][0]["message"] == everything[0]
+
+def test_feed_pages_with_keyset_cursor(db_session):
+    """Each page is one statement and pages neither repeat nor skip events"""
+    hospital_id = db_session.query(Customer.id).order_by(Customer.id.desc()).limit(1).scalar() + 1000
+    created_at = datetime(2030, 1, 1)
+    record_activity(db_session, [{
+        "event_type": "sales_order", "action": "created", "message": f"Feed event {index}",
+        "hospital_id": hospital_id, "is_public": False, "created_at": created_at
+    } for index in range(5)])
+    db_session.commit()
+
+    engine = db_session.get_bind()
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = activity_feed(db_session, hospital_id=hospital_id, after=cursor, limit=2)
+            seen.extend(event for event in page.items if event.hospital_id == hospital_id)
+            pages += 1
+            if not page.has_next or len(seen) >= 5:
+                break
+            cursor = page.next_cursor
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert [event.message for event in seen] == [f"Feed event {index}" for index in range(4, -1, -1)]
+    assert len(statements) == pages == 3
+    assert db_session.query(ActivityEvent).filter(ActivityEvent.hospital_id == hospital_id).count() == 5
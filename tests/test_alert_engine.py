@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import IntegrityError
+from app.models.models import Alert, Customer, InventoryItem, Product, SalesOrder, SalesOrderItem
+from app.utils.alert_engine import OPEN_ALERT_INDEX, ensure_open_alert_index, evaluate_stock_alerts, sweep_expiry_alerts
+import pytest
+import uuid
+
+def _product(db, reorder_point=10):
+    product = Product(sku=f"ALERT-{uuid.uuid4().hex[:8]}", name="Bloodline Set", unit_price=10,
+                      cost_price=5, reorder_point=reorder_point, unit_of_measure="pcs")
+    db.add(product)
+    db.flush()
+    return product
+
+def _batch(db, product, quantity, expiry_date=None):
+    batch = InventoryItem(
+        product_id=product.id, batch_number=f"ALERT-{uuid.uuid4().hex[:8]}", quantity_available=quantity,
+        cost_price=5, selling_price=10, status="available", expiry_date=expiry_date
+    )
+    db.add(batch)
+    db.flush()
+    return batch
+
+def _open_alerts(db, batch):
+    return db.query(Alert).filter(Alert.inventory_item_id == batch.id, Alert.is_acknowledged == False).all()
+
+def test_shipping_raises_one_low_stock_alert(admin_client, db_session):
+    """Only the shipped batch is evaluated, and shipping again does not repeat the alert"""
+    product, untouched_product = _product(db_session), _product(db_session)
+    batch = _batch(db_session, product, 12)
+    untouched = _batch(db_session, untouched_product, 3)
+    hospital = Customer(name="Alerting Hospital")
+    db_session.add(hospital)
+    db_session.flush()
+    orders = []
+    for _ in range(2):
+        order = SalesOrder(order_number=f"SO-ALERT-{uuid.uuid4().hex[:8]}", customer_id=hospital.id, status="pending")
+        db_session.add(order)
+        db_session.flush()
+        db_session.add(SalesOrderItem(sales_order_id=order.id, product_id=product.id, quantity_ordered=3,
+                                      unit_price=10, total_price=30))
+        orders.append(order)
+    db_session.commit()
+
+    for order in orders:
+        response = admin_client.post("/sales-orders/bulk-status", json={"order_ids": [order.id], "status": "shipped"})
+        assert response.json()["updated"] == 1
+
+    db_session.expire_all()
+    alerts = _open_alerts(db_session, batch)
+    assert [(alert.alert_type, alert.severity) for alert in alerts] == [("low_stock", "high")]
+    assert "Available: 9" in alerts[0].message
+    assert _open_alerts(db_session, untouched) == []
+
+def test_new_alerts_go_in_with_one_insert(db_session):
+    """Alerts for many batches are one INSERT; open duplicates are skipped and blocked by the index"""
+    product = _product(db_session)
+    batches = [_batch(db_session, product, 2) for _ in range(4)]
+    db_session.commit()
+
+    engine = db_session.get_bind()
+    inserts = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO ALERTS"):
+            inserts.append(statement)
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        assert evaluate_stock_alerts(db_session, product_ids=[product.id]) == 4
+        assert evaluate_stock_alerts(db_session, inventory_item_ids=[batch.id for batch in batches]) == 0
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    db_session.commit()
+    assert len(inserts) == 1
+
+    with pytest.raises(IntegrityError):
+        db_session.add(Alert(alert_type="low_stock", inventory_item_id=batches[0].id, message="twin", is_acknowledged=False))
+        db_session.commit()
+    db_session.rollback()
+
+    # Once acknowledged, the batch can alert again
+    alert = _open_alerts(db_session, batches[0])[0]
+    alert.is_acknowledged = True
+    db_session.commit()
+    assert evaluate_stock_alerts(db_session, inventory_item_ids=[batches[0].id]) == 1
+    db_session.commit()
+
+def test_expiry_sweep(db_session):
+    """Batches inside the warning window get one warning, graded by days left"""
+    now = datetime.utcnow()
+    product = _product(db_session, reorder_point=0)
+    soon = _batch(db_session, product, 50, now + timedelta(days=5, hours=1))
+    later = _batch(db_session, product, 50, now + timedelta(days=20, hours=1))
+    outside = _batch(db_session, product, 50, now + timedelta(days=90))
+    db_session.commit()
+
+    sweep_expiry_alerts(db_session, now)
+    assert sweep_expiry_alerts(db_session, now) == 0
+    assert [(alert.alert_type, alert.severity) for alert in _open_alerts(db_session, soon)] == [("expiry_warning", "critical")]
+    assert [alert.severity for alert in _open_alerts(db_session, later)] == ["medium"]
+    assert _open_alerts(db_session, outside) == []
+
+def test_startup_builds_missing_open_alert_index(db_session):
+    """An alerts table from before the index gets it at startup, open duplicates acknowledged first"""
+    engine = db_session.get_bind()
+    product = _product(db_session)
+    batch, other = _batch(db_session, product, 2), _batch(db_session, product, 2)
+    db_session.commit()
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP INDEX {OPEN_ALERT_INDEX}"))
+    db_session.add_all([
+        Alert(alert_type="low_stock", inventory_item_id=batch.id, message=message, is_acknowledged=False)
+        for message in ("first", "twin")
+    ])
+    db_session.commit()
+
+    ensure_open_alert_index(engine)
+    ensure_open_alert_index(engine)
+    assert OPEN_ALERT_INDEX in {index["name"] for index in inspect(engine).get_indexes("alerts")}
+    assert [alert.message for alert in _open_alerts(db_session, batch)] == ["first"]
+    # The ON CONFLICT insert works again against the rebuilt index
+    assert evaluate_stock_alerts(db_session, inventory_item_ids=[batch.id, other.id]) == 1
+    db_session.commit()
@@ -0,0 +1,63 @@
+from sqlalchemy import event
+from app.models.models import Alert
+from app.utils.alert_stats import summarize_alert_counts
+
+def _alert_statements(engine):
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "FROM alerts" in statement:
+            statements.append(statement)
+    event.listen(engine, "before_cursor_execute", count)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", count)
+
+def test_summary_is_one_grouped_query_cached_until_alerts_change(admin_client, db_session):
+    """The summary reads one GROUP BY, is reused, and follows create, acknowledge and dismiss"""
+    from app.database import async_engine
+    before = admin_client.get("/alerts/api/summary").json()
+
+    alerts = [
+        Alert(alert_type="low_stock", message="stats", severity="critical", is_acknowledged=False),
+        Alert(alert_type="expiry_warning", message="stats", severity="medium", is_acknowledged=False),
+        Alert(alert_type="expiry_warning", message="stats", severity="medium", is_acknowledged=True),
+    ]
+    db_session.add_all(alerts)
+    db_session.commit()
+
+    statements, stop = _alert_statements(async_engine.sync_engine)
+    try:
+        created = admin_client.get("/alerts/api/summary").json()
+        assert admin_client.get("/alerts/api/summary").json() == created
+    finally:
+        stop()
+    assert len(statements) == 1 and "GROUP BY" in statements[0]
+    assert created["total_alerts"] == before["total_alerts"] + 3
+    assert created["unacknowledged_alerts"] == before["unacknowledged_alerts"] + 2
+    assert created["by_severity"]["critical"] == before["by_severity"]["critical"] + 1
+    assert created["by_type"]["expiry_warning"] == before["by_type"]["expiry_warning"] + 1
+
+    assert admin_client.post(f"/alerts/api/acknowledge/{alerts[0].id}").status_code == 200
+    acknowledged = admin_client.get("/alerts/api/summary").json()
+    assert acknowledged["unacknowledged_alerts"] == before["unacknowledged_alerts"] + 1
+    assert acknowledged["by_severity"]["critical"] == before["by_severity"]["critical"]
+
+    admin_client.get(f"/alerts/{alerts[1].id}/dismiss")
+    dismissed = admin_client.get("/alerts/api/summary").json()
+    assert dismissed["total_alerts"] == before["total_alerts"] + 2
+    assert dismissed["unacknowledged_alerts"] == before["unacknowledged_alerts"]
+
+def test_filtered_totals_come_from_the_grouped_rows():
+    """Each list page filter is a grouping key, so filtered totals need no query"""
+    counts = [
+        ("critical", "low_stock", False, 2),
+        ("critical", "expiry_warning", True, 1),
+        ("medium", "expiry_warning", False, 4),
+        (None, "temperature_alert", None, 3),
+    ]
+    everything = summarize_alert_counts(counts)
+    assert everything["total_alerts"] == 10 and everything["unacknowledged_alerts"] == 6
+    assert everything["by_severity"] == {"critical": 3, "high": 0, "medium": 4, "low": 0}
+    assert everything["unacknowledged_by_type"] == {"low_stock": 2, "expiry_warning": 4, "temperature_alert": 0}
+
+    open_expiry = summarize_alert_counts(counts, alert_type="expiry_warning", acknowledged=False)
+    assert open_expiry["total_alerts"] == 4 and open_expiry["by_severity"]["medium"] == 4
+    assert summarize_alert_counts(counts, severity="critical", acknowledged=True)["total_alerts"] == 1
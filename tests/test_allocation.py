@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from app.models.models import Customer, InventoryItem, Product, SalesOrder, SalesOrderAllocation, SalesOrderItem
+from app.utils.allocation import allocate_lines, ship_line
+import uuid
+
+def _product_with_batches(db, batches):
+    """batches: (label, quantity, days until expiry or None)"""
+    product = Product(sku=f"FEFO-{uuid.uuid4().hex[:8]}", name="Dialysis Filter", unit_price=10, cost_price=5)
+    db.add(product)
+    db.flush()
+    items = {}
+    for label, quantity, expires_in in batches:
+        items[label] = InventoryItem(
+            product_id=product.id,
+            batch_number=f"{label}-{product.id}",
+            quantity_available=quantity,
+            cost_price=5,
+            selling_price=10,
+            status="available",
+            expiry_date=datetime.utcnow() + timedelta(days=expires_in) if expires_in is not None else None
+        )
+        db.add(items[label])
+    db.commit()
+    return product, items
+
+def _order(db, product, *quantities):
+    hospital = Customer(name="FEFO Hospital")
+    db.add(hospital)
+    db.flush()
+    order = SalesOrder(order_number=f"SO-FEFO-{uuid.uuid4().hex[:8]}", customer_id=hospital.id, status="pending")
+    db.add(order)
+    db.flush()
+    lines = [
+        SalesOrderItem(sales_order_id=order.id, product_id=product.id, quantity_ordered=quantity, unit_price=10, total_price=10 * quantity)
+        for quantity in quantities
+    ]
+    db.add_all(lines)
+    db.flush()
+    return order, lines
+
+def _allocated(db, line, items):
+    labels = {item.id: label for label, item in items.items()}
+    return {
+        labels[allocation.inventory_item_id]: allocation.quantity
+        for allocation in db.query(SalesOrderAllocation).filter(SalesOrderAllocation.sales_order_item_id == line.id)
+    }
+
+def test_lines_split_across_batches_first_expiry_first(db_session):
+    """Soonest expiry first, undated batches last, expired batches never; lines share the pool"""
+    product, items = _product_with_batches(db_session, [
+        ("LATE", 5, 30), ("SOON", 3, 10), ("UNDATED", 100, None), ("EXPIRED", 50, -1)
+    ])
+    _, (first, second) = _order(db_session, product, 10, 200)
+
+    shortfalls = allocate_lines(db_session, [first, second])
+    assert _allocated(db_session, first, items) == {"SOON": 3, "LATE": 5, "UNDATED": 2}
+    assert _allocated(db_session, second, items) == {"UNDATED": 98}
+    assert shortfalls == {second.id: 102}
+    assert first.inventory_item_id == items["SOON"].id
+
+    # Editing the line re-plans the unshipped allocations
+    first.quantity_ordered = 4
+    allocate_lines(db_session, [first])
+    assert _allocated(db_session, first, items) == {"SOON": 3, "LATE": 1}
+
+    # Shipping takes from the allocated batches in the same order
+    assert ship_line(db_session, first, 4) == [(items["SOON"].id, 3), (items["LATE"].id, 1)]
+    db_session.commit()
+    assert (items["SOON"].quantity_available, items["LATE"].quantity_available) == (0, 4)
+
+def test_order_form_allocates_across_batches(admin_client, db_session):
+    """An order no single batch can fill is allocated instead of becoming a backorder"""
+    product, items = _product_with_batches(db_session, [("B1", 6, 20), ("B2", 6, 40)])
+    hospital = Customer(name="Form Hospital")
+    db_session.add(hospital)
+    db_session.commit()
+
+    response = admin_client.post("/sales-orders/create", data={
+        "customer_id": hospital.id, "product_ids": [product.id], "quantities": [10], "unit_prices": [10]
+    }, follow_redirects=False)
+    assert response.status_code == 302
+
+    line = db_session.query(SalesOrderItem).filter(SalesOrderItem.product_id == product.id).one()
+    assert _allocated(db_session, line, items) == {"B1": 6, "B2": 4}
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.models.models import Customer, InventoryItem, Product, SalesOrder, SalesOrderItem, StockMovement
+import uuid
+
+def _orders(db, count, quantity, stock):
+    product = Product(sku=f"BULK-{uuid.uuid4().hex[:8]}", name="Syringe Box", unit_price=10, cost_price=5)
+    hospital = Customer(name="Dispatch Hospital")
+    db.add_all([product, hospital])
+    db.flush()
+    batch = InventoryItem(
+        product_id=product.id, batch_number=f"BULK-{product.id}", quantity_available=stock,
+        cost_price=5, selling_price=10, status="available",
+        expiry_date=datetime.utcnow() + timedelta(days=60)
+    )
+    db.add(batch)
+    orders = []
+    for _ in range(count):
+        order = SalesOrder(order_number=f"SO-BULK-{uuid.uuid4().hex[:8]}", customer_id=hospital.id, status="pending")
+        db.add(order)
+        db.flush()
+        db.add(SalesOrderItem(
+            sales_order_id=order.id, product_id=product.id, quantity_ordered=quantity,
+            unit_price=10, total_price=10 * quantity
+        ))
+        orders.append(order)
+    db.commit()
+    return product, batch, orders
+
+def test_bulk_ship_reports_each_order(admin_client, db_session):
+    """Orders the stock covers ship; the rest are reported and left untouched"""
+    product, batch, orders = _orders(db_session, 30, 3, 80)
+
+    from app.database import async_engine
+    engine = async_engine.sync_engine
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO STOCK_MOVEMENTS"):
+            statements.append(statement)
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = admin_client.post("/sales-orders/bulk-status", json={
+            "order_ids": [order.id for order in orders] + [999999], "status": "shipped"
+        })
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["updated"], body["failed"]) == (26, 5)
+    results = {result["order_id"]: result for result in body["orders"]}
+    assert results[999999]["status_code"] == 404
+    assert {results[order.id]["result"] for order in orders[26:]} == {"error"}
+    assert "Insufficient stock" in results[orders[29].id]["error"]
+    # All movements go in with one statement
+    assert len(statements) == 1
+
+    db_session.expire_all()
+    assert batch.quantity_available == 2
+    assert [order.status for order in orders].count("shipped") == 26
+    assert orders[29].status == "pending" and orders[29].items[0].quantity_shipped in (None, 0)
+    assert db_session.query(StockMovement).filter(StockMovement.product_id == product.id).count() == 26
+
+    # Delivering the shipped ones is a plain status change
+    response = admin_client.post("/sales-orders/bulk-status", json={
+        "order_ids": [order.id for order in orders[:26]], "status": "delivered"
+    })
+    assert response.json()["updated"] == 26
+
+def test_bulk_status_rejects_unknown_status(admin_client):
+    response = admin_client.post("/sales-orders/bulk-status", json={"order_ids": [1], "status": "lost"})
+    assert response.status_code == 400
+
+def test_failed_order_keeps_cache_invalidation(admin_client, db_session):
+    """A savepoint rolled back for one order does not hide the others' writes from the report cache"""
+    from app.utils import report_cache
+    _, _, orders = _orders(db_session, 3, 3, 7)
+    report_cache.report_cache.set(("bulk_status_probe",), "stale", ["sales_orders"])
+    published = []
+    report_cache.add_commit_listener(published.append)
+    try:
+        response = admin_client.post("/sales-orders/bulk-status", json={
+            "order_ids": [order.id for order in orders], "status": "shipped"
+        })
+    finally:
+        report_cache._commit_listeners.remove(published.append)
+
+    assert (response.json()["updated"], response.json()["failed"]) == (2, 1)
+    # One publish, at the outer commit, still naming the orders that shipped
+    assert len(published) == 1 and {"sales_orders", "stock_movements"} <= published[0]
+    assert report_cache.report_cache.get(("bulk_status_probe",)) == (False, None)
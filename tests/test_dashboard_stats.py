@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import event
+from app.models.models import Customer, HospitalInventory, InventoryItem, Product, SalesOrder
+from app.routes.dashboard import calculate_dashboard_stats, calculate_staff_dashboard_stats
+import uuid
+
+def _count_statements(db, fn, *args):
+    engine = db.get_bind()
+    statements = []
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        return fn(db, *args), statements
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+def test_dashboard_stats_in_one_statement(db_session):
+    """New stock shows up in every live figure, read with one statement besides the rollups"""
+    now = datetime.utcnow()
+    thirty_days_ago = now - timedelta(days=30)
+    before = calculate_dashboard_stats(db_session, now, thirty_days_ago)
+
+    product = Product(sku=f"STATS-{uuid.uuid4().hex[:8]}", name="Gauze Roll", unit_price=4, cost_price=2, reorder_point=10)
+    db_session.add(product)
+    db_session.flush()
+    db_session.add_all([
+        InventoryItem(product_id=product.id, batch_number=f"STATS-{product.id}-A", quantity_available=5,
+                      cost_price=2, selling_price=4, status="available", expiry_date=now + timedelta(days=10)),
+        InventoryItem(product_id=product.id, batch_number=f"STATS-{product.id}-B", quantity_available=50,
+                      cost_price=3, selling_price=4, status="available"),
+        InventoryItem(product_id=product.id, batch_number=f"STATS-{product.id}-C", quantity_available=0,
+                      cost_price=3, selling_price=4, status="available", expiry_date=now + timedelta(days=5)),
+    ])
+    db_session.commit()
+
+    after, statements = _count_statements(db_session, calculate_dashboard_stats, now, thirty_days_ago)
+    assert after["total_products"] == before["total_products"] + 1
+    assert after["active_products"] == before["active_products"] + 1
+    assert after["total_inventory_value"] == before["total_inventory_value"] + 5 * 2 + 50 * 3
+    assert after["low_stock_alerts"] == before["low_stock_alerts"] + 1
+    assert after["expiring_soon"] == before["expiring_soon"] + 1
+    assert isinstance(after["pending_users"], int)
+    # Order values and ordering customers come from the rollups; everything
+    # else, including all stock figures, is one statement
+    stats_queries = [statement for statement in statements if "in_stock" in statement]
+    assert len(stats_queries) == 1
+    assert [statement for statement in statements if "inventory_items" in statement] == stats_queries
+
+def test_staff_dashboard_stats_in_one_statement(db_session):
+    """A hospital's stock is valued with a join, not a product lookup per row"""
+    now = datetime.utcnow()
+    hospital = Customer(name="Stats Hospital")
+    db_session.add(hospital)
+    db_session.flush()
+    products = [
+        Product(sku=f"STAFF-{uuid.uuid4().hex[:8]}", name=f"Item {index}", unit_price=price, cost_price=1)
+        for index, price in enumerate([10, 2.5, None])
+    ]
+    db_session.add_all(products)
+    db_session.flush()
+    db_session.add_all([
+        HospitalInventory(hospital_id=hospital.id, product_id=product.id, current_stock=stock)
+        for product, stock in zip(products, [3, 4, 7])
+    ])
+    db_session.add_all([
+        SalesOrder(order_number=f"SO-STATS-{uuid.uuid4().hex[:8]}", customer_id=hospital.id, status=order_status)
+        for order_status in ["pending", "shipped", "delivered"]
+    ])
+    db_session.commit()
+
+    user = SimpleNamespace(hospital_id=hospital.id)
+    stats, statements = _count_statements(db_session, calculate_staff_dashboard_stats, now, now - timedelta(days=30), user)
+    assert len(statements) == 1
+    assert stats["total_inventory_items"] == 3
+    assert stats["total_inventory_value"] == 3 * 10 + 4 * 2.5
+    assert (stats["total_sales_orders"], stats["pending_sales_orders"]) == (3, 2)
+    assert stats["products_with_stock"] <= stats["available_products"] <= stats["total_products"]
@@ -0,0 +1,44 @@
+from app.database import SessionLocal
+from app.models.models import Alert, Product
+from app.routes.dashboard import dashboard_events
+import asyncio
+import json
+import uuid
+
+class _ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+def _event(chunk):
+    lines = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return lines["event"], json.loads(lines["data"])
+
+def _commit(*objects):
+    db = SessionLocal()
+    try:
+        db.add_all(objects)
+        db.commit()
+    finally:
+        db.close()
+
+def test_stream_pushes_changed_stats_and_new_alerts(client):
+    async def scenario():
+        events = dashboard_events(_ConnectedRequest(), heartbeat=30)
+        name, snapshot = _event(await events.__anext__())
+        assert name == "stats" and "total_products" in snapshot
+
+        # A write committed elsewhere (here: another thread) wakes the stream
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, _commit, Product(sku=f"SSE-{uuid.uuid4().hex[:8]}", name="Gauze", unit_price=1, cost_price=1))
+        name, changed = _event(await asyncio.wait_for(events.__anext__(), 5))
+        assert name == "stats"
+        assert changed["total_products"] == snapshot["total_products"] + 1
+        # Only the fields that changed are sent
+        assert "total_vendors" not in changed
+
+        await loop.run_in_executor(None, _commit, Alert(alert_type="low_stock", message="Gauze is running low", severity="high"))
+        name, alert = _event(await asyncio.wait_for(events.__anext__(), 5))
+        assert (name, alert["message"], alert["severity"]) == ("alert", "Gauze is running low", "high")
+        await events.aclose()
+
+    asyncio.run(scenario())
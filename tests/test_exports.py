@@ -0,0 +1,59 @@
+from fastapi import HTTPException, status
+from app.models.models import User
+from app.routes.sales_order import export_sales_orders
+from app.utils.exports import build_export
+import asyncio
+import pytest
+import csv
+import io
+
+def _rows(response):
+    return list(csv.reader(io.StringIO(response.text)))
+
+def test_inventory_export_streams_joined_rows(admin_client, sample_product):
+    """/inventory/export resolves before /{inventory_item_id} and includes product columns"""
+    response = admin_client.get("/inventory/export")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/csv")
+
+    rows = _rows(response)
+    assert rows[0][:4] == ["Product Name", "SKU", "Category", "Batch Number"]
+    assert any(row[1] == sample_product.sku and row[4] == "100" for row in rows[1:])
+
+def test_order_and_movement_exports(admin_client):
+    """Sales, purchase and movement exports stream a header even when filtered to nothing"""
+    for url in ("/sales-orders/export", "/purchase-orders/export", "/inventory/movements/export"):
+        response = admin_client.get(url, params={"start_date": "2001-01-01", "end_date": "2001-01-31"})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(_rows(response)) == 1
+
+    response = admin_client.get("/sales-orders/export", params={"start_date": "31/01/2001"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_sales_export_refuses_staff_without_hospital():
+    """A staff user with no hospital gets 403, not every hospital's order lines"""
+    staff = User(username="unassigned", role="staff", hospital_id=None)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(export_sales_orders(start_date=None, end_date=None, current_user=staff))
+    assert error.value.status_code == status.HTTP_403_FORBIDDEN
+
+def test_parquet_export_round_trips(admin_client, sample_product):
+    """Parquet exports are typed, filterable and reject unknown datasets"""
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    response = admin_client.get("/reports/export/inventory.parquet")
+    assert response.status_code == status.HTTP_200_OK
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column_names[:4] == ["product_name", "sku", "category", "batch_number"]
+    assert str(table.schema.field("cost_price").type) == "decimal128(14, 2)"
+    assert sample_product.sku in table.column("sku").to_pylist()
+
+    response = admin_client.get("/reports/export/sales-orders.parquet", params={"start_date": "2001-01-01", "end_date": "2001-01-31"})
+    assert response.status_code == status.HTTP_200_OK
+    assert pq.read_table(io.BytesIO(response.content)).num_rows == 0
+
+    with pytest.raises(HTTPException) as error:
+        build_export("customers")
+    assert error.value.status_code == status.HTTP_404_NOT_FOUND
+    response = admin_client.get("/reports/export/purchase-orders.parquet", params={"hospital_id": 1})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
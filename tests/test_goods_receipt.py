@@ -0,0 +1,59 @@
+from fastapi import status
+from app.models.models import InventoryItem, StockMovement
+
+def test_bulk_receipt_books_all_lines_in_one_go(admin_client, db_session, sample_product):
+    """New batches are created, existing ones topped up, one movement per line"""
+    existing_batch = f"BATCH-{sample_product.id}"
+    new_batch = f"BULK-{sample_product.id}"
+    response = admin_client.post("/inventory/receive/bulk", json={
+        "reference_number": "DN-1001",
+        "lines": [
+            {"sku": sample_product.sku, "batch_number": new_batch, "quantity": 40, "cost_price": "4.50",
+             "expiry_date": "2099-01-31", "location": "A1"},
+            {"product_id": sample_product.id, "batch_number": new_batch, "quantity": 10, "cost_price": 4.5},
+            {"sku": sample_product.sku, "batch_number": existing_batch, "quantity": 25, "cost_price": 5},
+        ]
+    })
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert (body["received"], body["failed"]) == (3, 0)
+
+    items = {item.batch_number: item for item in db_session.query(InventoryItem).filter(
+        InventoryItem.product_id == sample_product.id
+    ).all()}
+    assert items[new_batch].quantity_available == 50
+    assert items[new_batch].location == "A1"
+    assert items[existing_batch].quantity_available == 125
+    assert body["lines"][0]["inventory_item_id"] == items[new_batch].id
+
+    movements = db_session.query(StockMovement).filter(StockMovement.reference_number == "DN-1001").all()
+    assert sorted(movement.quantity for movement in movements) == [10, 25, 40]
+
+def test_bulk_receipt_csv_is_all_or_nothing(admin_client, db_session, sample_product):
+    """One bad line rejects the whole receipt and is reported by row number"""
+    body = (
+        "SKU,Batch Number,Quantity,Cost Price,Expiry Date\n"
+        f"{sample_product.sku},CSV-OK,5,1.00,\n"
+        "NO-SUCH-SKU,CSV-BAD,0,abc,2001-01-01\n"
+    )
+    response = admin_client.post("/inventory/receive/bulk", content=body, headers={"content-type": "text/csv"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    lines = response.json()["lines"]
+    assert lines[0]["status"] == "not_received"
+    assert lines[1]["line"] == 3
+    assert lines[1]["errors"] == [
+        "unknown product 'NO-SUCH-SKU'",
+        "quantity must be greater than 0",
+        "cost_price must be a number",
+        "expiry_date is in the past",
+    ]
+    assert db_session.query(InventoryItem).filter(InventoryItem.batch_number == "CSV-OK").count() == 0
+
+def test_bulk_receipt_json_allow_partial_must_be_boolean(admin_client, sample_product):
+    """A string like "false" is rejected rather than read as true"""
+    response = admin_client.post("/inventory/receive/bulk", json={
+        "allow_partial": "false",
+        "lines": [{"product_id": sample_product.id, "batch_number": "STR-FLAG", "quantity": 1}]
+    })
+    assert response.status_code == 400
+    assert "allow_partial" in response.json()["detail"]
@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app.database import SessionLocal
+from app.models.models import Customer, NumberSequence, SalesOrder
+from app.utils.order_numbers import NumberAllocator, next_sales_order_number
+
+WORKERS = 8
+NUMBERS_PER_WORKER = 25
+
+def _numbers_from_own_worker(prefix):
+    """One worker process: its own allocator (block cache) and session"""
+    allocator = NumberAllocator(block_size=7)
+    db = SessionLocal()
+    try:
+        return [allocator.next_value(db, prefix, SalesOrder.order_number) for _ in range(NUMBERS_PER_WORKER)]
+    finally:
+        db.close()
+
+def test_workers_never_hand_out_the_same_number(db_session):
+    prefix = f"TEST-{datetime.utcnow().strftime('%H%M%S%f')}"
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        numbers = [number for batch in pool.map(_numbers_from_own_worker, [prefix] * WORKERS) for number in batch]
+
+    assert len(set(numbers)) == WORKERS * NUMBERS_PER_WORKER
+    # Each worker claimed whole blocks of 7 from the counter
+    counter = db_session.get(NumberSequence, prefix)
+    assert counter.next_value - 1 >= max(numbers)
+
+def test_new_counter_continues_after_existing_numbers(db_session):
+    """A year's counter is seeded past the numbers issued before the counter existed"""
+    hospital = Customer(name="Numbering Hospital")
+    db_session.add(hospital)
+    db_session.flush()
+    db_session.add_all([
+        SalesOrder(order_number=number, customer_id=hospital.id, status="pending")
+        for number in ("SO-2031-9999", "SO-2031-10000", "SO-2031-0042")
+    ])
+    db_session.commit()
+
+    when = datetime(2031, 5, 1)
+    assert next_sales_order_number(db_session, when) == "SO-2031-10001"
+    assert next_sales_order_number(db_session, when) == "SO-2031-10002"
@@ -0,0 +1,48 @@
+import pytest
+from fastapi import HTTPException, status
+from datetime import datetime
+from app.utils.pagination import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    """Cursors carry the sort value and id, including datetimes"""
+    created = datetime(2024, 5, 1, 12, 30, 15, 250)
+    assert decode_cursor(encode_cursor(created, 42)) == (created, 42)
+    assert decode_cursor(encode_cursor("PO-0001", 7)) == ("PO-0001", 7)
+
+def test_invalid_cursor_is_rejected():
+    """A tampered cursor is a client error, not a server error"""
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor("not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+def test_products_api_walks_every_page_once(admin_client, db_session):
+    """Following next_cursor visits each product exactly once, newest first"""
+    from app.models.models import Product
+    import uuid
+
+    for i in range(5):
+        db_session.add(Product(
+            sku=f"PAGE-{uuid.uuid4().hex[:8]}",
+            name=f"Paged Product {i}",
+            unit_of_measure="pcs",
+            unit_price=1,
+            cost_price=1
+        ))
+    db_session.commit()
+    expected = db_session.query(Product).filter(Product.is_active == True).count()
+
+    seen, after = [], None
+    while True:
+        params = {"per_page": 2}
+        if after:
+            params["after"] = after
+        response = admin_client.get("/products/api/products", params=params)
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert len(body["products"]) <= 2
+        seen.extend(product["id"] for product in body["products"])
+        if not body["has_next"]:
+            break
+        after = body["next_cursor"]
+
+    assert len(seen) == len(set(seen)) == expected
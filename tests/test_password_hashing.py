@@ -0,0 +1,39 @@
+from fastapi import HTTPException
+from app.utils.password_hashing import PasswordHashExecutor
+import asyncio
+import pytest
+import threading
+
+def test_pool_runs_off_the_loop_and_bounds_its_queue():
+    hasher = PasswordHashExecutor(workers=1, max_queue=2)
+    release = threading.Event()
+
+    def slow_hash(value):
+        release.wait(5)
+        return f"hashed-{value}"
+
+    async def scenario():
+        first = asyncio.ensure_future(hasher.run(slow_hash, 1))
+        second = asyncio.ensure_future(hasher.run(slow_hash, 2))
+        await asyncio.sleep(0.05)
+        # The loop is still free while the worker is busy; one job waits in the queue
+        assert (hasher.stats()["running"], hasher.stats()["queued"]) == (1, 1)
+
+        third = asyncio.ensure_future(hasher.run(slow_hash, 3))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as rejected:
+            await hasher.run(slow_hash, 4)
+        assert rejected.value.status_code == 503
+
+        release.set()
+        return await asyncio.gather(first, second, third)
+
+    assert asyncio.run(scenario()) == ["hashed-1", "hashed-2", "hashed-3"]
+    stats = hasher.stats()
+    assert (stats["completed"], stats["rejected"], stats["max_queued"]) == (3, 1, 2)
+
+def test_login_still_works_through_the_pool(client):
+    response = client.post("/auth/login", data={"username": "admin", "password": "wrong"}, follow_redirects=False)
+    assert response.status_code == 200
+    response = client.post("/auth/login", data={"username": "admin", "password": "admin123"}, follow_redirects=False)
+    assert response.status_code == 302
@@ -0,0 +1,24 @@
+from app.models.models import User
+from app.utils.pending_users import count_pending_users, pending_users
+import uuid
+
+def test_badge_count_follows_registration_and_approval(admin_client, db_session):
+    """The navigation badge comes from memory and tracks the write paths"""
+    pending_users.load(db_session)
+    before = pending_users.value()
+
+    username = f"pending-{uuid.uuid4().hex[:8]}"
+    response = admin_client.post("/auth/register-form", data={
+        "username": username, "email": f"{username}@example.com", "full_name": "Pending Person",
+        "password": "secret123", "confirm_password": "secret123", "role": "manager"
+    }, follow_redirects=False)
+    assert response.status_code == 302
+    assert pending_users.value() == before + 1 == count_pending_users(db_session)
+
+    page = admin_client.get("/sales-orders/create")
+    assert f'<span class="badge bg-warning text-dark ms-2">{before + 1}</span>' in page.text
+
+    user = db_session.query(User).filter(User.username == username).one()
+    response = admin_client.post(f"/auth/approve-user/{user.id}")
+    assert response.status_code == 200
+    assert pending_users.value() == before == count_pending_users(db_session)
@@ -0,0 +1,41 @@
+from fastapi import status
+from app.models.models import Category, Product
+from app.utils.product_import import import_products, read_product_rows
+import io
+import uuid
+
+def test_import_upserts_in_chunks_and_reports_bad_rows(db_session, sample_product):
+    """New SKUs are inserted, existing ones updated, invalid rows reported by row number"""
+    category = Category(name=f"Import {uuid.uuid4().hex[:6]}")
+    db_session.add(category)
+    db_session.commit()
+
+    prefix = f"IMP-{uuid.uuid4().hex[:6]}"
+    lines = ["SKU,Product Name,Category,Unit Price,Reorder Point"]
+    lines += [f"{prefix}-{i},Imported {i},{category.name},{i}.50,5" for i in range(5)]
+    lines += [
+        f"{sample_product.sku},Renamed Product,,12.00,7",
+        f"{prefix}-bad,Bad Row,No Such Category,-1,5",
+        f"{prefix}-0,Duplicate,,1,1",
+        ",Missing SKU,,1,1",
+    ]
+    upload = io.BytesIO("\n".join(lines).encode())
+
+    report = import_products(db_session, read_product_rows(upload, "catalog.csv"), chunk_size=2)
+    assert (report.created, report.updated) == (5, 1)
+    assert [error["row"] for error in report.errors] == [8, 9, 10]
+    assert report.errors[0]["errors"] == ["unknown category 'No Such Category'", "unit_price must be zero or more"]
+
+    imported = db_session.query(Product).filter(Product.sku == f"{prefix}-3").one()
+    assert (imported.category_id, float(imported.unit_price), imported.reorder_point) == (category.id, 3.5, 5)
+    db_session.refresh(sample_product)
+    assert (sample_product.name, float(sample_product.cost_price)) == ("Renamed Product", 5.0)
+
+def test_import_endpoint_rejects_missing_columns(admin_client):
+    """The upload needs sku and name columns"""
+    response = admin_client.post(
+        "/products/import",
+        files={"file": ("catalog.csv", b"Name,Unit Price\nA,1\n", "text/csv")}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "sku" in response.json()["detail"]
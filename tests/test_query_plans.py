@@ -0,0 +1,47 @@
+import pytest
+import os
+import tempfile
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.models.models import Base
+from benchmarks.seed_benchmark_data import seed_benchmark_data
+from benchmarks.query_plans import find_full_table_scans
+
+@pytest.fixture(scope="module")
+def benchmark_session():
+    """Separate SQLite database seeded with a scaled-down benchmark dataset"""
+    path = os.path.join(tempfile.gettempdir(), "warehouse_query_plans.db")
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    seed_benchmark_data(db, inventory_rows=5000)
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+def test_hot_path_queries_use_indexes(benchmark_session):
+    """No dashboard/report query scans a large table on the benchmark dataset"""
+    assert find_full_table_scans(benchmark_session) == {}
+
+def test_check_detects_missing_index(benchmark_session):
+    """Dropping a hot-path index makes the check fail"""
+    benchmark_session.execute(text("DROP INDEX ix_stock_movements_product_created"))
+    benchmark_session.commit()
+
+    # Fresh connection so SQLite does not reuse a plan prepared with the old schema
+    engine = create_engine(benchmark_session.bind.url)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        offenders = find_full_table_scans(db)
+        assert "product movement history" in offenders
+    finally:
+        db.execute(text(
+            "CREATE INDEX ix_stock_movements_product_created ON stock_movements (product_id, created_at)"
+        ))
+        db.commit()
+        db.close()
+        engine.dispose()
@@ -0,0 +1,28 @@
+from fastapi import status
+from app.utils.query_stats import REPEAT_THRESHOLD, RequestQueryStats
+
+def test_repeated_statements_are_flagged():
+    """The same statement issued REPEAT_THRESHOLD times in a request is reported"""
+    stats = RequestQueryStats()
+    for _ in range(REPEAT_THRESHOLD):
+        stats.record("SELECT * FROM products WHERE products.id = ?", 0.001)
+    stats.record("SELECT count(*) FROM alerts", 0.002)
+
+    assert stats.count == REPEAT_THRESHOLD + 1
+    assert list(stats.repeated) == ["SELECT * FROM products WHERE products.id = ?"]
+    assert "db-repeated" in stats.server_timing(10.0)
+
+def test_server_timing_header_and_route_summary(admin_client):
+    """Pages carry a Server-Timing header and feed the admin summary"""
+    admin_client.post("/settings/api/query-stats/reset")
+
+    response = admin_client.get("/dashboard/")
+    assert response.status_code == status.HTTP_200_OK
+    assert 'queries"' in response.headers["Server-Timing"]
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+    summary = admin_client.get("/settings/api/query-stats").json()
+    assert summary["enabled"] is True
+    dashboard = summary["routes"]["GET /dashboard/"]
+    assert dashboard["requests"] == 1
+    assert dashboard["max_queries"] > 0
@@ -0,0 +1,46 @@
+from fastapi import status
+from app.utils.report_cache import ReportCache, report_cache
+
+def test_lru_eviction_respects_memory_cap():
+    """Least recently used entries are evicted once the byte budget is exceeded"""
+    cache = ReportCache(max_bytes=2000, default_ttl=60)
+    cache.set("a", "x" * 800, ["sales_orders"])
+    cache.set("b", "y" * 800, ["sales_orders"])
+    assert cache.get("a")[0]
+    cache.set("c", "z" * 800, ["purchase_orders"])
+
+    assert cache.get("a")[0] and cache.get("c")[0]
+    assert cache.get("b") == (False, None)
+    assert cache.stats()["evictions"] == 1
+
+def test_ttl_expiry():
+    """Entries past their TTL are treated as misses"""
+    cache = ReportCache(default_ttl=60)
+    cache.set("stale", {"value": 1}, ["sales_orders"], ttl=-1)
+    assert cache.get("stale") == (False, None)
+    assert cache.stats()["misses"] == 1
+
+def test_commit_invalidates_dependent_reports(admin_client, db_session, sample_product):
+    """Dashboard stats are served from cache until an inventory write commits"""
+    from app.models.models import InventoryItem
+
+    report_cache.clear()
+    first = admin_client.get("/dashboard/api/stats").json()
+    hits_before = report_cache.stats()["hits"]
+    assert admin_client.get("/dashboard/api/stats").json() == first
+    assert report_cache.stats()["hits"] == hits_before + 1
+
+    db_session.add(InventoryItem(
+        product_id=sample_product.id,
+        batch_number=f"CACHE-{sample_product.id}",
+        quantity_available=5,
+        cost_price=5,
+        selling_price=10,
+        status="available"
+    ))
+    db_session.commit()
+    assert report_cache.stats()["entries"] == 0
+
+    response = admin_client.get("/settings/api/report-cache")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["invalidations"] >= 1
@@ -0,0 +1,55 @@
+from fastapi import status
+from datetime import datetime
+from app.utils.report_queries import bucket_labels, financial_series, sales_by_bucket
+
+def test_bucket_labels_cover_range():
+    """Weeks start on Monday and months are labelled YYYY-MM"""
+    start, end = datetime(2024, 1, 17, 9), datetime(2024, 3, 2)
+    assert [label for label, _ in bucket_labels(start, end, "month")] == ["2024-01", "2024-02", "2024-03"]
+    weeks = [label for label, _ in bucket_labels(start, datetime(2024, 1, 29), "week")]
+    assert weeks == ["2024-01-15", "2024-01-22", "2024-01-29"]
+    assert len(bucket_labels(start, datetime(2024, 1, 19, 23), "day")) == 3
+
+def test_sales_grouped_per_bucket(db_session):
+    """One GROUP BY returns revenue, order value and counts for each bucket"""
+    from app.models.models import Customer, SalesOrder
+    import uuid
+
+    hospital = Customer(name="Bucket Hospital")
+    db_session.add(hospital)
+    db_session.flush()
+    for order_date, order_status, amount in [
+        (datetime(2023, 1, 2, 8), "delivered", 100),   # Monday
+        (datetime(2023, 1, 8, 23), "pending", 40),     # Sunday, same week
+        (datetime(2023, 1, 9, 1), "shipped", 60),      # next Monday
+        (datetime(2023, 2, 14, 12), "delivered", 25),
+    ]:
+        db_session.add(SalesOrder(
+            order_number=f"SO-BUCKET-{uuid.uuid4().hex[:8]}",
+            customer_id=hospital.id,
+            order_date=order_date,
+            status=order_status,
+            total_amount=amount
+        ))
+    db_session.commit()
+
+    start, end = datetime(2023, 1, 1), datetime(2023, 2, 28)
+    months = sales_by_bucket(db_session, start, end, "month", customer_id=hospital.id)
+    assert months["2023-01"] == {"revenue": 160.0, "order_value": 200.0, "orders": 3}
+    assert months["2023-02"] == {"revenue": 25.0, "order_value": 25.0, "orders": 1}
+
+    weeks = sales_by_bucket(db_session, start, end, "week", customer_id=hospital.id)
+    assert weeks["2023-01-02"]["orders"] == 2
+    assert weeks["2023-01-09"]["revenue"] == 60.0
+
+    days = sales_by_bucket(db_session, start, end, "day", customer_id=hospital.id)
+    assert days["2023-01-08"]["order_value"] == 40.0
+
+    series = financial_series(db_session, start, end, "month", customer_id=hospital.id, include_expenses=False)
+    assert [row["period"] for row in series] == ["2023-01", "2023-02"]
+
+def test_financial_report_periods_render(admin_client):
+    """The financial page honours the period filter"""
+    for period in ("daily", "weekly", "monthly"):
+        response = admin_client.get("/reports/financial", params={"period": period})
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from app.models.models import Customer, InventoryItem, Product, SalesOrder, SalesOrderAllocation, SalesOrderItem
+from app.utils.reservations import available_to_promise, release_expired_reservations
+import uuid
+
+def _product(db, quantity):
+    product = Product(sku=f"RSV-{uuid.uuid4().hex[:8]}", name="Insulin Pen", unit_price=10, cost_price=5)
+    db.add(product)
+    db.flush()
+    batch = InventoryItem(
+        product_id=product.id, batch_number=f"RSV-{product.id}", quantity_available=quantity,
+        cost_price=5, selling_price=10, status="available",
+        expiry_date=datetime.utcnow() + timedelta(days=90)
+    )
+    db.add(batch)
+    db.commit()
+    return product, batch
+
+def _order(db, product, quantity, name):
+    hospital = Customer(name=name)
+    db.add(hospital)
+    db.flush()
+    order = SalesOrder(order_number=f"SO-RSV-{uuid.uuid4().hex[:8]}", customer_id=hospital.id, status="pending")
+    db.add(order)
+    db.flush()
+    db.add(SalesOrderItem(
+        sales_order_id=order.id, product_id=product.id, quantity_ordered=quantity,
+        unit_price=10, total_price=10 * quantity
+    ))
+    db.commit()
+    return order
+
+def _set_status(client, order, status):
+    return client.post(f"/sales-orders/{order.id}/update-status", data={"status": status}, follow_redirects=False)
+
+def test_confirmation_reserves_the_last_units(admin_client, db_session):
+    """The first hospital to confirm holds the stock; the second is refused at confirmation, not at shipping"""
+    product, batch = _product(db_session, 10)
+    first = _order(db_session, product, 8, "First Hospital")
+    second = _order(db_session, product, 5, "Second Hospital")
+
+    assert _set_status(admin_client, first, "confirmed").status_code == 302
+    db_session.expire_all()
+    assert batch.quantity_reserved == 8
+    assert available_to_promise(db_session, [product.id]) == {product.id: 2}
+
+    assert _set_status(admin_client, second, "confirmed").status_code == 400
+    db_session.expire_all()
+    assert second.status == "pending"
+    assert batch.quantity_reserved == 8
+
+    # Shipping consumes the reservation together with the stock
+    assert _set_status(admin_client, first, "shipped").status_code == 302
+    db_session.expire_all()
+    assert (batch.quantity_available, batch.quantity_reserved) == (2, 0)
+
+def test_cancellation_and_expiry_release_reservations(admin_client, db_session):
+    product, batch = _product(db_session, 10)
+    cancelled = _order(db_session, product, 4, "Cancelling Hospital")
+    stale = _order(db_session, product, 6, "Stale Hospital")
+
+    assert _set_status(admin_client, cancelled, "confirmed").status_code == 302
+    assert _set_status(admin_client, stale, "confirmed").status_code == 302
+    db_session.expire_all()
+    assert available_to_promise(db_session, [product.id]) == {product.id: 0}
+
+    assert _set_status(admin_client, cancelled, "cancelled").status_code == 302
+    db_session.expire_all()
+    assert batch.quantity_reserved == 6
+
+    # Nothing is due yet; past the TTL the sweeper gives the stock back
+    assert release_expired_reservations(db_session) == 0
+    assert release_expired_reservations(db_session, now=datetime.utcnow() + timedelta(days=30)) == 1
+    db_session.expire_all()
+    assert batch.quantity_reserved == 0
+    allocation = db_session.query(SalesOrderAllocation).join(SalesOrderItem).filter(
+        SalesOrderItem.sales_order_id == stale.id
+    ).one()
+    assert (allocation.quantity_reserved, allocation.reserved_until) == (0, None)
+    assert available_to_promise(db_session, [product.id]) == {product.id: 10}
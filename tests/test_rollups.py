@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from app.models.models import Customer, DailySalesRollup, SalesOrder
+from app.utils.rollups import refresh_daily_rollups, sales_totals_by_status, sum_totals
+import uuid
+
+def _live_totals(db, customer_id, start, end):
+    """Reference numbers straight from sales_orders"""
+    orders = db.query(SalesOrder).filter(
+        SalesOrder.customer_id == customer_id,
+        SalesOrder.order_date.between(start, end)
+    ).all()
+    return len(orders), sum(float(order.total_amount) for order in orders)
+
+def test_rollups_follow_order_changes(db_session):
+    """Closed days come from the rollup, the open day from the live table, and changes are folded in"""
+    hospital = Customer(name="Rollup Hospital")
+    db_session.add(hospital)
+    db_session.flush()
+
+    now = datetime.utcnow()
+    orders = []
+    for days_ago, order_status, amount in [(3, "delivered", 100), (2, "pending", 50), (1, "shipped", 30), (0, "pending", 7)]:
+        order = SalesOrder(
+            order_number=f"SO-ROLLUP-{uuid.uuid4().hex[:8]}",
+            customer_id=hospital.id,
+            order_date=now - timedelta(days=days_ago),
+            status=order_status,
+            total_amount=amount
+        )
+        db_session.add(order)
+        orders.append(order)
+    db_session.commit()
+
+    refresh_daily_rollups(db_session, now)
+    rolled = db_session.query(DailySalesRollup).filter(DailySalesRollup.customer_id == hospital.id).all()
+    assert sorted(row.status for row in rolled) == ["delivered", "pending", "shipped"]
+
+    start = now - timedelta(days=5)
+    totals = sales_totals_by_status(db_session, start, now, customer_id=hospital.id)
+    assert sum_totals(totals) == _live_totals(db_session, hospital.id, start, now)
+    assert sum_totals(totals, ["delivered", "shipped"]) == (2, 130.0)
+
+    # A status change on a closed day is picked up by the next incremental run
+    orders[1].status = "cancelled"
+    db_session.commit()
+    refresh_daily_rollups(db_session, now)
+
+    totals = sales_totals_by_status(db_session, start, now, customer_id=hospital.id)
+    assert totals["cancelled"] == (1, 50.0)
+    assert totals["pending"] == (1, 7.0)
+
+def test_changed_closed_days_are_read_live_until_refreshed(db_session):
+    """Shipping an older order counts at once; the refresh that folds it in invalidates cached reports"""
+    from app.utils.report_cache import ROLLUP_TABLES, report_cache
+    hospital = Customer(name="Stale Rollup Hospital")
+    db_session.add(hospital)
+    db_session.flush()
+    now = datetime.utcnow()
+    order = SalesOrder(
+        order_number=f"SO-STALE-{uuid.uuid4().hex[:8]}", customer_id=hospital.id,
+        order_date=now - timedelta(days=1), status="confirmed", total_amount=40
+    )
+    db_session.add(order)
+    db_session.commit()
+    refresh_daily_rollups(db_session, now)
+
+    start = now - timedelta(days=5)
+    order.status = "shipped"
+    db_session.commit()
+    totals = sales_totals_by_status(db_session, start, now, customer_id=hospital.id)
+    assert totals == {"shipped": (1, 40.0)}
+
+    report_cache.set(("rollup_probe",), "stale", ROLLUP_TABLES)
+    refresh_daily_rollups(db_session, datetime.utcnow())
+    assert report_cache.get(("rollup_probe",)) == (False, None)
+    assert sales_totals_by_status(db_session, start, now, customer_id=hospital.id) == totals
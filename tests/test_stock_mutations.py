@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from app.database import SessionLocal
+from app.models.models import InventoryItem
+from app.utils.stock_mutations import add_stock, take_stock
+
+WORKERS = 16
+ATTEMPTS_PER_WORKER = 10
+
+def _take_one_unit_repeatedly(inventory_item_id):
+    """One worker: its own session, one short transaction per attempt"""
+    taken = 0
+    db = SessionLocal()
+    try:
+        for _ in range(ATTEMPTS_PER_WORKER):
+            if take_stock(db, inventory_item_id, 1):
+                taken += 1
+            db.commit()
+    finally:
+        db.close()
+    return taken
+
+def test_concurrent_takes_never_oversell(db_session, sample_product):
+    """160 concurrent single-unit takes against 100 units succeed exactly 100 times"""
+    item = db_session.query(InventoryItem).filter(InventoryItem.product_id == sample_product.id).one()
+    assert item.quantity_available == 100
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        taken = sum(pool.map(_take_one_unit_repeatedly, [item.id] * WORKERS))
+
+    db_session.refresh(item)
+    assert taken == 100
+    assert item.quantity_available == 0
+
+def test_take_and_add_refresh_session_state(db_session, sample_product):
+    """A failed take leaves stock untouched and loaded objects see the new quantity"""
+    item = db_session.query(InventoryItem).filter(InventoryItem.product_id == sample_product.id).one()
+
+    assert not take_stock(db_session, item.id, 101)
+    assert take_stock(db_session, item.id, 60)
+    assert item.quantity_available == 40
+    assert add_stock(db_session, item.id, 5)
+    db_session.commit()
+    assert item.quantity_available == 45
+
+def test_shipping_paths_only_take_the_unshipped_remainder(admin_client, db_session, sample_product):
+    """A partial shipment followed by a full one takes the ordered quantity exactly once"""
+    from app.models.models import Customer, SalesOrder, SalesOrderItem
+    import uuid
+
+    item = db_session.query(InventoryItem).filter(InventoryItem.product_id == sample_product.id).one()
+    hospital = Customer(name="Shipping Hospital")
+    db_session.add(hospital)
+    db_session.flush()
+    order = SalesOrder(order_number=f"SO-SHIP-{uuid.uuid4().hex[:8]}", customer_id=hospital.id, status="confirmed", total_amount=500)
+    db_session.add(order)
+    db_session.flush()
+    line = SalesOrderItem(
+        sales_order_id=order.id, product_id=sample_product.id, inventory_item_id=item.id,
+        quantity_ordered=50, unit_price=10, total_price=500
+    )
+    db_session.add(line)
+    db_session.commit()
+
+    response = admin_client.post(f"/sales-orders/{order.id}/partial-shipment",
+                                 data={"item_id": line.id, "quantity_shipped": 30}, follow_redirects=False)
+    assert response.status_code == 302
+    response = admin_client.post(f"/sales-orders/{order.id}/partial-shipment",
+                                 data={"item_id": line.id, "quantity_shipped": 30}, follow_redirects=False)
+    assert response.status_code == 400
+
+    response = admin_client.post(f"/sales-orders/{order.id}/update-status", data={"status": "shipped"}, follow_redirects=False)
+    assert response.status_code == 302
+
+    db_session.expire_all()
+    assert (line.quantity_shipped, order.status, item.quantity_available) == (50, "shipped", 50)
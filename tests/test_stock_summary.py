@@ -0,0 +1,51 @@
+from fastapi import status
+from app.models.models import ProductStockSummary
+from app.utils.stock_summary import rebuild_product_stock_summary, refresh_product_stock_summary
+
+def test_receive_and_issue_keep_summary_in_sync(admin_client, db_session, sample_product):
+    """Inventory writes update product_stock_summary in the same transaction"""
+    rebuild_product_stock_summary(db_session)
+    item = sample_product.inventory_items[0]
+
+    response = admin_client.post(f"/inventory/{item.id}/receive", json={"quantity": 20})
+    assert response.status_code == status.HTTP_200_OK
+
+    response = admin_client.post("/inventory/issue", data={
+        "inventory_item_id": item.id,
+        "quantity": 30,
+        "reason": "Ward transfer"
+    }, follow_redirects=False)
+    assert response.status_code == 302
+
+    db_session.expire_all()
+    summary = db_session.get(ProductStockSummary, sample_product.id)
+    assert summary.quantity_available == 90
+    assert summary.batch_count == 1
+    assert float(summary.stock_value) == 450.0
+
+def test_rebuild_repairs_drifted_summary(db_session, sample_product):
+    """The rebuild command recomputes rows from inventory_items"""
+    rebuild_product_stock_summary(db_session)
+    summary = db_session.get(ProductStockSummary, sample_product.id)
+    summary.quantity_available = 999
+    db_session.commit()
+
+    rebuild_product_stock_summary(db_session)
+    db_session.expire_all()
+    assert db_session.get(ProductStockSummary, sample_product.id).quantity_available == 100
+
+def test_refresh_creates_missing_rows_and_updates_loaded_ones(db_session, sample_product):
+    """A first refresh inserts the row; later ones update it in place, refreshing loaded objects"""
+    db_session.query(ProductStockSummary).filter(ProductStockSummary.product_id == sample_product.id).delete()
+    db_session.commit()
+
+    refresh_product_stock_summary(db_session, [sample_product.id])
+    db_session.commit()
+    summary = db_session.get(ProductStockSummary, sample_product.id)
+    assert (summary.quantity_available, summary.batch_count) == (100, 1)
+
+    sample_product.inventory_items[0].quantity_available = 40
+    refresh_product_stock_summary(db_session, [sample_product.id])
+    assert summary.quantity_available == 40
+    db_session.commit()
+    assert float(db_session.get(ProductStockSummary, sample_product.id).stock_value) == 200.0
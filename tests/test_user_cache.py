@@ -0,0 +1,37 @@
+from app.models.models import User
+from app.utils.auth import get_password_hash
+from app.utils.user_cache import user_cache
+import uuid
+
+def test_cached_user_is_detached_copy_and_expires_on_toggle(admin_client, db_session):
+    """Authenticated requests reuse the cached user until an admin changes it"""
+    user = User(
+        username=f"cached-{uuid.uuid4().hex[:8]}", email=f"{uuid.uuid4().hex[:8]}@example.com",
+        full_name="Cached User", hashed_password=get_password_hash("secret123"),
+        role="manager", is_active=True, requires_approval=False, is_approved=True
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    from app.utils.auth import resolve_user
+    loaded = resolve_user(db_session, user.username)
+    hits = user_cache.hits
+    cached = resolve_user(db_session, user.username)
+    assert user_cache.hits == hits + 1
+    assert cached is not loaded
+    assert (cached.id, cached.role, cached.is_active, cached.hospital) == (user.id, "manager", True, None)
+
+    # Deactivation through the settings page drops the entry
+    response = admin_client.post(f"/settings/users/{user.id}/toggle", follow_redirects=False)
+    assert response.status_code == 302
+    assert user_cache.get(user.username) is None
+    db_session.expire_all()
+    assert resolve_user(db_session, user.username).is_active is False
+
+def test_requests_skip_the_user_query_when_cached(admin_client):
+    """A repeat request resolves the logged-in user from the cache"""
+    admin_client.get("/sales-orders/create")
+    hits = user_cache.hits
+    response = admin_client.get("/sales-orders/create")
+    assert response.status_code == 200
+    assert user_cache.hits == hits + 1